@@ -1,6 +1,7 @@
 from legend_data_monitor import (
     automatic_run,
     calibration,
+    exposure,
     monitoring,
     plot_styles,
     plotting,
@@ -21,6 +22,7 @@ __all__ = [
     "SlowControl",
     "apply_cut",
     "calibration",
+    "exposure",
     "monitoring",
     "utils",
     "plot_styles",
@@ -1,16 +1,16 @@
-import glob
+import bisect
+import copy
 import os
-import re
 import sys
 
+import h5py
 import numpy as np
 import pandas as pd
-import yaml
 from dbetto import TextDB
 
 # needed to know which parameters are not in DataLoader
 # but need to be calculated, such as event rate
-from . import save_data, subsystem, utils
+from . import exposure, save_data, subsystem, utils
 
 # -------------------------------------------------------------------------
 
@@ -36,6 +36,8 @@ class AnalysisData:
             str that has info regarding pulser operations (as difference or ratio wrt geds (spms?) data). Available options are:
                 - "pulser01anaRatio"
                 - "pulser01anaDiff"
+        aux_values=
+            DataFrame with the AUX values once per timestamp (see save_data.get_aux_series), only for aux_info analyses
         Or input kwargs directly parameters=, event_type=, cuts=, variation=, time_window=
     """
 
@@ -47,6 +49,7 @@ class AnalysisData:
             kwargs["selection"].copy() if "selection" in kwargs else kwargs.copy()
         )
         aux_info = kwargs["aux_info"] if "aux_info" in kwargs else None
+        aux_values = kwargs["aux_values"] if "aux_values" in kwargs else None
 
         # -------------------------------------------------------------------------
         # validity checks
@@ -130,6 +133,7 @@ class AnalysisData:
         # when plotting, no variation will be included as specified in the config file)
         self.variation = True
         self.aux_info = aux_info
+        self.aux_values = aux_values
 
         # -------------------------------------------------------------------------
         # subselect data
@@ -225,113 +229,57 @@ class AnalysisData:
         # do we want to keep all, phy or pulser events?
         if self.evt_type == "pulser":
             utils.logger.info("... keeping only pulser events")
-            self.data = self.data[self.data["flag_pulser"]]
         elif self.evt_type == "FCbsln":
             utils.logger.info("... keeping only FC baseline events")
-            self.data = self.data[self.data["flag_fc_bsln"]]
         elif self.evt_type == "muon":
             utils.logger.info("... keeping only muon events")
-            self.data = self.data[self.data["flag_muon"]]
         elif self.evt_type == "phy":
             utils.logger.info(
                 "... keeping only physical (non-pulser & non-FCbsln & non-muon) events"
             )
-            self.data = self.data[
-                (~self.data["flag_pulser"])
-                & (~self.data["flag_fc_bsln"])
-                & (~self.data["flag_muon"])
-            ]
         elif self.evt_type == "K_events":
             utils.logger.info("... selecting K lines in physical (non-pulser) events")
-            self.data = self.data[~self.data["flag_pulser"]]
-            energy = utils.SPECIAL_PARAMETERS["K_events"][0]
-            self.data = self.data[
-                (self.data[energy] > 1430) & (self.data[energy] < 1575)
-            ]
         elif self.evt_type == "all":
             utils.logger.info("... keeping all (pulser + non-pulser) events")
+            return
         else:
             utils.logger.error("\033[91mInvalid event type!\033[0m")
             utils.logger.error("\033[91m%s\033[0m", self.__doc__)
             return "bad"
 
+        self.data = self.data[utils.get_event_mask(self.data, self.evt_type)]
+
     def convert_bitmasks(self):
         """Convert float64 bitmask columns into boolean columns based on the conditions saved in metadata."""
-        path = self.path
-        version = self.version
-        possible_dirs = ["tier_evt", "tier/evt"]
-        file_pattern = "*-all-evt_config.yaml"
-        evt_config = None
-
-        for subdir in possible_dirs:
-            filepath_pattern = os.path.join(
-                path, version, "inputs/dataprod/config", subdir, file_pattern
-            )
-            files = glob.glob(filepath_pattern)
-            if files:
-                filepath = files[0]
-                with open(filepath) as file:
-                    evt_config = yaml.load(file, Loader=yaml.CLoader)
-                break
-
-        if evt_config is None:
+        schema = utils.get_bitmask_schema(self.path, self.version)
+        if schema is None:
             utils.logger.warning(
                 "\033[93mNo config files for converting bitmasks into boolean entries were found. Skip it.\033[0m"
             )
-        else:
+            return
 
-            try:
-                expression = evt_config["operations"]["_geds___quality___is_bb_like"][
-                    "expression"
-                ]
-            except KeyError:
-                filepath_pattern = os.path.join(
-                    path,
-                    version,
-                    "inputs/dataprod/config",
-                    subdir,
-                    "*-geds_qc-evt_config.yaml",
-                )
-                filepath = glob.glob(filepath_pattern)[0]
-                with open(filepath) as file:
-                    evt_config = yaml.load(file, Loader=yaml.CLoader)
-                expression = evt_config["operations"]["geds___quality___is_bb_like"][
-                    "expression"
-                ]
-
-            try:
-                expression = evt_config["operations"][
-                    "geds___quality___is_not_bb_like___is_delayed_discharge"
-                ]["expression"]
-            except KeyError:
-                filepath_pattern = os.path.join(
-                    path,
-                    version,
-                    "inputs/dataprod/config",
-                    subdir,
-                    "*-geds_qc-evt_config.yaml",
-                )
-                filepath = glob.glob(filepath_pattern)[0]
-                with open(filepath) as file:
-                    evt_config = yaml.load(file, Loader=yaml.CLoader)
-                expression = evt_config["operations"][
-                    "geds___quality___is_not_bb_like___is_delayed_discharge"
-                ]["expression"]
-
-            # extract key-value pairs like: hit.is_something == number
-            pattern = r"hit\.(\w+)\s*==\s*(\d+)"
-            matches = re.findall(pattern, expression)
-            expr_dict = {key: int(value) for key, value in matches}
-
-            for col in self.data.columns:
-                if col.startswith("is_") or col.endswith("_classifier"):
-                    if self.data[col].dtype != bool:
-                        if col in expr_dict:
-                            target_value = expr_dict[col]
-                            self.data[col] = self.data[col] == target_value
-                            utils.logger.info(
-                                f"Column '{col}' converted to boolean using value {target_value}."
-                            )
+        flag_index = {flag: idx for idx, flag in enumerate(schema["flags"])}
+        columns = [
+            col
+            for col in self.data.columns
+            if (col.startswith("is_") or col.endswith("_classifier"))
+            and self.data[col].dtype != bool
+            and col in flag_index
+        ]
+        if not columns:
+            return
+
+        # decode all flags at once
+        target_values = schema["values"][[flag_index[col] for col in columns]]
+        decoded = self.data[columns].to_numpy() == target_values
+        self.data[columns] = pd.DataFrame(
+            decoded, index=self.data.index, columns=columns
+        )
+        utils.logger.info(
+            "Columns %s converted to boolean using values %s.",
+            columns,
+            target_values.tolist(),
+        )
 
     def apply_cut(self, cut: str):
         """
@@ -370,26 +318,9 @@ class AnalysisData:
                 # calculate wf max relative to baseline
                 self.data["wf_max_rel"] = self.data["wf_max"] - self.data["baseline"]
             elif param == "event_rate":
-                # ! sorry need to jump through a lot of hoops here ! bare with me....
-
-                # --- count number of events in given time windows
-                # - count() returns count of rows for each column - redundant, same value in each (unless we have NaN)
-                # just want one column 'event_rate' -> pick 'channel' since it's never NaN, so correct count; rename to event rate
-                # - this is now a resampled dataframe with column event rate, and multiindex channel, datetime -> put them back as columns with reset index
-                event_rate = (
-                    self.data.set_index("datetime")
-                    .groupby("channel")
-                    .resample(self.time_window, origin="start")
-                    .count()["channel"]
-                    .to_frame(name="event_rate")
-                    .reset_index()
-                )
-
+                # --- count number of events in given time windows for each channel (see get_event_rate)
                 # ToDo: check time_window for event rate is smaller than the time window, but bigger than the rate (otherwise plots make no sense)
-
-                # divide event count in each time window by sampling window in seconds to get Hz
-                dt_seconds = get_seconds(self.time_window)
-                event_rate["event_rate"] = event_rate["event_rate"] * 1.0 / dt_seconds
+                event_rate = get_event_rate(self.data, self.time_window)
 
                 # --- get rid of last value
                 # as the data range does not equally divide by the time window, the count in the last "window" will be smaller
@@ -398,14 +329,7 @@ class AnalysisData:
                 # it's too complicated to fix that, so I will just get rid of the last row
                 event_rate = event_rate.iloc[:-1]
 
-                # --- shift timestamp
-                # the resulting table will start with the first timestamp of the original table
-                # I want to shift the time values by the half the time window, so that the event rate value corresponds to the middle of the time window
-                event_rate["datetime"] = (
-                    event_rate["datetime"] + pd.Timedelta(self.time_window) / 2
-                )
-
-                # --- now have to jump through hoops to put back in location position and name
+                # --- put back in location position and name
                 # - group original table by channel and pick first occurrence to get the channel map (ignore other columns)
                 # - reindex to match event rate table index
                 # - put the columns in with concat
@@ -426,20 +350,9 @@ class AnalysisData:
                 self.data = self.data.reset_index()
             elif param == "FWHM":
                 # calculate FWHM for each channel (substitute 'param' column with it)
-                channel_fwhm = (
-                    self.data.groupby("channel")[utils.SPECIAL_PARAMETERS[param][0]]
-                    .apply(
-                        lambda x: 2.355
-                        * np.sqrt(np.mean((x - np.mean(x, axis=0)) ** 2, axis=0))
-                    )
-                    .reset_index(name="FWHM")
-                )
-
-                # join the calculated RMS values to the original dataframe
-                self.data = self.data.merge(channel_fwhm, on="channel")
-
-                # put channel back in
-                self.data.reset_index()
+                self.data = self.data.assign(
+                    FWHM=get_fwhm(self.data, utils.SPECIAL_PARAMETERS[param][0])
+                ).reset_index(drop=True)
             elif param == "exposure":
                 # ------ get pulser rate for this experiment
 
@@ -464,46 +377,28 @@ class AnalysisData:
 
                 # - subselect only pulser events (flag_pulser True)
                 # - count number of rows i.e. events for each detector
-                # - select arbitrary column that is definitely not NaN in each row e.g. channel to represent the count
-                # - rename to "pulser_events"
-                # now we have a table with number of pulser events as column with DETECTOR NAME AS INDEX
-                df_livetime = (
-                    self.data[self.data["flag_pulser"]]
-                    .groupby("name")
-                    .count()["channel"]
-                    .to_frame("pulser_events")
+                # now we have a series with number of pulser events with DETECTOR NAME AS INDEX
+                pulser_events = (
+                    self.data[self.data["flag_pulser"]].groupby("name").size()
                 )
 
                 # ------ calculate livetime for each detector and add it to original dataframe
-                df_livetime["livetime_in_s"] = df_livetime["pulser_events"] / rate
+                livetime_in_s = pulser_events / rate
+                names = self.data["name"]
+                self.data["livetime_in_s"] = names.map(livetime_in_s).to_numpy()
 
-                self.data = self.data.set_index("name")
-                self.data = pd.concat(
-                    [self.data, df_livetime.reindex(self.data.index)], axis=1
-                )
-                # drop the pulser events column we don't need it
-                self.data = self.data.drop("pulser_events", axis=1)
-
-                # --- calculate exposure for each detector
-                # get diodes map
-                dets_file = os.path.join(
-                    self.path,
-                    self.version,
-                    "inputs/hardware/detectors/germanium/diodes",
+                # --- calculate exposure for each detector (masses are re-read only when a diode file changes, see exposure.get_diode_mass)
+                mass_in_kg = pd.Series(
+                    [
+                        exposure.get_diode_mass(self.path, self.version, det_name)
+                        for det_name in livetime_in_s.index
+                    ],
+                    index=livetime_in_s.index,
                 )
-                dets_map = TextDB(dets_file)
-
-                # add a new column "mass" to self.data containing mass values evaluated from dets_map[channel_name]["production"]["mass_in_g"], where channel_name is the value in "name" column
-                for det_name in self.data.index.unique():
-                    mass_in_kg = dets_map[det_name]["production"]["mass_in_g"] / 1000
-                    # exposure in kg*yr
-                    self.data.at[det_name, "exposure"] = (
-                        mass_in_kg
-                        * df_livetime.at[det_name, "livetime_in_s"]
-                        / (60 * 60 * 24 * 365.25)
-                    )
-
-                self.data.reset_index()
+                # exposure in kg*yr
+                self.data["exposure"] = names.map(
+                    mass_in_kg * livetime_in_s
+                ).to_numpy() / (60 * 60 * 24 * 365.25)
             elif param == "AoE_Custom":
                 self.data["AoE_Custom"] = self.data["A_max"] / self.data["cuspEmax"]
 
@@ -586,11 +481,11 @@ class AnalysisData:
                             self.plt_path + "-" + subsys + ".hdf", key_to_load
                         )
                         if is_key:
-                            old_data = pd.read_hdf(
-                                self.plt_path + "-" + subsys + ".hdf", key=key_to_load
-                            )
-                            channel_mean = get_saved_df_hdf(
-                                self, subsys, param, old_data
+                            channel_mean = get_reference_mean(
+                                self,
+                                self.plt_path + "-" + subsys + ".hdf",
+                                key_to_load,
+                                param,
                             )
                             self.data = concat_channel_mean(self, channel_mean)
                         else:
@@ -608,12 +503,11 @@ class AnalysisData:
                                 self.plt_path + "-" + subsys + ".hdf", key_to_load
                             )
                             if is_key:
-                                old_data = pd.read_hdf(
+                                channel_mean = get_reference_mean(
+                                    self,
                                     self.plt_path + "-" + subsys + ".hdf",
-                                    key=key_to_load,
-                                )
-                                channel_mean = get_saved_df_hdf(
-                                    self, subsys, parameter, old_data
+                                    key_to_load,
+                                    parameter,
                                 )
                                 # we need to repeat this operation for each param, otherwise only the mean of the last one survives
                                 self.data = concat_channel_mean(self, channel_mean)
@@ -719,6 +613,90 @@ class AnalysisData:
 # -------------------------------------------------------------------------
 
 
+def get_event_rate(df: pd.DataFrame, time_window: str) -> pd.DataFrame:
+    """
+    Return the event rate (Hz) of each channel in consecutive time windows, with columns 'channel', 'datetime' and 'event_rate'.
+
+    Windows of each channel start at its first timestamp and cover its whole time range, empty windows included
+    (as ``df.groupby('channel').resample(time_window, origin='start').count()`` does);
+    'datetime' is the middle of each window. Events are counted with a single ``np.bincount`` over (channel, window) indices.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data with 'channel' and 'datetime' columns.
+    time_window : str
+        Width of the time windows, eg '10T' (see :func:`get_seconds`).
+    """
+    dt_seconds = get_seconds(time_window)
+    dt = dt_seconds * 10**9
+    datetimes = pd.DatetimeIndex(df["datetime"])
+    times = datetimes.as_unit("ns").asi8
+    codes, channels = pd.factorize(df["channel"], sort=True)
+
+    # first timestamp and number of windows of each channel
+    start = np.full(len(channels), np.iinfo(np.int64).max)
+    np.minimum.at(start, codes, times)
+    windows = (times - start[codes]) // dt
+    n_windows = np.zeros(len(channels), dtype=np.int64)
+    np.maximum.at(n_windows, codes, windows + 1)
+
+    # windows of all channels, one after the other
+    offsets = np.concatenate([[0], np.cumsum(n_windows)[:-1]])
+    counts = np.bincount(offsets[codes] + windows, minlength=n_windows.sum())
+    window_channels = np.repeat(np.arange(len(channels)), n_windows)
+    window_idx = np.arange(len(counts)) - offsets[window_channels]
+
+    # shift timestamps by half the time window, so that the event rate value corresponds to the middle of the time window
+    window_times = start[window_channels] + window_idx * dt + dt // 2
+    window_datetimes = pd.DatetimeIndex(window_times.view("M8[ns]"))
+    if datetimes.tz is not None:
+        window_datetimes = window_datetimes.tz_localize("UTC").tz_convert(datetimes.tz)
+
+    return pd.DataFrame(
+        {
+            "channel": channels[window_channels],
+            "datetime": window_datetimes.as_unit(datetimes.unit),
+            # divide event count in each time window by sampling window in seconds to get Hz
+            "event_rate": counts / dt_seconds,
+        }
+    )
+
+
+def get_fwhm(df: pd.DataFrame, param: str) -> np.ndarray:
+    """
+    Return, for each row of ``df``, the FWHM (2.355 x standard deviation, NaN values ignored) of ``param`` in the corresponding channel.
+
+    Moments are evaluated with ``np.bincount`` over channel indices.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data with 'channel' and ``param`` columns.
+    param : str
+        Parameter whose spread is evaluated, eg 'trapEmax'.
+    """
+    codes, channels = pd.factorize(df["channel"])
+    values = df[param].to_numpy(dtype=float)
+    is_valid = ~np.isnan(values)
+    valid_codes = codes[is_valid]
+    valid_values = values[is_valid]
+
+    n = np.bincount(valid_codes, minlength=len(channels))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(valid_codes, valid_values, minlength=len(channels)) / n
+        variance = (
+            np.bincount(
+                valid_codes,
+                (valid_values - mean[valid_codes]) ** 2,
+                minlength=len(channels),
+            )
+            / n
+        )
+
+    return (2.355 * np.sqrt(variance))[codes]
+
+
 def get_seconds(time_window: str):
     """
     Convert sampling format used for DataFrame.resample() to int representing seconds.
@@ -782,6 +760,164 @@ def get_saved_df_hdf(
     return channel_mean
 
 
+def get_reference_state_path(hdf_path: str) -> str:
+    """Return the path of the file storing the reference-window state of channel means next to a given HDF monitoring file."""
+    return os.path.splitext(hdf_path)[0] + "-mean_state.hdf"
+
+
+def load_reference_state(state_path: str, key: str):
+    """Load the per-channel state and the window bookkeeping of a given key from the reference-window state file; return (None, None) if not available."""
+    if not os.path.exists(state_path):
+        return None, None
+
+    with pd.HDFStore(state_path, mode="r") as store:
+        if f"/{key}" not in store.keys() or f"/{key}_window" not in store.keys():
+            return None, None
+        # keep column types (timestamps are int64 nanoseconds)
+        return store[f"/{key}"], store[f"/{key}_window"].to_dict("records")[0]
+
+
+def merge_welford(state: pd.DataFrame | None, values, channels) -> pd.DataFrame:
+    """
+    Update the per-channel count, running mean and sum of squared deviations from the mean (Welford's algorithm, merged batch-wise) with new values, skipping NaN values.
+
+    Parameters
+    ----------
+    state : pd.DataFrame | None
+        Per-channel state with columns 'count', 'mean', 'm2' (index 'channel'); None to start from scratch.
+    values : array-like
+        New values.
+    channels : array-like
+        Channel of each value.
+    """
+    grouped = pd.Series(values, dtype=float).groupby(np.asarray(channels))
+    batch = pd.DataFrame({"count": grouped.count(), "mean": grouped.mean()})
+    batch["m2"] = grouped.var(ddof=0) * batch["count"]
+    batch = batch[batch["count"] > 0]
+    batch.index.name = "channel"
+    if state is None or state.empty:
+        return batch
+
+    channels = state.index.union(batch.index)
+    old = state.reindex(channels).fillna(0)
+    new = batch.reindex(channels).fillna(0)
+    count = old["count"] + new["count"]
+    delta = new["mean"] - old["mean"]
+    merged = pd.DataFrame(
+        {
+            "count": count,
+            "mean": (old["mean"] + delta * new["count"] / count).where(
+                old["count"] > 0, new["mean"]
+            ),
+            "m2": old["m2"]
+            + new["m2"]
+            + delta**2 * old["count"] * new["count"] / count,
+        }
+    )
+    merged["mean"] = merged["mean"].where(new["count"] > 0, old["mean"])
+    merged.index.name = "channel"
+
+    return merged
+
+
+def get_reference_mean(
+    self, hdf_path: str, key: str, param: str, fraction: float = 0.1
+) -> pd.DataFrame:
+    """
+    Get the mean value of ``param`` in each channel over the first ``fraction`` of the time range covered by the data saved under ``key`` plus the new data, as :func:`get_saved_df_hdf` does.
+
+    Count, running mean and variance of each channel over the reference window are kept in a state file next to the output
+    (see :func:`get_reference_state_path`), together with the window bounds and the number of saved rows already taken into account:
+    only saved rows that entered the (growing) reference window since the previous call are read.
+    Saved data are read from scratch only if the state is missing or does not match them anymore (eg the key was rewritten).
+    """
+    state_path = get_reference_state_path(hdf_path)
+    state, window = load_reference_state(state_path, key)
+    # timestamps are compared as int64 nanoseconds
+    new_times = pd.DatetimeIndex(self.data["datetime"]).as_unit("ns").asi8
+
+    with h5py.File(hdf_path, "r") as f:
+        # timestamps of saved rows, read one at a time when needed
+        saved_times = f[key]["axis1"]
+        kind = saved_times.attrs.get("kind", b"datetime64[ns]").decode()
+        unit = np.datetime_data(np.dtype(kind))[0]
+        # files written with pandas < 3 store a unitless 'datetime64' kind, for nanoseconds
+        to_ns = 1 if unit == "generic" else pd.Timedelta(1, unit=unit).value
+        n_saved = len(saved_times)
+        bounds = [saved_times[0] * to_ns, saved_times[-1] * to_ns] if n_saved else []
+        if len(new_times) > 0:
+            bounds += [new_times.min(), new_times.max()]
+        t_min, t_max = min(bounds), max(bounds)
+        thr = t_min + (pd.Timedelta(t_max - t_min) * fraction).value
+
+        n_done = 0 if state is None else int(window["n_rows"])
+        is_valid = (
+            state is not None
+            and window["t_min"] == t_min
+            and n_done <= n_saved
+            and (n_done == 0 or saved_times[n_done - 1] * to_ns == window["t_last_row"])
+        )
+        if not is_valid:
+            state, n_done = None, 0
+        # the window only grows, rows already taken into account are still in it
+        saved_stop = bisect.bisect_left(saved_times, -(-thr // to_ns), lo=n_done)
+        t_last_row = saved_times[saved_stop - 1] * to_ns if saved_stop > 0 else t_min
+
+    # the last row already taken into account must be untouched too
+    fingerprint = window["fingerprint"] if is_valid else 0.0
+    if is_valid and n_done > 0:
+        last_row = pd.read_hdf(hdf_path, key=key, start=n_done - 1, stop=n_done)
+        if not np.isclose(np.nansum(last_row.to_numpy()), fingerprint):
+            state, n_done = None, 0
+
+    if saved_stop > n_done:
+        utils.logger.debug(
+            "... adding %d saved rows of %s to the reference window",
+            saved_stop - n_done,
+            key,
+        )
+        old_data = pd.read_hdf(hdf_path, key=key, start=n_done, stop=saved_stop)
+        fingerprint = np.nansum(old_data.iloc[-1].to_numpy())
+        old_values = old_data.stack()
+        state = merge_welford(
+            state, old_values.to_numpy(), old_values.index.get_level_values(-1)
+        )
+
+    # new rows in the reference window (eg if saved data cover a short time range)
+    stop = saved_stop
+    is_new_ref = new_times < thr
+    if is_new_ref.any():
+        new_ref = self.data.loc[is_new_ref]
+        state = merge_welford(state, new_ref[param].to_numpy(), new_ref["channel"])
+        # new rows will be appended after the saved ones
+        stop = n_saved + len(np.unique(new_times[is_new_ref]))
+        t_last_row = new_times[is_new_ref].max()
+        fingerprint = np.nansum(new_ref.loc[new_times[is_new_ref] == t_last_row, param])
+    if state is None:
+        state = merge_welford(None, [], [])
+
+    if is_new_ref.any() and saved_stop < n_saved:
+        # new rows overlap saved ones: the state cannot keep track of them, start again next time
+        if os.path.exists(state_path):
+            with pd.HDFStore(state_path, mode="a") as store:
+                for state_key in [f"/{key}", f"/{key}_window"]:
+                    if state_key in store.keys():
+                        store.remove(state_key)
+    else:
+        state.to_hdf(state_path, key=key, mode="a")
+        pd.DataFrame(
+            {
+                "t_min": [t_min],
+                "t_end": [thr],
+                "n_rows": [stop],
+                "t_last_row": [t_last_row],
+                "fingerprint": [fingerprint],
+            }
+        ).to_hdf(state_path, key=f"{key}_window", mode="a")
+
+    return state[["mean"]].rename(columns={"mean": param})
+
+
 def get_aux_df(
     df: pd.DataFrame, parameter: list, plot_settings: dict, aux_ch: str
 ) -> pd.DataFrame:
@@ -794,23 +930,20 @@ def get_aux_df(
         ) or param in utils.SPECIAL_PARAMETERS.keys():
             return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
+        # one base frame without AUX columns; the AUX/ratio/diff variants below only add their own column to it
+        # (with copy-on-write, no full copy of the subsystem data is made before the event selection)
+        base = df.drop(columns=f"{param}_{aux_ch}")
+        aux_values = get_aux_values(df, param, aux_ch)
+
         # get abs/mean/% variation for data of aux channel --> objects to save
         utils.logger.debug(f"Getting {aux_ch} data for {param}")
-        aux_data = df.copy()
-        aux_data[param] = aux_data[f"{param}_{aux_ch}"]
-        aux_data = aux_data.drop(
-            columns=[
-                f"{param}_{aux_ch}Ratio",
-                f"{param}_{aux_ch}",
-                f"{param}_{aux_ch}Diff",
-            ]
-        )
         # right now, we have the same values repeated for each ged channel
         # -> keep one and substytute with AUX channel ID
         # (only for this aux df, the others still maintain a relation with geds values)
         # keep one channel only
-        first_ch = aux_data.iloc[0]["channel"]
-        aux_data = aux_data[aux_data["channel"] == first_ch]
+        first_ch = df["channel"].iloc[0]
+        is_first_ch = (df["channel"] == first_ch).to_numpy()
+        aux_data = base[is_first_ch].assign(**{param: aux_values[is_first_ch]})
         first_timestamp = utils.unix_timestamp_to_string(
             aux_data["datetime"].dt.to_pydatetime()[0].timestamp()
         )
@@ -835,34 +968,28 @@ def get_aux_df(
 
         # get abs/mean/% variation for ratio values with aux channel data --> objects to save
         utils.logger.debug(f"Getting ratio wrt {aux_ch} data for {param}")
-        aux_ratio_data = df.copy()
-        aux_ratio_data[param] = aux_ratio_data[f"{param}_{aux_ch}Ratio"]
-        aux_ratio_data = aux_ratio_data.drop(
-            columns=[
-                f"{param}_{aux_ch}Ratio",
-                f"{param}_{aux_ch}",
-                f"{param}_{aux_ch}Diff",
-            ]
+        # the AUX values entering the ratio/difference are taken once per timestamp from all channels (not only the first one),
+        # so that they are available at every timestamp of any channel
+        aux_series = save_data.get_aux_series(
+            df, param, aux_ch, plot_settings["event_type"]
         )
-
+        aux_ratio_data = base.assign(**{param: df[param].to_numpy() / aux_values})
         aux_ratio_analysis = AnalysisData(
-            aux_ratio_data, selection=plot_settings, aux_info="pulser01anaRatio"
+            aux_ratio_data,
+            selection=plot_settings,
+            aux_info="pulser01anaRatio",
+            aux_values=aux_series,
         )
         utils.logger.debug("... aux ratio dataframe \n%s", aux_ratio_analysis.data)
 
         # get abs/mean/% variation for difference values with aux channel data --> objects to save
         utils.logger.debug(f"Getting difference wrt {aux_ch} data for {param}")
-        aux_diff_data = df.copy()
-        aux_diff_data[param] = aux_diff_data[f"{param}_{aux_ch}Diff"]
-        aux_diff_data = aux_diff_data.drop(
-            columns=[
-                f"{param}_{aux_ch}Ratio",
-                f"{param}_{aux_ch}",
-                f"{param}_{aux_ch}Diff",
-            ]
-        )
+        aux_diff_data = base.assign(**{param: df[param].to_numpy() - aux_values})
         aux_diff_analysis = AnalysisData(
-            aux_diff_data, selection=plot_settings, aux_info="pulser01anaDiff"
+            aux_diff_data,
+            selection=plot_settings,
+            aux_info="pulser01anaDiff",
+            aux_values=aux_series,
         )
         utils.logger.debug("... aux difference dataframe \n%s", aux_diff_analysis.data)
 
@@ -879,6 +1006,122 @@ def get_aux_df(
     return aux_analysis, aux_ratio_analysis, aux_diff_analysis
 
 
+def get_selection_key(selection: dict) -> tuple:
+    """
+    Return the entries of a selection that define an analysis, as a hashable key.
+
+    'variation' is not part of the key, since the % variation is always evaluated by AnalysisData.
+    """
+
+    def as_tuple(value):
+        if value is None:
+            return ()
+        return (value,) if isinstance(value, str) else tuple(value)
+
+    return (
+        as_tuple(selection["parameters"]),
+        selection["event_type"],
+        as_tuple(selection.get("cuts")),
+        selection.get("time_window"),
+        selection.get("saving"),
+        selection.get("plt_path"),
+        selection.get("path"),
+        selection.get("version"),
+    )
+
+
+def copy_analysis(analysis):
+    """Return a copy of an AnalysisData object (or DataFrame), so that callers can modify it without changing cached results."""
+    if analysis is None:
+        return None
+    if isinstance(analysis, pd.DataFrame):
+        return analysis.copy()
+
+    analysis_copy = copy.copy(analysis)
+    if hasattr(analysis, "data"):
+        analysis_copy.data = analysis.data.copy()
+
+    return analysis_copy
+
+
+def get_cached_analysis(subsystem: subsystem.Subsystem, key: tuple, compute):
+    """
+    Return (a copy of) the analysis result stored under ``key`` for the data of ``subsystem``, computing it with ``compute()`` if missing.
+
+    Results are kept by the subsystem itself (``analysis_cache``), so that they are dropped together with it,
+    and are bound to the data they were computed from, so that new or reloaded subsystem data are never mixed up with cached results.
+    """
+    entry = subsystem.analysis_cache.get(key)
+    if entry is not None and entry[0] is subsystem.data:
+        utils.logger.debug("... reusing analysis results for %s", key)
+        result = entry[1]
+    else:
+        result = compute()
+        subsystem.analysis_cache[key] = (subsystem.data, result)
+
+    if isinstance(result, tuple):
+        return tuple(copy_analysis(res) for res in result)
+    return copy_analysis(result)
+
+
+def get_analysis_data(subsystem: subsystem.Subsystem, selection: dict) -> AnalysisData:
+    """
+    Return AnalysisData for the data of a subsystem and a selection, computing it only once for each distinct analysis.
+
+    Parameters
+    ----------
+    subsystem : Subsystem
+        Subsystem with loaded data.
+    selection : dict
+        Selection settings (parameters, event type, cuts, time window, ...), see AnalysisData.
+    """
+    key = ("analysis",) + get_selection_key(selection)
+
+    return get_cached_analysis(
+        subsystem, key, lambda: AnalysisData(subsystem.data, selection=selection)
+    )
+
+
+def get_aux_analysis_data(
+    subsystem: subsystem.Subsystem, parameter: list, plot_settings: dict, aux_ch: str
+):
+    """
+    Return the auxiliary analyses of :func:`get_aux_df` for the data of a subsystem and the given settings, computing them only once for each distinct analysis.
+
+    Parameters
+    ----------
+    subsystem : Subsystem
+        Subsystem with loaded data.
+    parameter : list
+        Parameters of interest.
+    plot_settings : dict
+        Selection settings (parameters, event type, cuts, time window, ...), see AnalysisData.
+    aux_ch : str
+        Auxiliary channel, eg 'pulser01ana'.
+    """
+    # the multi-parameter case updates the plot settings: nothing to share
+    if len(parameter) > 1:
+        return get_aux_df(subsystem.data, parameter, plot_settings, aux_ch)
+
+    key = ("aux", aux_ch) + get_selection_key(plot_settings)
+
+    return get_cached_analysis(
+        subsystem,
+        key,
+        lambda: get_aux_df(subsystem.data, parameter, plot_settings, aux_ch),
+    )
+
+
+def clear_analysis_cache(subsystem: subsystem.Subsystem):
+    """Drop the analysis results kept by a subsystem (see :func:`get_analysis_data`)."""
+    subsystem.analysis_cache.clear()
+
+
+def get_aux_values(df: pd.DataFrame, param: str, aux_ch: str) -> np.ndarray:
+    """Return the values of the auxiliary channel for each row of the subsystem data (see :meth:`.subsystem.Subsystem.include_aux`)."""
+    return df[f"{param}_{aux_ch}"].to_numpy()
+
+
 def get_aux_info(df: pd.DataFrame, chmap: dict, aux_ch: str) -> pd.DataFrame:
     """Return a DataFrame with correct pulser AUX info."""
     df["channel"] = chmap.PULS01ANA.daq.rawid
@@ -939,7 +1182,7 @@ def load_subsystem_data(
         plot_settings = plots[plot_title]
 
         # --- AnalysisData:
-        data_analysis = AnalysisData(subsystem.data, selection=plot_settings | dataset)
+        data_analysis = get_analysis_data(subsystem, plot_settings | dataset)
         if utils.check_empty_df(data_analysis):
             continue
         utils.logger.debug(data_analysis.data)
@@ -968,7 +1211,7 @@ def load_subsystem_data(
         }
 
         # parameters from plot settings to be simply propagated
-        for key in ["plot_style", "time_window", "resampled", "range"]:
+        for key in ["plot_style", "time_window", "resampled", "range", "decimate"]:
             plot_info[key] = plot_settings.get(key, None)
         plot_info["std"] = None
 
@@ -750,6 +750,9 @@ def qc_avg_series(
         os.path.join(auto_dir_path, "inputs/"), start_key=start_key
     )
 
+    # single aggregation pass over the QC flags, shared by both summaries
+    monitoring.build_qc_rate_table(output_folder, period, current_run)
+
     monitoring.qc_average(
         auto_dir_path, output_folder, det_info, period, current_run, save_pdf
     )
@@ -4,114 +4,47 @@ import subprocess
 import sys
 
 import yaml
-from dbetto import TextDB
 
-from . import analysis_data, plotting, slow_control, subsystem, utils
+from . import analysis_data, exposure, plotting, slow_control, subsystem, utils
 
 
 def retrieve_exposure(
     period: str, runs: str | list[str], runinfo_path: str, path: str, version: str
 ):
-
+    """Log livetime and exposure of AC/ON detectors for the given runs; detector metadata are read once per run and production version (see :func:`.exposure.get_exposure_table`)."""
     runinfo = utils.read_json_or_yaml(runinfo_path)
-
-    tot_liv = 0
-    ac_exposure = 0
-    on_validPSD_NONvalidPSD_exposure = 0
-    on_validPSD_exposure = 0
-    mass = 0
-    on_validPSD_dets_exposure = {"BEGe": 0, "ICPC": 0, "COAX": 0, "PPC": 0}
-    on_dets_exposure = {"BEGe": 0, "ICPC": 0, "COAX": 0, "PPC": 0}
-    ac_dets_exposure = {"BEGe": 0, "ICPC": 0, "COAX": 0, "PPC": 0}
+    if isinstance(runs, str):
+        runs = [runs]
 
     for run in runs:
         if "phy" not in runinfo[period][run].keys():
             utils.logger.debug(f"No 'phy' key present in {runinfo_path}. Exit here")
             return
-        livetime_in_d = runinfo[period][run]["phy"]["livetime_in_s"] / (60 * 60 * 24)
-        tot_liv += livetime_in_d
 
-        first_timestamp = runinfo[period][run]["phy"]["start_key"]
-        full_status_map = utils.get_status_map(path, version, first_timestamp, "geds")
+    table = exposure.get_exposure_table(runinfo, period, runs, path, version)
+    exposures = exposure.get_exposure(table, period, runs)
 
-        map_file = os.path.join(
-            path, version, "inputs/hardware/configuration/channelmaps"
-        )
-        full_channel_map = TextDB(map_file).on(timestamp=first_timestamp)
-
-        for hpge in full_channel_map.group("system").geds.map("name").keys():
-            diode_path = utils.retrieve_json_or_yaml(
-                os.path.join(
-                    path, version, "inputs/hardware/detectors/germanium/diodes"
-                ),
-                hpge,
-            )
-            diode = utils.read_json_or_yaml(diode_path)
-            usability = full_status_map[hpge]["usability"]
-            psd = full_status_map[hpge]["psd"]
-
-            mass += diode["production"]["mass_in_g"] / 1000
-
-            expo = livetime_in_d / 365.25 * diode["production"]["mass_in_g"] / 1000
-
-            if usability == "ac":
-                ac_exposure += expo
-                if hpge[0] == "B":
-                    ac_dets_exposure["BEGe"] += expo
-                if hpge[0] == "V":
-                    ac_dets_exposure["ICPC"] += expo
-                if hpge[0] == "C":
-                    ac_dets_exposure["COAX"] += expo
-                if hpge[0] == "P":
-                    ac_dets_exposure["PPC"] += expo
-
-            if usability == "on":
-                on_validPSD_NONvalidPSD_exposure += expo
-                if hpge[0] == "B":
-                    on_dets_exposure["BEGe"] += expo
-                if hpge[0] == "V":
-                    on_dets_exposure["ICPC"] += expo
-                if hpge[0] == "C":
-                    on_dets_exposure["COAX"] += expo
-                if hpge[0] == "P":
-                    on_dets_exposure["PPC"] += expo
-
-                if "is_bb_like" in psd and psd["is_bb_like"] != "missing":
-                    if all(
-                        [
-                            psd["status"][p.strip()] == "valid"
-                            for p in psd["is_bb_like"].split("&")
-                        ]
-                    ):
-                        on_validPSD_exposure += expo
-                        if hpge[0] == "B":
-                            on_validPSD_dets_exposure["BEGe"] += expo
-                        if hpge[0] == "V":
-                            on_validPSD_dets_exposure["ICPC"] += expo
-                        if hpge[0] == "C":
-                            on_validPSD_dets_exposure["COAX"] += expo
-                        if hpge[0] == "P":
-                            on_validPSD_dets_exposure["PPC"] += expo
-
-    utils.logger.info("mass: %s", round(mass, 3))
+    utils.logger.info("mass: %s", round(exposures["mass_in_kg"], 3))
     utils.logger.info("period: %s", period)
     utils.logger.info("runs: %s", runs)
-    utils.logger.info("Total livetime: %.4f d", tot_liv)
-    utils.logger.info("AC exposure: %.4f kg-yr", round(ac_exposure, 4))
-    formatted = {k: f"{v:.4f}" for k, v in ac_dets_exposure.items()}
+    utils.logger.info("Total livetime: %.4f d", exposures["livetime_in_d"])
+    utils.logger.info("AC exposure: %.4f kg-yr", round(exposures["ac"], 4))
+    formatted = {k: f"{v:.4f}" for k, v in exposures["ac_dets"].items()}
     utils.logger.info("--- per detector: %s", formatted)
     utils.logger.info(
         "ON (valid PSD + non-valid PSD) exposure: %.4f kg-yr",
-        round(on_validPSD_NONvalidPSD_exposure, 4),
+        round(exposures["on"], 4),
     )
-    formatted = {k: f"{v:.4f}" for k, v in on_dets_exposure.items()}
+    formatted = {k: f"{v:.4f}" for k, v in exposures["on_dets"].items()}
     utils.logger.info("--- per detector: %s", formatted)
     utils.logger.info(
-        "ON (valid PSD) exposure: %.4f kg-yr", round(on_validPSD_exposure, 4)
+        "ON (valid PSD) exposure: %.4f kg-yr", round(exposures["on_valid_psd"], 4)
     )
-    formatted = {k: f"{v:.4f}" for k, v in on_validPSD_dets_exposure.items()}
+    formatted = {k: f"{v:.4f}" for k, v in exposures["on_valid_psd_dets"].items()}
     utils.logger.info("--- per detector: %s", formatted)
 
+    return exposures
+
 
 def retrieve_scdb(config: str, port: int, pswd: str):
     """Set the configuration file and the output paths when a user config file is provided. The function to retrieve Slow Control data from database is then automatically called."""
@@ -296,6 +229,143 @@ def generate_plots(config: dict, plt_path: str, n_files=None):
             make_plots(config.copy(), plt_path, config["saving"])
 
 
+def get_aux_parameters(parameters: str | list) -> list:
+    """Return the parameters whose PULS01ANA values are merged into the subsystem data (see :meth:`.subsystem.Subsystem.include_aux`)."""
+    parameters = [parameters] if isinstance(parameters, str) else list(parameters)
+
+    return [
+        param
+        for param in parameters
+        if param not in utils.SPECIAL_PARAMETERS
+        and param
+        not in (
+            "quality_cuts",
+            "geds/quality/is_not_bb_like/is_delayed_discharge",
+            "geds/quality/is_bb_like",
+        )
+        and utils.PARAMETER_TIERS.get(param) != "hit"
+    ]
+
+
+def get_execution_plan(config: dict) -> dict:
+    """
+    Compile the plots of a config into an execution plan, where the work shared by different plots is done only once.
+
+    For each subsystem, the plan lists:
+
+      - the parameters to load (read once for all plots, see :meth:`.subsystem.Subsystem.get_data`)
+      - the parameters whose PULS01ANA values are merged into the subsystem data (read at once for all plots,
+        see :meth:`.subsystem.Subsystem.include_aux`); only single-parameter plots use them (see :func:`.analysis_data.get_aux_df`)
+      - the distinct analyses (parameters, event type, cuts and time window) with the plots consuming them;
+        this is a report, analyses are shared at run time by :func:`.analysis_data.get_analysis_data`
+      - the outputs (plots and saved data)
+
+    ``make_plots`` loads the data of each subsystem from the plan. The cost compares the number of data reads with
+    the ones done when PULS01ANA data were merged plot by plot (one read for each merged parameter), and the number of
+    analyses with the ones done without sharing them (one for each plot).
+
+    Parameters
+    ----------
+    config : dict
+        Config with 'dataset' and 'subsystems' entries.
+    """
+    # hit QC and classifier flags are read once for all subsystems
+    hit_config = utils.load_tier_config(
+        config["dataset"]["path"], config["dataset"]["version"], "hit"
+    )
+
+    plan = {}
+    for system, plots in config["subsystems"].items():
+        parameters = list(
+            dict.fromkeys(utils.get_all_plot_parameters(system, config, hit_config))
+        )
+        aux_parameters = []
+        baseline_aux_parameters = []
+        analyses = {}
+        outputs = {"plots": [], "saves": []}
+
+        for title, plot in plots.items():
+            # both options (diff and ratio) are present -> BAD! For this parameter we do not subtract/divide for any AUX entry
+            if "AUX_ratio" in plot.keys() and "AUX_diff" in plot.keys():
+                utils.logger.error(
+                    "\033[91mYou selected both 'AUX_ratio' and 'AUX_diff' for %s. Pick one!\033[0m",
+                    plot["parameters"],
+                )
+                sys.exit()
+
+            plot_aux = get_aux_parameters(plot["parameters"])
+            baseline_aux_parameters += [
+                p for p in plot_aux if p not in baseline_aux_parameters
+            ]
+            if isinstance(plot["parameters"], str) or len(plot["parameters"]) == 1:
+                aux_parameters += [p for p in plot_aux if p not in aux_parameters]
+
+            key = analysis_data.get_selection_key(plot)
+            analyses.setdefault(key, []).append(title)
+
+            if "plot_structure" in plot:
+                outputs["plots"].append(title)
+            else:
+                outputs["saves"].append(title)
+
+        plan[system] = {
+            "parameters": parameters,
+            "aux_parameters": aux_parameters,
+            "analyses": analyses,
+            "outputs": outputs,
+            "cost": {
+                "reads": 1 + bool(aux_parameters),
+                "baseline_reads": 1 + len(baseline_aux_parameters),
+                "analyses": len(analyses),
+                "baseline_analyses": len(plots),
+                "outputs": len(plots),
+            },
+        }
+
+    return plan
+
+
+def format_execution_plan(plan: dict) -> str:
+    """Return a readable description of an execution plan (see :func:`get_execution_plan`)."""
+    lines = []
+    for system, system_plan in plan.items():
+        cost = system_plan["cost"]
+        lines.append(f"{system}:")
+        lines.append(f"  load: {', '.join(system_plan['parameters']) or '-'}")
+        lines.append(
+            f"  load PULS01ANA: {', '.join(system_plan['aux_parameters']) or '-'}"
+        )
+        lines.append("  analyses:")
+        for key, titles in system_plan["analyses"].items():
+            params, event_type, cuts, time_window = key[:4]
+            lines.append(
+                f"    {'+'.join(params)} | {event_type} | cuts: {', '.join(cuts) or '-'} | window: {time_window or '-'}"
+            )
+            for title in titles:
+                kind = "plot" if title in system_plan["outputs"]["plots"] else "save"
+                lines.append(f"      -> {kind}: {title}")
+        lines.append(
+            f"  estimated cost: {cost['reads']} data reads (vs {cost['baseline_reads']} merging PULS01ANA data plot by plot), "
+            + f"{cost['analyses']} analyses (vs {cost['baseline_analyses']} without sharing), {cost['outputs']} outputs"
+        )
+
+    return "\n".join(lines)
+
+
+def explain_plots(user_config_path: str):
+    """Show the execution plan and its estimated cost for the plots of a user config file, without loading any data."""
+    with open(user_config_path) as f:
+        config = yaml.load(f, Loader=yaml.CLoader)
+
+    # check validity of plot settings
+    utils.check_plot_settings(config)
+
+    plan = get_execution_plan(config)
+    utils.logger.info("Execution plan:\n%s", format_execution_plan(plan))
+
+    return plan
+
+
 def make_plots(config: dict, plt_path: str, saving: str):
 
     # -------------------------------------------------------------------------
@@ -306,13 +376,19 @@ def make_plots(config: dict, plt_path: str, saving: str):
     file_handler.setLevel(utils.logging.DEBUG)
     utils.logger.addHandler(file_handler)
 
+    # -------------------------------------------------------------------------
+    # compile the requested plots into loads/analyses shared among plots
+    # -------------------------------------------------------------------------
+    plan = get_execution_plan(config)
+    utils.logger.debug("Execution plan:\n%s", format_execution_plan(plan))
+
     # -------------------------------------------------------------------------
     # flag events - PULSER
     # -------------------------------------------------------------------------
     # put it in a dict, so that later, if pulser is also wanted to be plotted, we don't have to load it twice
     subsystems = {"pulser": subsystem.Subsystem("pulser", dataset=config["dataset"])}
     # get list of all parameters needed for all requested plots, if any
-    parameters = utils.get_all_plot_parameters("pulser", config)
+    parameters = plan["pulser"]["parameters"] if "pulser" in plan else []
     # get data for these parameters and time range given in the dataset
     # (if no parameters given to plot, baseline and wfmax will always be loaded to flag pulser events anyway)
     subsystems["pulser"].get_data(parameters)
@@ -322,7 +398,7 @@ def make_plots(config: dict, plt_path: str, saving: str):
     # flag events - FC baseline
     # -------------------------------------------------------------------------
     subsystems["FCbsln"] = subsystem.Subsystem("FCbsln", dataset=config["dataset"])
-    parameters = utils.get_all_plot_parameters("FCbsln", config)
+    parameters = plan["FCbsln"]["parameters"] if "FCbsln" in plan else []
     subsystems["FCbsln"].get_data(parameters)
     # the following 3 lines help to tag FC bsln events that are not in coincidence with a pulser
     subsystems["FCbsln"].flag_pulser_events(subsystems["pulser"])
@@ -334,7 +410,7 @@ def make_plots(config: dict, plt_path: str, saving: str):
     # flag events - muon
     # -------------------------------------------------------------------------
     subsystems["muon"] = subsystem.Subsystem("muon", dataset=config["dataset"])
-    parameters = utils.get_all_plot_parameters("muon", config)
+    parameters = plan["muon"]["parameters"] if "muon" in plan else []
     subsystems["muon"].get_data(parameters)
     utils.logger.debug(subsystems["muon"].data)
 
@@ -352,20 +428,14 @@ def make_plots(config: dict, plt_path: str, saving: str):
         if system not in subsystems:
             # Subsystem: knows its channel map & software status (on/off channels)
             subsystems[system] = subsystem.Subsystem(system, dataset=config["dataset"])
-            # get list of parameters needed for all requested plots, if any
-            parameters = utils.get_all_plot_parameters(system, config)
-            # get data for these parameters and dataset range
-            subsystems[system].get_data(parameters)
-
-        # load also aux channel if necessary (FOR ALL SYSTEMS), and add it to the already existing df
-        for plot in config["subsystems"][system].keys():
-            # !!! add if for sipms...
-            subsystems[system].include_aux(
-                config["subsystems"][system][plot]["parameters"],
-                config["dataset"],
-                config["subsystems"][system][plot],
-                "pulser01ana",
-            )
+            # get data for the parameters needed by all requested plots (each loaded once) and dataset range
+            subsystems[system].get_data(plan[system]["parameters"])
+
+        # load also aux channel data needed by all plots at once (FOR ALL SYSTEMS), and add it to the already existing df
+        # !!! add if for sipms...
+        subsystems[system].include_aux(
+            plan[system]["aux_parameters"], config["dataset"], "pulser01ana"
+        )
 
         utils.logger.debug(subsystems[system].data)
 
@@ -404,6 +474,8 @@ def make_plots(config: dict, plt_path: str, saving: str):
             plt_path,
             saving,
         )
+        # analyses are shared only within a subsystem
+        analysis_data.clear_analysis_cache(subsystems[system])
 
     # flush and remove the handler before cleaning
     file_handler.flush()
@@ -0,0 +1,242 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from dbetto import TextDB
+
+from . import utils
+
+# -------------------------------------------------------------------------
+# Exposure tables: one row per (period, run, detector), built once per production version
+# -------------------------------------------------------------------------
+
+# detector type from the first letter of the detector name
+DET_TYPES = {"B": "BEGe", "V": "ICPC", "C": "COAX", "P": "PPC"}
+
+# metadata the run x detector tables are built from; tables are rebuilt once any of these changes
+METADATA_SOURCES = [
+    "inputs/dataprod/config",
+    "inputs/datasets/statuses",
+    "inputs/hardware/configuration/channelmaps",
+    "inputs/hardware/detectors/germanium/diodes",
+]
+
+# run x detector tables kept in memory, by (path, version), together with their metadata signature
+EXPOSURE_TABLES = {}
+
+
+def get_metadata_signature(path: str, version: str) -> str:
+    """Return a hex digest identifying the state of the metadata the exposure tables are built from (see ``METADATA_SOURCES``)."""
+    return utils.get_content_hash(
+        [
+            utils.get_directory_signature(os.path.join(path, version, source))
+            for source in METADATA_SOURCES
+        ]
+    )
+
+
+@lru_cache(maxsize=256)
+def read_diode_mass(diode_path: str, signature: tuple) -> float:
+    """Return the mass (kg) stored in a diode metadata file with the given signature (see :func:`utils.get_file_signature`); results are cached."""
+    diode = utils.read_json_or_yaml(diode_path)
+
+    return diode["production"]["mass_in_g"] / 1000
+
+
+def get_diode_mass(path: str, version: str, hpge: str) -> float:
+    """
+    Return the mass (kg) of a germanium detector, read from its diode metadata only if the file changed since the last call.
+
+    Parameters
+    ----------
+    path : str
+        Path to the processing environment, e.g. '/data2/public/prodenv/prod-blind'.
+    version : str
+        Version of data under inspection, e.g. 'tmp-auto'.
+    hpge : str
+        Detector name, e.g. 'V02160A'.
+    """
+    diode_path = utils.retrieve_json_or_yaml(
+        os.path.join(path, version, "inputs/hardware/detectors/germanium/diodes"),
+        hpge,
+    )
+
+    return read_diode_mass(diode_path, utils.get_file_signature(diode_path))
+
+
+def is_valid_psd(psd: dict) -> bool:
+    """Return True if all the PSD cuts entering 'is_bb_like' of a detector status entry are valid."""
+    if "is_bb_like" not in psd or psd["is_bb_like"] == "missing":
+        return False
+
+    return all(
+        psd["status"][p.strip()] == "valid" for p in psd["is_bb_like"].split("&")
+    )
+
+
+def get_run_detectors(path: str, version: str, first_timestamp: str) -> pd.DataFrame:
+    """
+    Return a table of the germanium detectors present at a given timestamp, with columns 'name', 'det_type', 'mass_in_kg', 'usability' and 'valid_psd'.
+
+    Parameters
+    ----------
+    path : str
+        Path to the processing environment, e.g. '/data2/public/prodenv/prod-blind'.
+    version : str
+        Version of data under inspection, e.g. 'tmp-auto'.
+    first_timestamp : str
+        Timestamp at which metadata are valid, e.g. '20230101T000000Z'.
+    """
+    full_status_map = utils.get_status_map(path, version, first_timestamp, "geds")
+    map_file = os.path.join(path, version, "inputs/hardware/configuration/channelmaps")
+    full_channel_map = TextDB(map_file).on(timestamp=first_timestamp)
+    hpges = list(full_channel_map.group("system").geds.map("name").keys())
+
+    return pd.DataFrame(
+        {
+            "name": hpges,
+            "det_type": [DET_TYPES.get(hpge[0]) for hpge in hpges],
+            "mass_in_kg": [get_diode_mass(path, version, hpge) for hpge in hpges],
+            "usability": [full_status_map[hpge]["usability"] for hpge in hpges],
+            "valid_psd": [is_valid_psd(full_status_map[hpge]["psd"]) for hpge in hpges],
+        }
+    )
+
+
+def get_exposure_table_path(path: str, version: str) -> str:
+    """Return the file storing the run x detector exposure table of a production version (see :func:`get_exposure_table`)."""
+    return os.path.join(
+        utils.EXPOSURE_CACHE_DIR, f"{utils.get_version_key(path, version)}.hdf"
+    )
+
+
+def load_exposure_table(path: str, version: str, signature: str) -> pd.DataFrame | None:
+    """Return the run x detector exposure table of a production version kept in memory or stored on disk, or None if not available or built from metadata with a different signature (see :func:`get_metadata_signature`)."""
+    if (path, version) in EXPOSURE_TABLES:
+        table_signature, table = EXPOSURE_TABLES[(path, version)]
+        return table if table_signature == signature else None
+
+    table_path = get_exposure_table_path(path, version)
+    if not os.path.exists(table_path):
+        return None
+    try:
+        if pd.read_hdf(table_path, key="signature").iloc[0] != signature:
+            utils.logger.debug("... metadata changed, rebuilding %s", table_path)
+            return None
+        return pd.read_hdf(table_path, key="exposure")
+    except (OSError, KeyError, ValueError) as e:
+        utils.logger.debug("... exposure table %s not readable: %s", table_path, e)
+        return None
+
+
+def get_exposure_table(
+    runinfo: dict, period: str, runs: list, path: str, version: str
+) -> pd.DataFrame:
+    """
+    Return a table with one row per run and germanium detector (period, run, start_key, name, det_type, mass_in_kg, usability, valid_psd, livetime_in_d, exposure).
+
+    The table of a production version is kept in memory and stored on disk (see ``utils.EXPOSURE_CACHE_DIR``);
+    metadata are read only for runs that are not in the table yet, or whose start key or livetime changed in ``runinfo``.
+    The whole table is rebuilt once the metadata it was built from change (see :func:`get_metadata_signature`).
+
+    Parameters
+    ----------
+    runinfo : dict
+        Run information (start key and livetime in seconds of 'phy' data), separated by period and run.
+    period : str
+        Period to inspect.
+    runs : list
+        Runs to include in the table.
+    path : str
+        Path to the processing environment, e.g. '/data2/public/prodenv/prod-blind'.
+    version : str
+        Version of data under inspection, e.g. 'tmp-auto'.
+    """
+    signature = get_metadata_signature(path, version)
+    table = load_exposure_table(path, version, signature)
+    run_tables = [] if table is None else [table]
+
+    is_updated = False
+    for run in runs:
+        start_key = runinfo[period][run]["phy"]["start_key"]
+        livetime_in_d = runinfo[period][run]["phy"]["livetime_in_s"] / (60 * 60 * 24)
+        if table is not None:
+            is_run = (table["period"] == period) & (table["run"] == run)
+            if (
+                is_run.any()
+                and (table.loc[is_run, "start_key"] == start_key).all()
+                and np.allclose(table.loc[is_run, "livetime_in_d"], livetime_in_d)
+            ):
+                continue
+            # the run changed: drop its old entries
+            run_tables[0] = run_tables[0][
+                ~((run_tables[0]["period"] == period) & (run_tables[0]["run"] == run))
+            ]
+
+        utils.logger.debug("... adding %s-%s to the exposure table", period, run)
+        run_table = get_run_detectors(path, version, start_key)
+        run_table.insert(0, "period", period)
+        run_table.insert(1, "run", run)
+        run_table.insert(2, "start_key", start_key)
+        run_table["livetime_in_d"] = livetime_in_d
+        run_table["exposure"] = livetime_in_d / 365.25 * run_table["mass_in_kg"]
+        run_tables.append(run_table)
+        is_updated = True
+
+    if not is_updated:
+        EXPOSURE_TABLES[(path, version)] = (signature, table)
+        return table
+
+    table = pd.concat(run_tables, ignore_index=True)
+    EXPOSURE_TABLES[(path, version)] = (signature, table)
+    try:
+        os.makedirs(utils.EXPOSURE_CACHE_DIR, exist_ok=True)
+        table_path = get_exposure_table_path(path, version)
+        tmp_path = f"{table_path}.{os.getpid()}.tmp"
+        table.to_hdf(tmp_path, key="exposure", mode="w")
+        pd.Series([signature]).to_hdf(tmp_path, key="signature")
+        os.replace(tmp_path, table_path)
+    except OSError as e:
+        utils.logger.debug("... exposure table not stored on disk: %s", e)
+
+    return table
+
+
+def get_exposure(table: pd.DataFrame, period: str, runs: list) -> dict:
+    """
+    Return livetime (d), mass (kg) and exposures (kg-yr) of the given runs from a run x detector exposure table (see :func:`get_exposure_table`).
+
+    Exposures are given for AC detectors ('ac'), ON detectors ('on') and ON detectors with valid PSD ('on_valid_psd'),
+    both in total and per detector type ('<key>_dets').
+
+    Parameters
+    ----------
+    table : pd.DataFrame
+        Run x detector exposure table.
+    period : str
+        Period to inspect.
+    runs : list
+        Runs to inspect.
+    """
+    table = table[(table["period"] == period) & table["run"].isin(runs)]
+    is_on = table["usability"] == "on"
+    selections = {
+        "ac": table["usability"] == "ac",
+        "on": is_on,
+        "on_valid_psd": is_on & table["valid_psd"],
+    }
+
+    exposure = {
+        "livetime_in_d": table.drop_duplicates("run")["livetime_in_d"].sum(),
+        "mass_in_kg": table["mass_in_kg"].sum(),
+    }
+    for key, is_selected in selections.items():
+        selected = table[is_selected]
+        exposure[key] = selected["exposure"].sum()
+        per_type = selected.groupby("det_type")["exposure"].sum()
+        exposure[f"{key}_dets"] = {
+            det_type: per_type.get(det_type, 0) for det_type in DET_TYPES.values()
+        }
+
+    return exposure
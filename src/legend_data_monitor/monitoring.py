@@ -43,35 +43,259 @@ plt.rc("axes", facecolor="white", edgecolor="black", axisbelow=True, grid=True)
 IGNORE_KEYS = utils.IGNORE_KEYS
 CALIB_RUNS = utils.CALIB_RUNS
 
+# per-bucket statistics kept for resampled data, with the aggregation used to merge them
+BUCKET_STATS = {
+    "count": "sum",
+    "sum": "sum",
+    "sumsq": "sum",
+    "min": "min",
+    "max": "max",
+}
+# quantiles evaluated for each bucket of resampled data (symmetric around the median)
+BUCKET_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+# quantities tracked by the CUSUM change-point detection, for each direction
+CUSUM_TRACKS = ["cusum", "start", "sum", "n"]
+# quantities tracked to learn the new level of a channel after a change point
+RELEARN_TRACKS = ["learn_left", "learn_sum", "learn_n"]
+# resampled series of each channel needed to draw gain shifts and parameter variations
+DRAWN_PULSER_SERIES = ["kevdiff_av", "kevdiff_std"]
+# minimum number of time buckets defining the reference of the change-point detection
+CHANGE_POINT_MIN_REFERENCE = 20
+# evt fields needed by the event summaries, read at once from each evt file
+EVT_SUMMARY_FIELDS = [
+    "coincident/geds",
+    "coincident/puls",
+    "trigger/is_forced",
+    "trigger/timestamp",
+    "geds/quality/is_bb_like",
+    "geds/quality/is_not_bb_like/is_delayed_discharge",
+    "geds/quality/is_not_bb_like/rawid",
+]
+# QC classifiers whose distributions are inspected, and event types they are split into
+QC_CLASSIFIERS = [
+    "IsValidBlSlopeClassifier",
+    "IsValidTailRmsClassifier",
+    "IsValidPzSlopeClassifier",
+    "IsValidBlSlopeRmsClassifier",
+    "IsValidCuspeminClassifier",
+    "IsValidCuspemaxClassifier",
+]
+QC_EVENT_LABELS = {
+    "All": "All events",
+    "IsPulser": "TP",
+    "IsBsln": "FT",
+    "IsPhysics": "~TP, ~FT, E>25 keV",
+}
+# boolean quality-cut flags summarised in the QC rate table
+QC_FLAGS = [
+    "IsHighlyPositivePolarityCandidate",
+    "IsValidBlSlope",
+    "IsValidBlSlopeRms",
+    "IsValidTailRms",
+    "IsNotNoiseBurst",
+    "IsValidCuspemin",
+    "IsValidCuspemax",
+    "IsValidTrapTpmax",
+    "IsLowCuspemax",
+    "IsDischarge",
+    "IsSaturated",
+]
+
 
 # -------------------------------------------------------------------------
-def qc_distributions(
-    auto_dir_path: str,
-    phy_mtg_data: str,
+def get_qc_histograms_path(output_folder: str, period: str, run: str) -> str:
+    """Return the path of the file storing the QC classifier histograms of a given run."""
+    return os.path.join(
+        output_folder, period, run, f"l200-{period}-{run}-phy-qc_histos.hdf"
+    )
+
+
+def build_qc_histograms(
     output_folder: str,
-    start_key: str,
     period: str,
     run: str,
-    det_info: dict,
-    save_pdf: bool,
-):
-    pars_to_inspect = [
-        "IsValidBlSlopeClassifier",
-        "IsValidTailRmsClassifier",
-        "IsValidPzSlopeClassifier",
-        "IsValidBlSlopeRmsClassifier",
-        "IsValidCuspeminClassifier",
-        "IsValidCuspemaxClassifier",
-    ]
+    pars_to_inspect: list | None = None,
+) -> dict | None:
+    """
+    Build and save the histograms of QC classifiers of a given run, for all channels, classifiers and event types at once.
+
+    Distributions are taken from saved sketches when available; otherwise, all channels of a key are binned in a single pass
+    (see :func:`utils.get_channel_histograms`). Physics events always need the raw data, since an energy cut (E>25 keV) is applied.
+
+    Return a dictionary with:
 
+      - 'counts': counts matrix (rows indexed by 'par', 'evt', 'channel'; one column per bin)
+      - 'totals': number of valid entries (same index as 'counts')
+      - 'edges': the bin edges
+
+    or None if the geds monitoring file does not exist.
+
+    Parameters
+    ----------
+    output_folder : str
+        Path to generated monitoring hdf files.
+    period : str
+        Period to inspect.
+    run : str
+        Run under inspection.
+    pars_to_inspect : list
+        List of QC classifiers to inspect; default: QC_CLASSIFIERS.
+    """
+    pars_to_inspect = pars_to_inspect or QC_CLASSIFIERS
     my_file = os.path.join(
         output_folder, f"{period}/{run}/l200-{period}-{run}-phy-geds.hdf"
     )
-    str_chns = det_info["str_chns"]
-    utils.logger.debug("...inspecting QC classifiers")
     if not os.path.exists(my_file):
         utils.logger.warning(f"...file not found: {my_file}. Return!")
-        return
+        return None
+
+    bins = utils.QC_CLASSIFIER_EDGES
+    sketch_file = utils.get_sketch_path(my_file)
+    counts, totals = [], []
+    with pd.HDFStore(my_file, "r") as store:
+        df_energy_IsPhysics = store["/IsPhysics_TrapemaxCtcCal"]
+        df_energy_IsPhysics = filter_series_by_ignore_keys(
+            df_energy_IsPhysics, utils.IGNORE_KEYS, period
+        )
+        mask = df_energy_IsPhysics > 25
+
+        for par in pars_to_inspect:
+            for evt in QC_EVENT_LABELS:
+                # physics events need an energy cut, not available in sketches
+                sketch = (
+                    None
+                    if evt == "IsPhysics"
+                    else load_sketch_if_not_ignored(sketch_file, f"{evt}_{par}", period)
+                )
+                if sketch is not None:
+                    evt_counts = utils.get_sketch_histogram(sketch, bins)
+                    evt_totals = sketch["moments"].groupby("channel")["count"].sum()
+                else:
+                    df = utils.load_and_filter(
+                        store,
+                        f"/{evt}_{par}",
+                        mask=mask if evt == "IsPhysics" else None,
+                    )
+                    df = filter_series_by_ignore_keys(df, utils.IGNORE_KEYS, period)
+                    evt_counts, evt_totals = utils.get_channel_histograms(df, bins)
+
+                index = pd.MultiIndex.from_product(
+                    [[par], [evt], evt_counts.index], names=["par", "evt", "channel"]
+                )
+                counts.append(
+                    pd.DataFrame(
+                        evt_counts.to_numpy(dtype=float),
+                        index=index,
+                        columns=pd.RangeIndex(len(bins) - 1, name="bin"),
+                    )
+                )
+                totals.append(
+                    pd.Series(
+                        evt_totals.reindex(evt_counts.index, fill_value=0).to_numpy(
+                            dtype=float
+                        ),
+                        index=index,
+                        name="total",
+                    )
+                )
+
+    qc_histograms = {
+        "counts": pd.concat(counts),
+        "totals": pd.concat(totals),
+        "edges": pd.Series(bins, name="edges"),
+    }
+    qc_histograms_path = get_qc_histograms_path(output_folder, period, run)
+    for idx, (key, value) in enumerate(qc_histograms.items()):
+        value.to_hdf(qc_histograms_path, key=key, mode="w" if idx == 0 else "a")
+
+    return qc_histograms
+
+
+def load_qc_histograms(
+    output_folder: str, period: str, run: str, pars_to_inspect: list | None = None
+) -> dict | None:
+    """
+    Return the histograms of QC classifiers of a given run (see :func:`build_qc_histograms`), rebuilding them if missing, older than the geds monitoring file or its sketches, or lacking any of the requested classifiers.
+
+    Parameters
+    ----------
+    output_folder : str
+        Path to generated monitoring hdf files.
+    period : str
+        Period to inspect.
+    run : str
+        Run under inspection.
+    pars_to_inspect : list
+        List of QC classifiers to inspect; default: QC_CLASSIFIERS.
+    """
+    pars_to_inspect = pars_to_inspect or QC_CLASSIFIERS
+    my_file = os.path.join(
+        output_folder, f"{period}/{run}/l200-{period}-{run}-phy-geds.hdf"
+    )
+    qc_histograms_path = get_qc_histograms_path(output_folder, period, run)
+    sources = [my_file, utils.get_sketch_path(my_file)]
+
+    if (
+        os.path.exists(my_file)
+        and os.path.exists(qc_histograms_path)
+        and all(
+            os.path.getmtime(qc_histograms_path) >= os.path.getmtime(source)
+            for source in sources
+            if os.path.exists(source)
+        )
+    ):
+        qc_histograms = {
+            key: utils.read_hdf_cached(qc_histograms_path, key)
+            for key in ["counts", "totals", "edges"]
+        }
+        if all(value is not None for value in qc_histograms.values()) and set(
+            pars_to_inspect
+        ).issubset(qc_histograms["counts"].index.get_level_values("par")):
+            return qc_histograms
+
+    return build_qc_histograms(
+        output_folder,
+        period,
+        run,
+        list(dict.fromkeys(list(QC_CLASSIFIERS) + list(pars_to_inspect))),
+    )
+
+
+def plot_qc_distributions(
+    qc_histograms: dict,
+    output_folder: str,
+    period: str,
+    run: str,
+    det_info: dict,
+    save_pdf: bool,
+    pars_to_inspect: list | None = None,
+):
+    """
+    Plot per-string grids of QC classifier distributions from precomputed histograms (see :func:`build_qc_histograms`).
+
+    Parameters
+    ----------
+    qc_histograms : dict
+        Histograms of QC classifiers, with 'counts', 'totals' and 'edges'.
+    output_folder : str
+        Path to generated monitoring hdf files.
+    period : str
+        Period to inspect.
+    run : str
+        Run under inspection.
+    det_info : dict
+        Dictionary with channel names, IDs, and mapping to string and position.
+    save_pdf : bool
+        True if you want to save pdf files too; default: False.
+    pars_to_inspect : list
+        List of QC classifiers to plot; default: QC_CLASSIFIERS.
+    """
+    pars_to_inspect = pars_to_inspect or QC_CLASSIFIERS
+    str_chns = det_info["str_chns"]
+    detectors = det_info["detectors"]
+    counts_matrix = qc_histograms["counts"]
+    totals_matrix = qc_histograms["totals"]
+    bins = np.asarray(qc_histograms["edges"], dtype=float)
 
     end_folder = os.path.join(
         output_folder,
@@ -85,144 +309,158 @@ def qc_distributions(
         f"l200-{period}-{run}-phy-monitoring",
     )
 
-    step = 0.4
-    with (
-        shelve.open(shelve_path, "c", protocol=pickle.HIGHEST_PROTOCOL) as shelf,
-        pd.HDFStore(my_file, "r") as store,
-    ):
-        df_energy_IsPhysics = store["/IsPhysics_TrapemaxCtcCal"]
-        df_energy_IsPhysics = filter_series_by_ignore_keys(
-            df_energy_IsPhysics, utils.IGNORE_KEYS, period
-        )
+    specs = []
+    for par in pars_to_inspect:
+        if par not in counts_matrix.index.get_level_values("par"):
+            utils.logger.debug("...skipping %s (no histograms)", par)
+            continue
+        histos = {
+            evt: counts_matrix.loc[(par, evt)]
+            for evt in QC_EVENT_LABELS
+            if (par, evt) in counts_matrix.index.droplevel("channel")
+        }
+        totals = {evt: totals_matrix.loc[(par, evt)] for evt in histos}
 
-        for par in pars_to_inspect:
+        for string, det_list in str_chns.items():
+            # only the channels of this string are passed to the renderer
+            channels = [
+                detectors[det]["daq_rawid"] for det in det_list if det in detectors
+            ]
+            specs.append(
+                {
+                    "function": draw_qc_distributions,
+                    "kwargs": {
+                        "histos": {
+                            evt: histo[histo.index.isin(channels)]
+                            for evt, histo in histos.items()
+                        },
+                        "totals": {
+                            evt: total[total.index.isin(channels)]
+                            for evt, total in totals.items()
+                        },
+                        "bins": bins,
+                        "det_list": det_list,
+                        "detectors": {
+                            det: detectors[det] for det in det_list if det in detectors
+                        },
+                        "title": f"{period} - {run} - string {string} - {par}",
+                    },
+                    "formats": ["pdf"] if save_pdf else [],
+                    "savefig": {"bbox_inches": "tight"},
+                    "pdf_path": os.path.join(
+                        output_folder,
+                        f"{period}/{run}/mtg/pdf",
+                        f"st{string}",
+                        f"{period}_{run}_string{string}_{par}.pdf",
+                    ),
+                    "shelf_key": f"{period}_{run}_{par}",
+                }
+            )
 
-            mask = df_energy_IsPhysics > 25
-            df_All = utils.load_and_filter(store, f"/All_{par}")
-            df_IsPulser = utils.load_and_filter(store, f"/IsPulser_{par}")
-            df_IsBsln = utils.load_and_filter(store, f"/IsBsln_{par}")
-            df_IsPhysics = utils.load_and_filter(store, f"/IsPhysics_{par}", mask=mask)
+    rendered = utils.render_figures(specs)
+    # serialize+plot in a shelve object
+    with shelve.open(shelve_path, "c", protocol=pickle.HIGHEST_PROTOCOL) as shelf:
+        utils.save_rendered_figures(specs, rendered, shelf)
 
-            df_All = filter_series_by_ignore_keys(df_All, utils.IGNORE_KEYS, period)
-            df_IsPulser = filter_series_by_ignore_keys(
-                df_IsPulser, utils.IGNORE_KEYS, period
-            )
-            df_IsBsln = filter_series_by_ignore_keys(
-                df_IsBsln, utils.IGNORE_KEYS, period
-            )
-            df_IsPhysics = filter_series_by_ignore_keys(
-                df_IsPhysics, utils.IGNORE_KEYS, period
-            )
 
-            for string, det_list in str_chns.items():
-                # grid size
-                n_dets = len(det_list)
-                ncols = math.ceil(math.sqrt(n_dets))
-                nrows = math.ceil(n_dets / ncols)
+def draw_qc_distributions(
+    histos: dict, totals: dict, bins, det_list: list, detectors: dict, title: str
+):
+    """
+    Draw the grid of QC classifier distributions of the detectors of a string and return the figure.
 
-                fig, axes = plt.subplots(nrows, ncols, figsize=(6 * ncols, 3.5 * nrows))
-                axes = axes.flatten()
+    Parameters
+    ----------
+    histos : dict
+        Counts (channel vs bin) for each event type.
+    totals : dict
+        Number of valid entries per channel for each event type.
+    bins : array-like
+        Bin edges.
+    det_list : list
+        Detectors of the string.
+    detectors : dict
+        Dictionary with detector info (containing 'daq_rawid', 'processable' and 'position') keyed by detector name.
+    title : str
+        Figure title.
+    """
+    # bins within the [-5, 5] acceptance window
+    centers = (bins[:-1] + bins[1:]) / 2
+    in_window = (centers >= -5) & (centers <= 5)
 
-                for i, det in enumerate(det_list):
-                    if det not in det_info["detectors"]:
-                        continue
-                    if not det_info["detectors"][det]["processable"]:
-                        continue
+    # grid size
+    n_dets = len(det_list)
+    ncols = math.ceil(math.sqrt(n_dets))
+    nrows = math.ceil(n_dets / ncols)
 
-                    ax = axes[i]
-                    ch = det_info["detectors"][det]["daq_rawid"]
-                    # not processed detectors
-                    if ch not in df_All.keys():
-                        continue
+    fig, axes = plt.subplots(nrows, ncols, figsize=(6 * ncols, 3.5 * nrows))
+    axes = axes.flatten()
 
-                    vals_all = df_All[ch].values
-                    vals_pulser = df_IsPulser[ch].values
-                    vals_bsln = df_IsBsln[ch].values
-                    vals_phys = df_IsPhysics[ch].values
+    for i, det in enumerate(det_list):
+        if det not in detectors:
+            continue
+        if not detectors[det]["processable"]:
+            continue
 
-                    vals_all = vals_all[~np.isnan(vals_all)]
-                    vals_pulser = vals_pulser[~np.isnan(vals_pulser)]
-                    vals_bsln = vals_bsln[~np.isnan(vals_bsln)]
-                    vals_phys = vals_phys[~np.isnan(vals_phys)]
+        ax = axes[i]
+        ch = detectors[det]["daq_rawid"]
+        # not processed detectors
+        if "All" not in histos or ch not in histos["All"].index:
+            continue
 
-                    # global bins
-                    bins = np.arange(-15, 15 + step, step)
+        for evt, label in QC_EVENT_LABELS.items():
+            counts = (
+                histos[evt].loc[ch].to_numpy()
+                if evt in histos and ch in histos[evt].index
+                else np.zeros(len(bins) - 1)
+            )
+            total = totals[evt].get(ch, 0) if evt in totals else 0
+            # percentages
+            perc = 100 * counts[in_window].sum() / total if total else np.nan
+
+            # plotting
+            ax.stairs(counts, bins, label=f"{label} - {perc:.1f}%")
+
+        ax.axvline(-5, color="k", linestyle="--")
+        ax.axvline(5, color="k", linestyle="--")
+        ax.axvspan(-15, -5, color="darkgray", alpha=0.2)
+        ax.axvspan(5, 15, color="darkgray", alpha=0.2)
+        ax.set_ylabel("Counts")
+        ax.set_xlabel("Classifiers")
+        ax.legend(
+            title=f"{det} (pos {detectors[det]['position']})",
+            loc="upper right",
+        )
+        ax.set_yscale("log")
+        ax.grid(False)
+        ax.set_xlim(-10, 10)
 
-                    # percentages
-                    perc_all = 100 * np.mean((vals_all >= -5) & (vals_all <= 5))
-                    perc_pulser = 100 * np.mean(
-                        (vals_pulser >= -5) & (vals_pulser <= 5)
-                    )
-                    perc_bsln = 100 * np.mean((vals_bsln >= -5) & (vals_bsln <= 5))
-                    perc_phys = 100 * np.mean((vals_phys >= -5) & (vals_phys <= 5))
-
-                    # plotting
-                    ax.hist(
-                        vals_all,
-                        bins=bins,
-                        label=f"All events - {perc_all:.1f}%",
-                        histtype="step",
-                        facecolor="g",
-                    )
-                    ax.hist(
-                        vals_pulser,
-                        bins=bins,
-                        label=f"TP - {perc_pulser:.1f}%",
-                        histtype="step",
-                        facecolor="g",
-                    )
-                    ax.hist(
-                        vals_bsln,
-                        bins=bins,
-                        label=f"FT - {perc_bsln:.1f}%",
-                        histtype="step",
-                        facecolor="g",
-                    )
-                    ax.hist(
-                        vals_phys,
-                        bins=bins,
-                        label=f"~TP, ~FT, E>25 keV - {perc_phys:.1f}%",
-                        histtype="step",
-                        facecolor="g",
-                    )
+    # hide any unused subplots
+    for j in range(i + 1, len(axes)):
+        axes[j].axis("off")
 
-                    ax.axvline(-5, color="k", linestyle="--")
-                    ax.axvline(5, color="k", linestyle="--")
-                    ax.axvspan(-15, -5, color="darkgray", alpha=0.2)
-                    ax.axvspan(5, 15, color="darkgray", alpha=0.2)
-                    ax.set_ylabel("Counts")
-                    ax.set_xlabel("Classifiers")
-                    ax.legend(
-                        title=f"{det} (pos {det_info['detectors'][det]['position']})",
-                        loc="upper right",
-                    )
-                    ax.set_yscale("log")
-                    ax.grid(False)
-                    ax.set_xlim(-10, 10)
+    fig.suptitle(title)
+    fig.tight_layout()
 
-                # hide any unused subplots
-                for j in range(i + 1, len(axes)):
-                    axes[j].axis("off")
+    return fig
 
-                fig.suptitle(f"{period} - {run} - string {string} - {par}")
-                fig.tight_layout()
 
-                if save_pdf:
-                    pdf_folder = os.path.join(
-                        output_folder, f"{period}/{run}/mtg/pdf", f"st{string}"
-                    )
-                    os.makedirs(pdf_folder, exist_ok=True)
-                    plt.savefig(
-                        os.path.join(
-                            pdf_folder,
-                            f"{period}_{run}_string{string}_{par}.pdf",
-                        ),
-                        bbox_inches="tight",
-                    )
+def qc_distributions(
+    auto_dir_path: str,
+    phy_mtg_data: str,
+    output_folder: str,
+    start_key: str,
+    period: str,
+    run: str,
+    det_info: dict,
+    save_pdf: bool,
+):
+    utils.logger.debug("...inspecting QC classifiers")
+    qc_histograms = load_qc_histograms(output_folder, period, run)
+    if qc_histograms is None:
+        return
 
-                # serialize+plot in a shelve object
-                shelf[f"{period}_{run}_{par}"] = pickle.dumps(fig)
-                plt.close()
+    plot_qc_distributions(qc_histograms, output_folder, period, run, det_info, save_pdf)
 
 
 def qc_ft_failure_rates(
@@ -328,6 +566,184 @@ def percent_to_mhz(pct, avg_total_forced_mhz):
     return (pct / 100) * avg_total_forced_mhz
 
 
+def count_by_bucket(
+    timestamps: np.ndarray, masks: dict, resampling_time: str
+) -> pd.DataFrame:
+    """
+    Count events selected by each boolean mask in time buckets.
+
+    Return a dataframe indexed by the (naive, UTC) start of the buckets, with one column per mask; only buckets with at least one event are kept.
+
+    Parameters
+    ----------
+    timestamps : np.ndarray
+        Event timestamps (unix seconds).
+    masks : dict
+        Dictionary of boolean arrays (same length as 'timestamps') selecting the events to count.
+    resampling_time : str
+        Width of the time buckets, eg '1h'.
+    """
+    width = pd.Timedelta(resampling_time).total_seconds()
+    buckets, inverse = np.unique(np.floor(timestamps / width), return_inverse=True)
+    counts = {
+        name: np.bincount(inverse, weights=mask, minlength=len(buckets)).astype(int)
+        for name, mask in masks.items()
+    }
+
+    return pd.DataFrame(
+        counts, index=pd.to_datetime(buckets * width, unit="s").as_unit("ns")
+    )
+
+
+def count_channels_by_bucket(
+    timestamps: np.ndarray, rawids: ak.Array, resampling_time: str
+) -> pd.DataFrame:
+    """
+    Count the occurrences of each channel in time buckets, given per-event lists of channels.
+
+    Return a dataframe indexed by the (naive, UTC) start of the buckets, with one column per channel; only buckets and channels with at least one occurrence are kept.
+
+    Parameters
+    ----------
+    timestamps : np.ndarray
+        Event timestamps (unix seconds).
+    rawids : ak.Array
+        Jagged array with the list of channels of each event.
+    resampling_time : str
+        Width of the time buckets, eg '1h'.
+    """
+    width = pd.Timedelta(resampling_time).total_seconds()
+    flat_rawids = ak.to_numpy(ak.flatten(rawids))
+    flat_buckets = np.repeat(
+        np.floor(timestamps / width), ak.to_numpy(ak.num(rawids, axis=1))
+    )
+    if len(flat_rawids) == 0:
+        return pd.DataFrame()
+
+    buckets, bucket_idx = np.unique(flat_buckets, return_inverse=True)
+    channels, channel_idx = np.unique(flat_rawids, return_inverse=True)
+    counts = np.bincount(
+        bucket_idx * len(channels) + channel_idx,
+        minlength=len(buckets) * len(channels),
+    ).reshape(len(buckets), len(channels))
+
+    return pd.DataFrame(
+        counts,
+        index=pd.to_datetime(buckets * width, unit="s").as_unit("ns"),
+        columns=channels,
+    )
+
+
+def get_evt_summary(
+    evt_files: list, resampling_time: str = "1h", window_ms: float = 10
+) -> dict:
+    """
+    Summarise evt files in time buckets, reading the needed fields (see EVT_SUMMARY_FIELDS) only once per file.
+
+    Return a dictionary with two dataframes indexed by the (naive, UTC) start of the buckets on a contiguous grid:
+
+      - 'events': number of forced triggers ('forced'), of forced triggers surviving QC ('forced_survived'),
+        of geds non-pulser non-forced events ('all') and of those being delayed discharges ('discharges'),
+        passing ('qc_pass') or failing ('qc_fail') QC among the non-discharge ones;
+        number of dead time windows opened by delayed discharges ('dead_windows', see :func:`get_dead_time_starts`)
+        and corresponding dead time percentage over the time covered by events in each bucket ('dead_time')
+      - 'ft_failures': number of forced triggers failing QC in which each channel (columns) is flagged
+
+    Parameters
+    ----------
+    evt_files : list
+        List of evt files.
+    resampling_time : str
+        Width of the time buckets; default: '1h'.
+    window_ms : float
+        Dead time window after each delayed discharge; default: 10 ms.
+    """
+    window = window_ms / 1000.0
+    next_available = -np.inf
+    t_first, t_last = np.inf, -np.inf
+    events, ft_failures = [], []
+    for evt_file in evt_files:
+        evt = read_as("evt", evt_file, "ak", field_mask=EVT_SUMMARY_FIELDS)
+        timestamps = ak.to_numpy(evt.trigger.timestamp)
+        is_forced = ak.to_numpy(evt.trigger.is_forced)
+        is_bb = ak.to_numpy(evt.geds.quality.is_bb_like)
+        is_dis = ak.to_numpy(evt.geds.quality.is_not_bb_like.is_delayed_discharge)
+        is_geds = ak.to_numpy(evt.coincident.geds) & ~ak.to_numpy(evt.coincident.puls)
+
+        if len(timestamps) == 0:
+            continue
+        t_first = min(t_first, timestamps.min())
+        t_last = max(t_last, timestamps.max())
+
+        evt_all = is_geds & ~is_forced
+        ft_failing = is_forced & ~is_bb & ~is_dis
+        counts = count_by_bucket(
+            timestamps,
+            {
+                "forced": is_forced,
+                "forced_survived": is_forced & is_bb & ~is_dis,
+                "all": evt_all,
+                "discharges": evt_all & is_dis,
+                "qc_pass": evt_all & ~is_dis & is_bb,
+                "qc_fail": evt_all & ~is_dis & ~is_bb,
+            },
+            resampling_time,
+        )
+        # dead time windows, carried over from the previous file
+        starts, next_available = get_dead_time_starts(
+            np.sort(timestamps[is_dis]), window, next_available
+        )
+        counts["dead_windows"] = count_by_bucket(
+            starts, {"dead_windows": np.ones(len(starts), dtype=bool)}, resampling_time
+        )["dead_windows"]
+        events.append(counts.fillna(0).astype(int))
+        ft_failures.append(
+            count_channels_by_bucket(
+                timestamps[ft_failing],
+                evt.geds.quality.is_not_bb_like.rawid[ft_failing],
+                resampling_time,
+            )
+        )
+
+    events = pd.concat(events).groupby(level=0).sum() if events else pd.DataFrame()
+    ft_failures = [df for df in ft_failures if not df.empty]
+    ft_failures = (
+        pd.concat(ft_failures).groupby(level=0).sum().fillna(0).astype(int)
+        if ft_failures
+        else pd.DataFrame()
+    )
+    if events.empty:
+        return {"events": events, "ft_failures": ft_failures}
+
+    grid = pd.date_range(events.index.min(), events.index.max(), freq=resampling_time)
+    events = events.reindex(grid, fill_value=0)
+    # dead time over the time covered by events in each bucket
+    width = pd.Timedelta(resampling_time).total_seconds()
+    bucket_start = grid.as_unit("ns").asi8 / 1e9
+    span = np.minimum(bucket_start + width, t_last) - np.maximum(bucket_start, t_first)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        events["dead_time"] = np.where(
+            span > 0, events["dead_windows"] * window / span * 100, np.nan
+        )
+    # failures span their own range, as done when resampling failing events only
+    if not ft_failures.empty:
+        ft_failures = ft_failures.reindex(
+            grid[(grid >= ft_failures.index.min()) & (grid <= ft_failures.index.max())],
+            fill_value=0,
+        )
+
+    return {"events": events, "ft_failures": ft_failures}
+
+
+def trim_zero_buckets(counts: pd.Series) -> pd.Series:
+    """Return bucketed counts restricted to the range between the first and last non-empty bucket."""
+    non_empty = counts.index[counts > 0]
+    if non_empty.empty:
+        return counts.iloc[:0]
+
+    return counts.loc[non_empty.min() : non_empty.max()]
+
+
 def qc_and_evt_summary_plots(
     auto_dir_path: str,
     phy_mtg_data: str,
@@ -348,47 +764,13 @@ def qc_and_evt_summary_plots(
             glob.glob(f"{auto_dir_path}/generated/tier/pet/phy/{period}/{run}/*.lh5")
         )
 
-    # energies  = read_as("evt/geds", evt_files_phy, 'ak', field_mask=['energy'])
-    ged_pul = read_as(
-        "evt/coincident", evt_files_phy, "ak", field_mask=["geds", "puls"]
-    )
-    forced = read_as(
-        "evt/trigger", evt_files_phy, "ak", field_mask=["is_forced", "timestamp"]
-    )
-    is_bb = read_as(
-        "evt/geds/quality",
-        evt_files_phy,
-        "ak",
-        field_mask=["is_bb_like", "is_bb_like_old", "is_good_channel"],
-    )
-    is_dis = read_as(
-        "evt/geds/quality/is_not_bb_like",
-        evt_files_phy,
-        "ak",
-        field_mask=["is_delayed_discharge"],
-    )
-    is_fail = read_as(
-        "evt/geds/quality/is_not_bb_like",
-        evt_files_phy,
-        "ak",
-        field_mask=["is_empty_bits", "rawid"],
-    )
-
-    # build dataframe for FT FAILING events
-    mask = forced.is_forced & ~is_bb.is_bb_like & ~is_dis.is_delayed_discharge
-    temp = is_fail.rawid[mask]
-    y = {ch: np.zeros(len(forced.timestamp[mask])) for ch in set(ak.flatten(temp))}
-    for i in range(len(temp)):
-        if len(temp[i]) == 0:
-            continue
-        for ch in temp[i]:
-            y[ch][i] += 1
-    y["timestamp"] = ak.to_numpy(forced.timestamp[mask])
+    if not evt_files_phy:
+        utils.logger.warning(f"...no evt files found for {period}-{run}. Return!")
+        return
 
-    df = pd.DataFrame(y)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")
-    df.set_index("timestamp", inplace=True)
-    daily_cnt = df.resample("H").sum()
+    evt_summary = get_evt_summary(evt_files_phy, "1h")
+    events = evt_summary["events"]
+    daily_cnt = evt_summary["ft_failures"]
 
     # Folders
     end_folder = os.path.join(output_folder, period, run, "mtg")
@@ -399,12 +781,7 @@ def qc_and_evt_summary_plots(
     color_cycle = itertools.cycle(plt.cm.tab20.colors)
 
     # --- all forced triggers (denominator across all strings)
-    df_all = pd.DataFrame(
-        {"timestamp": ak.to_numpy(forced.timestamp[forced.is_forced])}
-    )
-    df_all["timestamp"] = pd.to_datetime(df_all["timestamp"], unit="s")
-    df_all.set_index("timestamp", inplace=True)
-    total_forced = df_all.resample("H").size()  # counts/hour, all strings
+    total_forced = trim_zero_buckets(events["forced"])  # counts/hour, all strings
     avg_total_forced_mhz = (total_forced.mean() / 3600) * 1000
     on_mass = 0
 
@@ -490,14 +867,7 @@ def qc_and_evt_summary_plots(
         plt.close(fig)
 
         # --- FT survival fraction ---
-        mask_forced = forced.is_forced
-        mask_survived = mask_forced & is_bb.is_bb_like & ~is_dis.is_delayed_discharge
-        ts_all = pd.to_datetime(forced.timestamp[mask_forced], unit="s")
-        ts_survived = pd.to_datetime(forced.timestamp[mask_survived], unit="s")
-        df_all = pd.DataFrame({"count": 1}, index=ts_all)
-        df_survived = pd.DataFrame({"count": 1}, index=ts_survived)
-        total_forced = df_all.resample("H").sum()["count"]
-        surviving = df_survived.resample("H").sum()["count"]
+        surviving = trim_zero_buckets(events["forced_survived"])
         surviving_frac = surviving / total_forced * 100
         fig, ax = plt.subplots(figsize=(12, 6))
 
@@ -521,39 +891,24 @@ def qc_and_evt_summary_plots(
         # --- Event rates ---
         fig, ax = plt.subplots(figsize=(10, 3.5))
 
-        mask2 = (
-            ged_pul.geds
-            & ~ged_pul.puls
-            & ~forced.is_forced
-            & ~is_dis.is_delayed_discharge
-        )
-        ser = pd.to_datetime(
-            forced.timestamp[ged_pul.geds & ~ged_pul.puls & ~forced.is_forced], unit="s"
-        )
-        ser_dis = pd.to_datetime(
-            forced.timestamp[
-                ged_pul.geds
-                & ~ged_pul.puls
-                & ~forced.is_forced
-                & is_dis.is_delayed_discharge
-            ],
-            unit="s",
-        )
-        ser_pass = pd.to_datetime(forced.timestamp[mask2 & is_bb.is_bb_like], unit="s")
-        ser_fail = pd.to_datetime(forced.timestamp[mask2 & ~is_bb.is_bb_like], unit="s")
-
-        for s, label, color in [
-            (ser, "All events", "dimgrey"),
-            (ser_dis, "Delayed discharges", "darkorange"),
-            (ser_fail, "Failing QC", "crimson"),
-            (ser_pass, "Surviving QC", "dodgerblue"),
+        for name, label, color in [
+            ("all", "All events", "dimgrey"),
+            ("discharges", "Delayed discharges", "darkorange"),
+            ("qc_fail", "Failing QC", "crimson"),
+            ("qc_pass", "Surviving QC", "dodgerblue"),
         ]:
-            if s.empty:
+            freq = trim_zero_buckets(events[name])
+            if freq.empty:
                 continue
-            freq, bin_edges = np.histogram(
-                s, bins=pd.date_range(start=s.min(), end=s.max(), freq="H")
+            bin_edges = freq.index.append(
+                pd.DatetimeIndex([freq.index[-1] + pd.Timedelta("1h")])
+            )
+            ax.stairs(
+                freq.values / 3600 * 1000 / on_mass,
+                bin_edges,
+                label=label,
+                color=color,
             )
-            ax.stairs(freq / 3600 * 1000 / on_mass, bin_edges, label=label, color=color)
 
         ax.set_ylabel("Hourly rate normalized by ON mass (mHz/kg)")
         ax.legend(title=f"ON mass = {on_mass:.1f} kg", loc="upper right")
@@ -596,8 +951,10 @@ def box_summary_plot(
         Calibration results for each detector.
     det_info : dict
         Dictionary with channel names, IDs, and mapping to string and position.
-    results : dict
+    results : dict | pd.DataFrame
         Dictionary with arrays values (per detector); None if invalid.
+        Alternatively, a dataframe with 'mean', 'std', 'min' and 'max' values per detector (index), eg as returned by :func:`utils.get_sketch_summary`,
+        so that distributions over long time ranges are summarized without loading full series.
     info : dict
         Dictionary containing info on a parameter basis (eg label name, file title, colours, limits, ...).
     output_dir : str
@@ -612,13 +969,17 @@ def box_summary_plot(
     utils.logger.debug("...making summary box plots for %s", info["title"])
     detectors = det_info["detectors"]
     plot_data = []
+    if isinstance(results, pd.DataFrame):
+        results = dict(results.iterrows())
     for ged, item in results.items():
         if ged not in detectors:
             continue
 
         meta_info = detectors[ged]
 
-        if item is None or len(item) == 0:
+        if isinstance(item, pd.Series):
+            mean, std, min_val, max_val = item[["mean", "std", "min", "max"]]
+        elif item is None or len(item) == 0:
             mean = std = min_val = max_val = np.nan
         else:
             mean = np.nanmean(item)
@@ -650,6 +1011,47 @@ def box_summary_plot(
     # sort by string, and then position
     df = df_plot.sort_values(["string", "pos"]).reset_index(drop=True)
 
+    spec = {
+        "function": draw_box_summary,
+        "kwargs": {"df": df, "info": info, "period": period, "run": run},
+        "formats": ["pdf"] if save_pdf else [],
+        "savefig": {"bbox_inches": "tight"},
+        "pdf_path": os.path.join(
+            output_dir, f"{period}/{run}/mtg/pdf", f"{period}_{run}_{info['title']}.pdf"
+        ),
+        "shelf_key": f"{period}_{run}_{info['title']}",
+    }
+    rendered = utils.render_figures([spec])
+
+    # serialize+plot in a shelve object
+    with shelve.open(
+        os.path.join(
+            output_dir,
+            period,
+            run,
+            f"mtg/l200-{period}-{run}-{data_type}-monitoring",
+        ),
+        "c",
+        protocol=pickle.HIGHEST_PROTOCOL,
+    ) as shelf:
+        utils.save_rendered_figures([spec], rendered, shelf)
+
+
+def draw_box_summary(df: pd.DataFrame, info: dict, period: str, run: str):
+    """
+    Draw the box plot summary prepared by :func:`box_summary_plot` and return the figure.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Summary values ('mean', 'std', 'min', 'max', 'fwhm') per detector ('ged'), sorted by string and position.
+    info : dict
+        Dictionary containing info on a parameter basis (eg label name, file title, colours, limits, ...).
+    period : str
+        Period to inspect.
+    run : str
+        Run to inspect.
+    """
     fig, ax = plt.subplots(figsize=(12, 6))
     x = np.arange(len(df))
     if not df["fwhm"].isna().all():
@@ -738,32 +1140,44 @@ def box_summary_plot(
 
     plt.tight_layout()
 
-    if save_pdf:
-        pdf_folder = os.path.join(output_dir, f"{period}/{run}/mtg/pdf")
-        os.makedirs(pdf_folder, exist_ok=True)
-        plt.savefig(
-            os.path.join(
-                pdf_folder,
-                f"{period}_{run}_{info['title']}.pdf",
-            ),
-            bbox_inches="tight",
-        )
+    return fig
 
-    # serialize+plot in a shelve object
-    serialized_plot = pickle.dumps(fig)
-    with shelve.open(
-        os.path.join(
-            output_dir,
-            period,
-            run,
-            f"mtg/l200-{period}-{run}-{data_type}-monitoring",
-        ),
-        "c",
-        protocol=pickle.HIGHEST_PROTOCOL,
-    ) as shelf:
-        shelf[f"{period}_{run}_{info['title']}"] = serialized_plot
 
-    plt.close()
+def get_dead_time_starts(
+    times: np.ndarray, window: float, next_available: float = -np.inf
+) -> tuple:
+    """
+    Return the times at which a non-extending dead time window opens, ie the discharges occurring after the previous window has closed, and the time at which the last window closes.
+
+    Window starts are found without looping over discharges: each discharge points to the first one outside its window,
+    and the chain of pointers from the first discharge is followed by repeated pointer doubling.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        Sorted discharge times (s).
+    window : float
+        Dead time window after each discharge (s).
+    next_available : float
+        Time at which a window opened in a previous chunk closes; default: -inf.
+    """
+    times = np.asarray(times, dtype=float)
+    times = times[times >= next_available]
+    n_times = len(times)
+    if n_times == 0:
+        return times, next_available
+
+    # first discharge outside the window of each discharge (n_times if none)
+    jump = np.append(np.searchsorted(times, times + window, side="left"), n_times)
+    starts = np.array([0])
+    while True:
+        starts = np.union1d(starts, jump[starts])
+        jump = jump[jump]
+        if jump[0] == n_times:
+            break
+    starts = times[starts[starts < n_times]]
+
+    return starts, starts[-1] + window
 
 
 def compute_dead_time(df, window_ms=10):
@@ -777,26 +1191,178 @@ def compute_dead_time(df, window_ms=10):
     window_ms : float
         Dead time window after each discharge; default: 10 ms.
     """
-    times = df.index.view("int64") / 1e9
+    times = df.index.as_unit("ns").asi8 / 1e9
     dt_total = times[-1] - times[0]
 
     discharge_times = times[df.any(axis=1).to_numpy()]
     if len(discharge_times) == 0:
         return 0.0
 
-    lost_time = 0.0
     window = window_ms / 1000.0
-    next_available = -np.inf
+    starts, _ = get_dead_time_starts(discharge_times, window)
 
-    for t in discharge_times:
-        if t >= next_available:
-            lost_time += window
-            next_available = t + window  # veto until then
-
-    lost_time = len(discharge_times) * (window_ms / 1000.0)
+    lost_time = len(starts) * window
     return lost_time / dt_total * 100
 
 
+def get_qc_rates_path(output_folder: str, period: str, run: str) -> str:
+    """Return the path of the QC rate table of a given run."""
+    return os.path.join(
+        output_folder, period, run, f"l200-{period}-{run}-phy-qc_rates.hdf"
+    )
+
+
+def build_qc_rate_table(
+    output_folder: str,
+    period: str,
+    run: str,
+    pars_to_inspect: list | None = None,
+    resampling_time: str = "1h",
+) -> dict | None:
+    """
+    Build and save the QC rate table of a given run, reading each QC flag of the geds monitoring file only once.
+
+    The table is a dictionary of long-format dataframes:
+
+      - 'rates': number of events passing each flag and corresponding rate (mHz) per time bucket (columns 'flag', 'channel', 'datetime', 'count', 'rate')
+      - 'averages': number of events passing each flag over the whole run, run duration (s) and average rate (mHz) (columns 'flag', 'channel', 'count', 'duration', 'rate')
+      - 'flags': inspected flags, including the ones missing in the geds file
+
+    Return None if the geds monitoring file does not exist.
+
+    Parameters
+    ----------
+    output_folder : str
+        Path to generated monitoring hdf files.
+    period : str
+        Period to inspect.
+    run : str
+        Run under inspection.
+    pars_to_inspect : list
+        List of parameters (boolean flags) to inspect; default: QC_FLAGS.
+    resampling_time : str
+        Width of the time buckets; default: '1h'.
+    """
+    pars_to_inspect = pars_to_inspect or QC_FLAGS
+    my_file = os.path.join(
+        output_folder, f"{period}/{run}/l200-{period}-{run}-phy-geds.hdf"
+    )
+    if not os.path.exists(my_file):
+        utils.logger.warning(f"...file not found: {my_file}. Return!")
+        return None
+
+    bucket_seconds = pd.Timedelta(resampling_time).total_seconds()
+    rates, averages = [], []
+    with pd.HDFStore(my_file, "r") as store:
+        for par in pars_to_inspect:
+            key = f"/IsPhysics_{par}"
+            if key not in store:
+                utils.logger.debug("...skipping %s (not found in HDF)", par)
+                continue
+
+            geds_df_abs = store[key]
+            geds_df_abs = filter_series_by_ignore_keys(
+                geds_df_abs, utils.IGNORE_KEYS, period
+            )
+            if geds_df_abs.empty:
+                utils.logger.debug("...skipping %s (no entries left)", par)
+                continue
+
+            # bucketed counts of all channels at once
+            counts = (
+                geds_df_abs.resample(resampling_time)
+                .sum()
+                .rename_axis(index="datetime", columns="channel")
+                .stack()
+                .rename("count")
+                .reset_index()
+            )
+            counts["rate"] = counts["count"] / bucket_seconds * 1000
+            counts.insert(0, "flag", par)
+            rates.append(counts)
+
+            # time span
+            time_min, time_max = geds_df_abs.index.min(), geds_df_abs.index.max()
+            diff = (time_max - time_min).total_seconds()
+
+            totals = geds_df_abs.sum(axis=0).rename_axis("channel").rename("count")
+            totals = totals.reset_index()
+            totals["duration"] = diff
+            totals["rate"] = totals["count"] / diff * 1000
+            totals.insert(0, "flag", par)
+            averages.append(totals)
+
+    rates_columns = ["flag", "channel", "datetime", "count", "rate"]
+    averages_columns = ["flag", "channel", "count", "duration", "rate"]
+    qc_rates = {
+        "rates": (
+            pd.concat(rates, ignore_index=True)
+            if rates
+            else pd.DataFrame(columns=rates_columns)
+        )[rates_columns],
+        "averages": (
+            pd.concat(averages, ignore_index=True)
+            if averages
+            else pd.DataFrame(columns=averages_columns)
+        ),
+        "flags": pd.Series(list(pars_to_inspect), dtype=object),
+    }
+
+    qc_rates_path = get_qc_rates_path(output_folder, period, run)
+    for idx, (key, value) in enumerate(qc_rates.items()):
+        value.to_hdf(qc_rates_path, key=key, mode="w" if idx == 0 else "a")
+
+    return qc_rates
+
+
+def load_qc_rate_table(
+    output_folder: str,
+    period: str,
+    run: str,
+    pars_to_inspect: list | None = None,
+) -> dict | None:
+    """
+    Return the QC rate table of a given run (see :func:`build_qc_rate_table`), rebuilding it if missing, older than the geds monitoring file, or lacking any of the requested flags.
+
+    Parameters
+    ----------
+    output_folder : str
+        Path to generated monitoring hdf files.
+    period : str
+        Period to inspect.
+    run : str
+        Run under inspection.
+    pars_to_inspect : list
+        List of parameters (boolean flags) to inspect; default: QC_FLAGS.
+    """
+    pars_to_inspect = pars_to_inspect or QC_FLAGS
+    my_file = os.path.join(
+        output_folder, f"{period}/{run}/l200-{period}-{run}-phy-geds.hdf"
+    )
+    qc_rates_path = get_qc_rates_path(output_folder, period, run)
+
+    if (
+        os.path.exists(my_file)
+        and os.path.exists(qc_rates_path)
+        and os.path.getmtime(qc_rates_path) >= os.path.getmtime(my_file)
+    ):
+        qc_rates = {
+            key: utils.read_hdf_cached(qc_rates_path, key)
+            for key in ["rates", "averages", "flags"]
+        }
+        if all(value is not None for value in qc_rates.values()) and set(
+            pars_to_inspect
+        ).issubset(qc_rates["flags"]):
+            return qc_rates
+
+    return build_qc_rate_table(
+        output_folder,
+        period,
+        run,
+        list(dict.fromkeys(list(QC_FLAGS) + list(pars_to_inspect))),
+    )
+
+
 def qc_average(
     auto_dir_path: str,
     output_folder: str,
@@ -827,29 +1393,15 @@ def qc_average(
         List of parameters (boolean flags) to inspect.
     """
     if pars_to_inspect is None:
-        pars_to_inspect = [
-            "IsHighlyPositivePolarityCandidate",
-            "IsValidBlSlope",
-            "IsValidBlSlopeRms",
-            "IsValidTailRms",
-            "IsNotNoiseBurst",
-            "IsValidCuspemin",
-            "IsValidCuspemax",
-            "IsValidTrapTpmax",
-            "IsLowCuspemax",
-            "IsDischarge",
-            "IsSaturated",
-        ]
+        pars_to_inspect = QC_FLAGS
 
-    my_file = os.path.join(
-        output_folder, f"{period}/{run}/l200-{period}-{run}-phy-geds.hdf"
-    )
     detectors = det_info["detectors"]
     str_chns = det_info["str_chns"]
     utils.logger.debug("...inspecting QC average values")
-    if not os.path.exists(my_file):
-        utils.logger.warning(f"...file not found: {my_file}. Return!")
+    qc_rates = load_qc_rate_table(output_folder, period, run, pars_to_inspect)
+    if qc_rates is None:
         return
+    averages = qc_rates["averages"]
 
     end_folder = os.path.join(
         output_folder,
@@ -863,27 +1415,15 @@ def qc_average(
         f"l200-{period}-{run}-phy-monitoring",
     )
 
-    with (
-        shelve.open(shelve_path, "c", protocol=pickle.HIGHEST_PROTOCOL) as shelf,
-        pd.HDFStore(my_file, "r") as store,
-    ):
+    with shelve.open(shelve_path, "c", protocol=pickle.HIGHEST_PROTOCOL) as shelf:
         for par in pars_to_inspect:
-            key = f"/IsPhysics_{par}"
-            if key not in store:
+            par_averages = averages[averages["flag"] == par]
+            if par_averages.empty:
                 utils.logger.debug("...skipping %s (not found in HDF)", par)
                 continue
 
-            geds_df_abs = store[key]
-            geds_df_abs = filter_series_by_ignore_keys(
-                geds_df_abs, utils.IGNORE_KEYS, period
-            )
-
-            # time span
-            time_min, time_max = geds_df_abs.index.min(), geds_df_abs.index.max()
-            diff = (time_max - time_min).total_seconds()
-
             # rates in mHz
-            rates = geds_df_abs.sum(axis=0) / diff * 1000
+            rates = par_averages.set_index("channel")["rate"]
 
             fig, ax = plt.subplots(figsize=(12, 4), sharex=True)
             x_labels, xs, ys = [], [], []
@@ -981,28 +1521,15 @@ def qc_time_series(
         List of parameters (boolean flags) to inspect.
     """
     if pars_to_inspect is None:
-        pars_to_inspect = [
-            "IsHighlyPositivePolarityCandidate",
-            "IsValidBlSlope",
-            "IsValidBlSlopeRms",
-            "IsValidTailRms",
-            "IsNotNoiseBurst",
-            "IsValidCuspemin",
-            "IsValidCuspemax",
-            "IsValidTrapTpmax",
-            "IsLowCuspemax",
-            "IsDischarge",
-            "IsSaturated",
-        ]
-    my_file = os.path.join(
-        output_folder, f"{period}/{run}/l200-{period}-{run}-phy-geds.hdf"
-    )
+        pars_to_inspect = QC_FLAGS
     detectors = det_info["detectors"]
     str_chns = det_info["str_chns"]
     utils.logger.debug("...inspecting QC time series")
-    if not os.path.exists(my_file):
-        utils.logger.warning(f"...file not found: {my_file}. Return!")
+    qc_rates = load_qc_rate_table(output_folder, period, run, pars_to_inspect)
+    if qc_rates is None:
         return
+    rates = qc_rates["rates"]
+    averages = qc_rates["averages"]
 
     end_folder = os.path.join(
         output_folder,
@@ -1018,21 +1545,19 @@ def qc_time_series(
 
     color_cycle = itertools.cycle(plt.cm.tab20.colors)
 
-    with (
-        shelve.open(shelve_path, "c", protocol=pickle.HIGHEST_PROTOCOL) as shelf,
-        pd.HDFStore(my_file, "r") as store,
-    ):
+    with shelve.open(shelve_path, "c", protocol=pickle.HIGHEST_PROTOCOL) as shelf:
 
         for par in pars_to_inspect:
-            key = f"/IsPhysics_{par}"
-            if key not in store:
-                utils.logger.debug("...skipping %s (not found in HDF)", key)
+            par_averages = averages[averages["flag"] == par]
+            if par_averages.empty:
+                utils.logger.debug("...skipping %s (not found in HDF)", par)
                 continue
 
-            geds_df_abs = store[key]
-            geds_df_abs = filter_series_by_ignore_keys(
-                geds_df_abs, utils.IGNORE_KEYS, period
-            )
+            average_rates = par_averages.set_index("channel")["rate"]
+            hourly_rates = {
+                rawid: group.set_index("datetime")["rate"]
+                for rawid, group in rates[rates["flag"] == par].groupby("channel")
+            }
 
             for string, channel_list in str_chns.items():
                 fig, ax = plt.subplots(figsize=(12, 4))
@@ -1042,19 +1567,14 @@ def qc_time_series(
                     rawid = det["daq_rawid"]
                     pos = det["position"]
 
-                    if rawid not in geds_df_abs.columns:
+                    if rawid not in hourly_rates:
                         utils.logger.debug(
                             f"{channel_name} ({rawid}) missing in dataframe for {par}"
                         )
                         continue
 
-                    data = geds_df_abs[rawid].copy()
-                    true_count = data.sum()
-                    time_min, time_max = data.index.min(), data.index.max()
-                    diff = (time_max - time_min).total_seconds()
-
-                    true_rate_mHz = round(true_count / diff * 1000, 2)
-                    hourly_rate = data.resample("1H").sum() / 3600 * 1000
+                    true_rate_mHz = round(average_rates[rawid], 2)
+                    hourly_rate = hourly_rates[rawid].rename(rawid)
 
                     color = next(color_cycle)
                     hourly_rate.plot(
@@ -1573,6 +2093,8 @@ def read_if_key_exists(hdf_path: str, key: str) -> pd.DataFrame | None:
     """
     Read an HDF dataset if the key exists, otherwise return None; handle the case where the parameter is saved under either '/key' or 'key'.
 
+    Reads go through the process-wide cache of :func:`utils.read_hdf_cached`, so unchanged files are parsed only once.
+
     Parameters
     ----------
     hdf_path : str
@@ -1580,14 +2102,7 @@ def read_if_key_exists(hdf_path: str, key: str) -> pd.DataFrame | None:
     key : str
         Key to inspect.
     """
-    with pd.HDFStore(hdf_path, mode="r") as f:
-        try:
-            return f[key]
-        except KeyError:
-            try:
-                return f["/" + key]
-            except KeyError:
-                return None
+    return utils.read_hdf_cached(hdf_path, key)
 
 
 def get_dfs(phy_mtg_data: str, period: str, run_list: list, parameter: str):
@@ -1619,14 +2134,16 @@ def get_dfs(phy_mtg_data: str, period: str, run_list: list, parameter: str):
         run_dir = os.path.join(base_dir, r)
 
         # geds file
-        hdf_geds = find_hdf_file(run_dir, include=["geds"], exclude=["res", "min"])
+        hdf_geds = find_hdf_file(
+            run_dir, include=["geds"], exclude=["res", "min", "sketch", "state"]
+        )
         if hdf_geds:
             geds_abs = read_if_key_exists(hdf_geds, f"IsPulser_{parameter}")
             if geds_abs is not None:
                 geds_df_cuspEmax_abs.append(geds_abs)
 
-            geds_puls_abs = read_if_key_exists(
-                hdf_geds, f"IsPulser_{parameter}_pulser01anaDiff"
+            geds_puls_abs = utils.read_aux_variant(
+                hdf_geds, f"IsPulser_{parameter}", "pulser01ana", "Diff"
             )
             if geds_puls_abs is not None:
                 geds_df_cuspEmax_abs_corr.append(geds_puls_abs)
@@ -1635,7 +2152,7 @@ def get_dfs(phy_mtg_data: str, period: str, run_list: list, parameter: str):
 
         # pulser file
         hdf_puls = find_hdf_file(
-            run_dir, include=["pulser01ana"], exclude=["res", "min"]
+            run_dir, include=["pulser01ana"], exclude=["res", "min", "sketch", "state"]
         )
         if hdf_puls:
             puls_abs = read_if_key_exists(hdf_puls, f"IsPulser_{parameter}")
@@ -1693,7 +2210,9 @@ def get_traptmax_tp0est(phy_mtg_data: str, period: str, run_list: list):
         run_dir = os.path.join(base_dir, r)
 
         # geds
-        hdf_geds = find_hdf_file(run_dir, include=["geds"], exclude=["res", "min"])
+        hdf_geds = find_hdf_file(
+            run_dir, include=["geds"], exclude=["res", "min", "sketch", "state"]
+        )
         if hdf_geds:
             trapTmax = read_if_key_exists(hdf_geds, "IsPulser_TrapTmax")
             if trapTmax is not None:
@@ -1705,7 +2224,7 @@ def get_traptmax_tp0est(phy_mtg_data: str, period: str, run_list: list):
 
         # pulser
         hdf_puls = find_hdf_file(
-            run_dir, include=["pulser01ana"], exclude=["res", "min"]
+            run_dir, include=["pulser01ana"], exclude=["res", "min", "sketch", "state"]
         )
         if hdf_puls:
             trapTmax = read_if_key_exists(hdf_puls, "IsPulser_TrapTmax")
@@ -1772,6 +2291,36 @@ def filter_series_by_ignore_keys(
     return series_to_filter
 
 
+def load_sketch_if_not_ignored(sketch_file: str, key: str, period: str):
+    """
+    Load a histogram sketch (see :func:`utils.build_sketch`) if none of its time buckets overlaps the time ranges to ignore for the given period; return None otherwise, or if the sketch does not exist.
+
+    Parameters
+    ----------
+    sketch_file : str
+        Path to the HDF file storing the sketches.
+    key : str
+        Key of the sketch, eg 'IsPulser_IsValidBlSlopeClassifier'.
+    period : str
+        Period to check for keys to ignore.
+    """
+    sketch = utils.load_sketch(sketch_file, key)
+    if sketch is None or period not in IGNORE_KEYS:
+        return sketch
+
+    buckets = pd.to_datetime(sketch["moments"]["datetime"])
+    first, last = buckets.min(), buckets.max() + pd.Timedelta("60min")
+    for ki, kf in zip(
+        IGNORE_KEYS[period]["start_keys"], IGNORE_KEYS[period]["stop_keys"]
+    ):
+        isolated_ki = pd.to_datetime(ki.replace("Z", "+0000"), format="%Y%m%dT%H%M%S%z")
+        isolated_kf = pd.to_datetime(kf.replace("Z", "+0000"), format="%Y%m%dT%H%M%S%z")
+        if isolated_ki <= last and isolated_kf >= first:
+            return None
+
+    return sketch
+
+
 def filter_by_period(series: pd.Series, period: str | list) -> pd.Series:
     """
     Return a series filtered by ignore keys for the given period(s).
@@ -1865,6 +2414,8 @@ def get_pulser_data(
     """
     Return a dictionary of geds and pulser filtered dataframes for which a time resampling is performed.
 
+    This is the single-channel case of :func:`get_all_pulser_data`.
+
     Parameters
     ----------
     resampling_time : str
@@ -1880,14 +2431,91 @@ def get_pulser_data(
     variations : bool
         True if you want to retrieve % variations (default: False).
     """
+    return get_all_pulser_data(
+        resampling_time, period, dfs, [channel], escale, variations
+    )[channel]
+
+
+def get_drawn_pulser_data(pulser_data: dict | None) -> dict | None:
+    """
+    Return the resampled series of a channel needed to draw it (see ``DRAWN_PULSER_SERIES``), out of the geds and pulser data returned by :func:`get_pulser_data`.
+
+    Plot specs are sent to worker processes (see :func:`utils.render_figures`): only the series actually drawn are kept,
+    without the full (not resampled) ones.
+
+    Parameters
+    ----------
+    pulser_data : dict
+        Resampled geds and pulser data of a channel, as returned by :func:`get_pulser_data`.
+    """
+    if pulser_data is None:
+        return None
+
+    return {
+        name: {key: series[key] for key in DRAWN_PULSER_SERIES}
+        for name, series in pulser_data.items()
+    }
+
+
+def get_available_rawids(str_chns: dict, detectors: dict, df: pd.DataFrame) -> list:
+    """
+    Return the rawids of the detectors listed string by string that are present in the columns of the given dataframe.
+
+    Parameters
+    ----------
+    str_chns : dict
+        Dictionary mapping strings to the list of their detector names.
+    detectors : dict
+        Dictionary with detector info (containing 'daq_rawid') keyed by detector name.
+    df : pd.DataFrame
+        Dataframe with rawids as columns.
+    """
+    columns = set(df.columns)
+    rawids = [
+        np.int64(detectors[channel_name]["daq_rawid"])
+        for det_list in str_chns.values()
+        for channel_name in det_list
+    ]
+
+    return [rawid for rawid in dict.fromkeys(rawids) if rawid in columns]
+
+
+def get_all_pulser_data(
+    resampling_time: str,
+    period: str | list,
+    dfs: list,
+    channels: list,
+    escale: float,
+    variations=False,
+) -> dict:
+    """
+    Return, for several channels at once and keyed by channel, a dictionary of geds and pulser filtered dataframes for which a time resampling is performed.
+
+    Spike removal, reference averages, resampling and pulser correction are evaluated on the wide geds dataframe in a single pass, while the pulser series is processed only once; per-channel outputs are then sliced out of the wide results.
+
+    Parameters
+    ----------
+    resampling_time : str
+        Resampling time, eg '1HH' or '10T'.
+    period : str | list
+        Period or list of periods to inspect.
+    dfs : list
+        List of dataframes for geds and pulser events.
+    channels : list
+        Channels to inspect.
+    escale : float
+        Scaling factor used to compute relative differences in gain and calibration constant.
+    variations : bool
+        True if you want to retrieve % variations (default: False).
+    """
     # geds
-    ser_ged_cusp = dfs[0][channel].sort_index()
-    ser_ged_cusp = filter_by_period(ser_ged_cusp, period)
+    geds_cusp = dfs[0][list(channels)].sort_index()
+    geds_cusp = filter_by_period(geds_cusp, period)
     ser_pul_tp0est_new = pd.DataFrame()
 
-    if ser_ged_cusp.empty:
-        utils.logger.debug("...geds series is empty after filtering")
-        return None
+    if geds_cusp.empty:
+        utils.logger.debug("...geds dataframe is empty after filtering")
+        return {channel: None for channel in channels}
 
     # check if these dfs are empty or not - if not, then remove spikes
     if isinstance(dfs[6], pd.DataFrame) and not dfs[6].empty:
@@ -1900,36 +2528,33 @@ def get_pulser_data(
         ser_pul_tp0est_new = ser_pul_tp0est[mask]
 
         if not ser_pul_tp0est_new.empty:
-            valid_idx = ser_ged_cusp.index.intersection(ser_pul_tp0est_new.index)
-            ser_ged_cusp = ser_ged_cusp.reindex(valid_idx)
-
-    # if before, potential mismatches with ser_pul_tp0est
-    ser_ged_cusp = ser_ged_cusp.dropna()
-    # compute average over the first 10% of elements
-    n_elements = max(int(len(ser_ged_cusp) * 0.10), 1)
-    ged_cusp_av = np.nanmean(ser_ged_cusp.iloc[:n_elements])
-    if np.isnan(ged_cusp_av):
-        utils.logger.debug("...the geds average is NaN")
-        return None
-
-    ser_ged_cuspdiff, ser_ged_cuspdiff_kev = compute_diff_and_rescaling(
-        ser_ged_cusp, ged_cusp_av, escale, variations
+            valid_idx = geds_cusp.index.intersection(ser_pul_tp0est_new.index)
+            geds_cusp = geds_cusp.reindex(valid_idx)
+
+    # average over the first 10% of the non-NaN elements of each channel
+    valid = geds_cusp.notna()
+    n_valid = valid.sum()
+    n_elements = np.maximum((n_valid * 0.10).astype(int), 1)
+    first_elements = valid & (valid.cumsum() <= n_elements)
+    geds_cusp_av = geds_cusp.where(first_elements).mean()
+
+    geds_cuspdiff, geds_cuspdiff_kev = compute_diff_and_rescaling(
+        geds_cusp, geds_cusp_av, escale, variations
     )
 
     # hour counts masking
-    mask = ser_ged_cusp.resample(resampling_time).count() > 0
+    mask = geds_cusp.resample(resampling_time).count() > 0
 
-    # resample geds series
-    ged_cusp_hr_av, ged_cusp_hr_std = resample_series(
-        ser_ged_cuspdiff_kev, resampling_time, mask
+    # resample geds dataframe
+    geds_cusp_hr_av, geds_cusp_hr_std = resample_series(
+        geds_cuspdiff_kev, resampling_time, mask
     )
-    ged_index = ged_cusp_hr_av.index
 
     # pulser series
     ser_pul_cusp = ser_pul_cuspdiff = ser_pul_cuspdiff_kev = pul_cusp_hr_av = (
         pul_cusp_hr_std
     ) = None
-    ged_cusp_corr = ged_cusp_corr_kev = ged_cusp_cor_hr_av = ged_cusp_cor_hr_std = None
+    geds_cusp_cor_hr_av = geds_cusp_cor_hr_std = None
     # ...if pulser is available:
     if not dfs[2].empty:
         ser_pul_cusp = dfs[2][1027203].sort_index()
@@ -1953,99 +2578,748 @@ def get_pulser_data(
                 ser_pul_cusp, pul_cusp_av, escale, variations
             )
 
+            # channel masks are applied once the pulser is aligned to each channel
             pul_cusp_hr_av, pul_cusp_hr_std = resample_series(
-                ser_pul_cuspdiff_kev, resampling_time, mask
+                ser_pul_cuspdiff_kev,
+                resampling_time,
+                ser_pul_cusp.resample(resampling_time).count() > 0,
             )
-            pul_cusp_hr_av = pul_cusp_hr_av.reindex(ged_index)
-            pul_cusp_hr_std = pul_cusp_hr_std.reindex(ged_index)
 
             # corrected GED
-            common_index = ser_ged_cuspdiff.index.intersection(ser_pul_cuspdiff.index)
-            ged_cusp_corr = (
-                ser_ged_cuspdiff[common_index] - ser_pul_cuspdiff[common_index]
+            common_index = geds_cuspdiff.index.intersection(ser_pul_cuspdiff.index)
+            geds_cusp_corr = geds_cuspdiff.loc[common_index].sub(
+                ser_pul_cuspdiff[common_index], axis=0
             )
+            geds_cusp_cor_hr_av, geds_cusp_cor_hr_std = resample_series(
+                geds_cusp_corr * escale, resampling_time, mask
+            )
+
+    bins = mask.index
+    results = {}
+    for channel in channels:
+        channel_valid = valid[channel]
+        if not channel_valid.any():
+            utils.logger.debug("...the geds average is NaN")
+            results[channel] = None
+            continue
+
+        # resampled range spanned by this channel alone
+        valid_times = geds_cusp.index[channel_valid.values]
+        first_bin = bins.searchsorted(valid_times[0], side="right") - 1
+        last_bin = bins.searchsorted(valid_times[-1], side="right")
+        ged_cusp_hr_av = geds_cusp_hr_av[channel].iloc[first_bin:last_bin]
+        ged_cusp_hr_std = geds_cusp_hr_std[channel].iloc[first_bin:last_bin]
+        ged_index = ged_cusp_hr_av.index
+        channel_mask = mask[channel].iloc[first_bin:last_bin].values
+
+        pul_cusp_hr_av_ch = pul_cusp_hr_std_ch = None
+        ged_cusp_corr = ged_cusp_corr_kev = None
+        ged_cusp_cor_hr_av = ged_cusp_cor_hr_std = None
+        if pul_cusp_hr_av is not None:
+            pul_cusp_hr_av_ch = pul_cusp_hr_av.reindex(ged_index)
+            pul_cusp_hr_std_ch = pul_cusp_hr_std.reindex(ged_index)
+            pul_cusp_hr_av_ch[~channel_mask] = np.nan
+            pul_cusp_hr_std_ch[~channel_mask] = np.nan
+
+            ged_cusp_corr = geds_cusp_corr[channel][
+                channel_valid.reindex(common_index).values
+            ].rename(None)
             ged_cusp_corr_kev = ged_cusp_corr * escale
-            ged_cusp_cor_hr_av, ged_cusp_cor_hr_std = resample_series(
-                ged_cusp_corr_kev, resampling_time, mask
+            ged_cusp_cor_hr_av = (
+                geds_cusp_cor_hr_av[channel].reindex(ged_index).rename(None)
+            )
+            ged_cusp_cor_hr_std = (
+                geds_cusp_cor_hr_std[channel].reindex(ged_index).rename(None)
             )
-            ged_cusp_cor_hr_av = ged_cusp_cor_hr_av.reindex(ged_index)
-            ged_cusp_cor_hr_std = ged_cusp_cor_hr_std.reindex(ged_index)
 
-    return {
-        "ged": {
-            "cusp": ser_ged_cusp,
-            "cuspdiff": ser_ged_cuspdiff,
-            "cuspdiff_kev": ser_ged_cuspdiff_kev,
-            "kevdiff_av": ged_cusp_hr_av,
-            "kevdiff_std": ged_cusp_hr_std,
-        },
-        "pul_cusp": {
-            "raw": ser_pul_cusp,
-            "rawdiff": ser_pul_cuspdiff,
-            "kevdiff": ser_pul_cuspdiff_kev,
-            "kevdiff_av": pul_cusp_hr_av,
-            "kevdiff_std": pul_cusp_hr_std,
-        },
-        "diff": {
-            "raw": None,
-            "rawdiff": ged_cusp_corr,
-            "kevdiff": ged_cusp_corr_kev,
-            "kevdiff_av": ged_cusp_cor_hr_av,
-            "kevdiff_std": ged_cusp_cor_hr_std,
-        },
-    }
+        results[channel] = {
+            "ged": {
+                "cusp": geds_cusp[channel][channel_valid],
+                "cuspdiff": geds_cuspdiff[channel][channel_valid],
+                "cuspdiff_kev": geds_cuspdiff_kev[channel][channel_valid],
+                "kevdiff_av": ged_cusp_hr_av,
+                "kevdiff_std": ged_cusp_hr_std,
+            },
+            "pul_cusp": {
+                "raw": ser_pul_cusp,
+                "rawdiff": ser_pul_cuspdiff,
+                "kevdiff": ser_pul_cuspdiff_kev,
+                "kevdiff_av": pul_cusp_hr_av_ch,
+                "kevdiff_std": pul_cusp_hr_std_ch,
+            },
+            "diff": {
+                "raw": None,
+                "rawdiff": ged_cusp_corr,
+                "kevdiff": ged_cusp_corr_kev,
+                "kevdiff_av": ged_cusp_cor_hr_av,
+                "kevdiff_std": ged_cusp_cor_hr_std,
+            },
+        }
+
+    return results
 
 
-def build_new_files(generated_path: str, period: str, run: str, data_type="phy"):
-    """
-    Generate and store resampled HDF files for a given data run and extract summary info.
+def get_quantile_name(quantile: float) -> str:
+    """Return the name used to store a given quantile of the bucket statistics, eg 'q05' for 0.05."""
+    return f"q{round(quantile * 100):02d}"
 
-    This function:
 
-      - loads the original `.hdf` file for the specified `period` and `run`
-      - extracts available keys from the HDF file
-      - resamples all applicable time series data into multiple time intervals (10min, 60min)
-      - stores each resampled dataset into a separate HDF file
-      - extracts metadata from the 'info' key and saves it as a .yaml file
+def get_bucket_stats(df: pd.DataFrame, resample_unit: str) -> dict:
+    """
+    Return per-bucket aggregate statistics (count, sum, sum of squares, min, max) of a time-indexed dataframe.
+
+    Buckets are aligned to ``df.index.floor(resample_unit)``, ie the same bins used by ``df.resample(resample_unit)``; empty buckets are not stored.
 
     Parameters
     ----------
-    generated_path : str
-        Root directory where the data is stored and where new files will be written.
-    period : str
-        Period (e.g. 'p03') used to construct paths.
-    run : str
-        Run (e.g. 'r001') used to construct paths.
-    data_type : str
-        Data type to load; default: 'phy'.
+    df : pd.DataFrame
+        Time-indexed dataframe (datetime vs channel), eg a key of the monitoring HDF files.
+    resample_unit : str
+        Bucket width, eg '10min'.
     """
-    data_file = os.path.join(
-        generated_path,
-        "generated/plt/hit",
-        data_type,
-        period,
-        run,
-        f"l200-{period}-{run}-{data_type}-geds.hdf",
-    )
+    df = df.astype(float)
+    df.index = pd.to_datetime(df.index)
+    grouped = df.groupby(df.index.floor(resample_unit))
 
-    if not os.path.exists(data_file):
-        utils.logger.debug(f"File not found: {data_file}. Exit here.")
-        sys.exit()
+    return {
+        "count": grouped.count().astype(float),
+        "sum": grouped.sum(),
+        "sumsq": (df**2).groupby(df.index.floor(resample_unit)).sum(),
+        "min": grouped.min(),
+        "max": grouped.max(),
+    }
 
-    with h5py.File(data_file, "r") as f:
-        my_keys = list(f.keys())
 
-    info_dict = {"keys": my_keys}
+def get_bucket_quantiles(df: pd.DataFrame, resample_unit: str) -> dict:
+    """
+    Return per-bucket quantiles (see ``BUCKET_QUANTILES``) of a time-indexed dataframe, with the same buckets of :func:`get_bucket_stats`.
 
-    resampling_times = ["10min", "60min"]
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Time-indexed dataframe (datetime vs channel), eg a key of the monitoring HDF files.
+    resample_unit : str
+        Bucket width, eg '10min'.
+    """
+    df = df.astype(float)
+    df.index = pd.to_datetime(df.index)
+    grouped = df.groupby(df.index.floor(resample_unit))
+
+    return {get_quantile_name(q): grouped.quantile(q) for q in BUCKET_QUANTILES}
+
+
+def merge_bucket_stats(stats: list, resample_unit: str | None = None) -> dict:
+    """
+    Merge (and optionally coarsen) a list of bucket statistics as returned by :func:`get_bucket_stats`.
+
+    Statistics referring to the same bucket are combined exactly; buckets and channels missing in some of the inputs are allowed.
+    Quantiles cannot be merged and are dropped.
+
+    Parameters
+    ----------
+    stats : list
+        List of dictionaries of bucket statistics; None entries are skipped.
+    resample_unit : str
+        If provided, buckets are re-aligned to this (coarser) width, eg '60min'; default: None.
+    """
+    stats = [s for s in stats if s is not None]
+    merged = {}
+    for stat, how in BUCKET_STATS.items():
+        df = pd.concat([s[stat] for s in stats])
+        grouper = df.index if resample_unit is None else df.index.floor(resample_unit)
+        merged[stat] = df.groupby(grouper).agg(how)
+
+    return merged
+
+
+def rescale_bucket_stats(stats: dict, scale: pd.Series, offset: float) -> dict:
+    """
+    Return the bucket statistics of ``scale * x + offset`` given the ones of ``x``, with a scale factor defined per channel.
+
+    Quantiles, if present, are transformed too.
+
+    Parameters
+    ----------
+    stats : dict
+        Dictionary of bucket statistics as returned by :func:`get_bucket_stats` (and :func:`get_bucket_quantiles`).
+    scale : pd.Series
+        Scale factor for each channel (column).
+    offset : float
+        Offset added to all values.
+    """
+    rescaled = {}
+    if "count" in stats:
+        scale = scale.reindex(stats["count"].columns).astype(float)
+        count, total = stats["count"], stats["sum"]
+        rescaled["count"] = count.copy()
+        rescaled["sum"] = total.mul(scale, axis=1) + offset * count
+        rescaled["sumsq"] = (
+            stats["sumsq"].mul(scale**2, axis=1)
+            + total.mul(2 * offset * scale, axis=1)
+            + offset**2 * count
+        )
+
+    # min and max (and symmetric quantiles) are swapped for negative scale factors
+    pairs = [("min", "max"), ("max", "min")] + [
+        (get_quantile_name(q), get_quantile_name(1 - q)) for q in BUCKET_QUANTILES
+    ]
+    for stat, stat_swapped in pairs:
+        if stat not in stats:
+            continue
+        channel_scale = scale.reindex(stats[stat].columns).astype(float)
+        swap = np.broadcast_to((channel_scale < 0).to_numpy(), stats[stat].shape)
+        rescaled[stat] = (stats[stat].mul(channel_scale, axis=1) + offset).mask(
+            swap, stats[stat_swapped].mul(channel_scale, axis=1) + offset
+        )
+
+    return rescaled
+
+
+def get_resampled_frames(stats: dict, resample_unit: str) -> dict:
+    """
+    Return the resampled mean, count, std, min, max and quantile values from bucket statistics.
+
+    Each dataframe is defined on the same contiguous time grid produced by ``df.resample(resample_unit)``, with the same conventions (eg std with one degree of freedom, zero count for empty buckets).
+
+    Parameters
+    ----------
+    stats : dict
+        Dictionary of bucket statistics as returned by :func:`get_bucket_stats` (and :func:`get_bucket_quantiles`).
+    resample_unit : str
+        Bucket width, eg '10min'.
+    """
+    count = stats["count"]
+    valid_count = count.where(count > 0)
+    mean = stats["sum"] / valid_count
+    variance = (stats["sumsq"] - stats["sum"] ** 2 / valid_count) / (valid_count - 1)
+
+    frames = {
+        "mean": mean,
+        "count": count,
+        "std": np.sqrt(variance.clip(lower=0).where(count > 1)),
+        "min": stats["min"],
+        "max": stats["max"],
+    }
+    frames.update(
+        {
+            get_quantile_name(q): stats[get_quantile_name(q)]
+            for q in BUCKET_QUANTILES
+            if get_quantile_name(q) in stats
+        }
+    )
+    if mean.empty:
+        return frames
+
+    grid = pd.date_range(
+        mean.index.min(), mean.index.max(), freq=resample_unit, name=mean.index.name
+    )
+    frames = {name: df.reindex(grid) for name, df in frames.items()}
+    frames["count"] = frames["count"].fillna(0)
+
+    return frames
+
+
+def load_bucket_state(state_file: str):
+    """
+    Load the bookkeeping table and the bucket statistics of each key stored in a resampling state file.
+
+    Return an empty bookkeeping table and an empty dictionary if the file does not exist.
+
+    Parameters
+    ----------
+    state_file : str
+        Path to the HDF file storing the resampling state.
+    """
+    bookkeeping = pd.DataFrame(columns=["n_rows", "n_open", "fingerprint"])
+    state = {}
+    if not os.path.exists(state_file):
+        return bookkeeping, state
+
+    with pd.HDFStore(state_file, mode="r") as store:
+        if "/bookkeeping" in store.keys():
+            bookkeeping = store["/bookkeeping"]
+        for path in store.keys():
+            if path == "/bookkeeping" or "/change_points/" in path:
+                continue
+            k, unit, stat = path.lstrip("/").split("/")
+            state.setdefault(k, {}).setdefault(unit.replace("res_", ""), {})[stat] = (
+                store[path]
+            )
+
+    return bookkeeping, state
+
+
+def load_change_point_state(state_file: str) -> dict:
+    """
+    Load the change-point detection state of each key stored in a resampling state file (see :func:`save_bucket_state`).
+
+    Return a dictionary with, for each key, the state of :func:`detect_change_points` ('reference' and 'tracks'),
+    the alerts raised so far ('alerts') and the last processed time bucket ('last'); empty if the file does not exist.
+
+    Parameters
+    ----------
+    state_file : str
+        Path to the HDF file storing the resampling state.
+    """
+    change_points = {}
+    if not os.path.exists(state_file):
+        return change_points
+
+    with pd.HDFStore(state_file, mode="r") as store:
+        for path in store.keys():
+            if "/change_points/" not in path:
+                continue
+            k, _, name = path.lstrip("/").split("/")
+            change_points.setdefault(k, {})[name] = store[path]
+
+    for k, cp_state in change_points.items():
+        cp_state["reference"] = {
+            "mean": cp_state["reference"]["mean"],
+            "sigma": cp_state["reference"]["sigma"],
+        }
+        cp_state["last"] = cp_state["last"].iloc[0]
+
+    return change_points
+
+
+def save_bucket_state(
+    state_file: str,
+    bookkeeping: pd.DataFrame,
+    state: dict,
+    change_points: dict | None = None,
+):
+    """
+    Save the bookkeeping table, the bucket statistics and the change-point detection state of each key in a resampling state file.
+
+    The file is written from scratch in a temporary location and then moved, so that an interrupted cycle never leaves a corrupted state behind.
+
+    Parameters
+    ----------
+    state_file : str
+        Path to the HDF file storing the resampling state.
+    bookkeeping : pd.DataFrame
+        Table with the number of processed rows, the first row of the last (open) bucket and the fingerprint of the last processed row for each key.
+    state : dict
+        Dictionary of bucket statistics for each key and resampling time.
+    change_points : dict
+        Dictionary of change-point detection states for each key (see :func:`load_change_point_state`); default: None.
+    """
+    tmp_file = state_file + ".tmp"
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    with pd.HDFStore(tmp_file, mode="w") as store:
+        store.put("bookkeeping", bookkeeping)
+        for k, unit_stats in state.items():
+            for unit, stats in unit_stats.items():
+                for stat, df in stats.items():
+                    store.put(f"{k}/res_{unit}/{stat}", df)
+        for k, cp_state in (change_points or {}).items():
+            store.put(
+                f"{k}/change_points/reference", pd.DataFrame(cp_state["reference"])
+            )
+            store.put(f"{k}/change_points/tracks", cp_state["tracks"])
+            store.put(f"{k}/change_points/alerts", cp_state["alerts"])
+            store.put(f"{k}/change_points/last", pd.Series([cp_state["last"]]))
+
+    os.replace(tmp_file, state_file)
+
+
+def get_row_fingerprint(df: pd.DataFrame) -> float:
+    """Return a cheap fingerprint (nan-sum of values) of the last row of a dataframe, used to detect rewritten keys."""
+    if df.empty:
+        return 0.0
+
+    return float(np.nansum(df.iloc[[-1]].astype(float).to_numpy()))
+
+
+def get_change_point_reference(
+    df: pd.DataFrame,
+    fraction: float = 0.1,
+    min_rows: int = CHANGE_POINT_MIN_REFERENCE,
+) -> dict | None:
+    """
+    Return the reference level (median) and noise (scaled median absolute deviation, or std if null) of each channel over the first ``fraction`` of the rows of a time-indexed dataframe.
+
+    The reference window contains at least ``min_rows`` rows; None is returned if ``df`` is shorter than that.
+    Channels with less than ``min_rows / 2`` valid values in the reference window, or without any spread (eg constant values),
+    have a NaN sigma, ie they are masked in :func:`detect_change_points`.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Time-indexed dataframe (datetime vs channel), eg resampled mean values.
+    fraction : float
+        Fraction of rows (time buckets) defining the reference window; default: 0.1.
+    min_rows : int
+        Minimum number of rows (time buckets) defining the reference window; default: ``CHANGE_POINT_MIN_REFERENCE``.
+    """
+    if len(df) < min_rows:
+        return None
+
+    ref = df.iloc[: max(int(len(df) * fraction), min_rows)].astype(float)
+    mean = ref.median()
+    sigma = 1.4826 * (ref - mean).abs().median()
+    sigma = sigma.where(sigma > 0, ref.std())
+    sigma = sigma.where((sigma > 0) & (ref.count() >= min_rows / 2))
+
+    return {"mean": mean, "sigma": sigma}
+
+
+def detect_change_points(
+    df: pd.DataFrame,
+    reference: dict | None = None,
+    state: dict | None = None,
+    k: float = 0.5,
+    h: float = 15.0,
+    z_max: float = 4.0,
+    n_learn: int = CHANGE_POINT_MIN_REFERENCE,
+):
+    """
+    Detect level shifts of all channels at once with a two-sided CUSUM on standardized values.
+
+    Values are standardized with a per-channel reference (see :func:`get_change_point_reference`); an alert is raised
+    when the cumulative sum of deviations larger than ``k`` exceeds ``h`` (both in units of sigma); standardized values are clipped
+    at ``z_max`` in the sums, so that single outliers do not raise alerts by themselves.
+    After an alert, the sums are reset and the new level of the channel is learnt over the next ``n_learn`` valid values
+    (without looking for changes), so that a persistent shift is not reported again and again.
+    Time steps are iterated once, with all channels processed together as numpy arrays; NaN values leave the sums unchanged.
+    Channels with a null or NaN sigma in the reference are masked (no alerts).
+
+    With the default settings, noise-only channels give about one false alarm every 2e5 time buckets,
+    while 1 (3) sigma shifts are detected after about 27 (6) time buckets.
+
+    Return the alert table, with one row per alert (columns 'channel', 'start' = estimated change time, 'detected' = alert time,
+    'direction' = +1/-1, 'shift' = mean shift since the estimated change, in the units of the data), and the state needed to continue
+    the detection on later data (streaming).
+    If no reference is given and ``df`` is too short to evaluate one, the detection is skipped: the alert table is empty and the state is None.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Time-indexed dataframe (datetime vs channel), eg resampled mean values.
+    reference : dict
+        Dictionary with 'mean' and 'sigma' series (index channel); default: None, ie evaluated over the first 10% of ``df`` (see :func:`get_change_point_reference`).
+    state : dict
+        State returned by a previous call, to continue the detection on later data; if provided, its reference is used.
+    k : float
+        Allowed slack, in units of sigma; default: 0.5 (optimal to detect 1 sigma shifts).
+    h : float
+        Decision threshold, in units of sigma; default: 15.
+    z_max : float
+        Maximum absolute standardized value entering the sums; default: 4.
+    n_learn : int
+        Number of valid values over which the new level is learnt after an alert; default: ``CHANGE_POINT_MIN_REFERENCE``.
+    """
+    channels = df.columns
+    alerts = []
+    if state is not None:
+        reference = state["reference"]
+    elif reference is None:
+        reference = get_change_point_reference(df)
+    if reference is None:
+        return get_alert_table(alerts, pd.DatetimeIndex(df.index)), None
+    mean = reference["mean"].reindex(channels).to_numpy(dtype=float)
+    sigma = reference["sigma"].reindex(channels).to_numpy(dtype=float)
+    sigma = np.where(sigma > 0, sigma, np.nan)
+
+    # for each direction: cumulative sum, estimated change time (ns), sum and number of standardized values since then
+    tracks = pd.DataFrame(
+        0,
+        index=channels,
+        columns=[f"{n}_{d}" for n in CUSUM_TRACKS for d in [1, -1]] + RELEARN_TRACKS,
+    )
+    if state is not None:
+        tracks = state["tracks"].reindex(channels).fillna(0)
+    tracks = {c: tracks[c].to_numpy(dtype=float) for c in tracks.columns}
+    tracks.update({c: tracks[c].astype(np.int64) for c in tracks if "start" in c})
+
+    times = pd.DatetimeIndex(df.index)
+    times_ns = times.as_unit("ns").asi8
+    values = df.to_numpy(dtype=float)
+    for t in range(len(values)):
+        z_t = (values[t] - mean) / sigma
+        valid = ~np.isnan(z_t)
+        # after an alert, the new level is learnt over the next buckets, without looking for changes
+        learning = tracks["learn_left"] > 0
+        is_learnt = valid & learning
+        tracks["learn_sum"] = tracks["learn_sum"] + np.where(is_learnt, values[t], 0)
+        tracks["learn_n"] = tracks["learn_n"] + is_learnt
+        tracks["learn_left"] = tracks["learn_left"] - is_learnt
+        mean = np.where(
+            is_learnt & (tracks["learn_left"] == 0),
+            tracks["learn_sum"] / np.maximum(tracks["learn_n"], 1),
+            mean,
+        )
+        valid &= ~learning
+        z_t = np.where(valid, z_t, 0)
+        # single outliers cannot raise an alert by themselves
+        z_clip = np.clip(z_t, -z_max, z_max)
+        alerted = np.zeros(len(channels), dtype=bool)
+        for d in [1, -1]:
+            cusum = tracks[f"cusum_{d}"]
+            new_cusum = np.where(valid, np.maximum(0, cusum + d * z_clip - k), cusum)
+            # the change is estimated to start after the last time the sum was null
+            restart = valid & (cusum == 0) & (new_cusum > 0)
+            tracks[f"start_{d}"] = np.where(restart, times_ns[t], tracks[f"start_{d}"])
+            dev_sum = np.where(restart, 0, tracks[f"sum_{d}"]) + z_t
+            n_dev = np.where(restart, 0, tracks[f"n_{d}"]) + valid
+
+            is_alert = new_cusum > h
+            for i in np.flatnonzero(is_alert):
+                alerts.append(
+                    {
+                        "channel": channels[i],
+                        "start": tracks[f"start_{d}"][i],
+                        "detected": times_ns[t],
+                        "direction": d,
+                        "shift": dev_sum[i] / n_dev[i] * sigma[i],
+                    }
+                )
+
+            is_reset = is_alert | (new_cusum == 0)
+            tracks[f"cusum_{d}"] = np.where(is_alert, 0, new_cusum)
+            tracks[f"sum_{d}"] = np.where(is_reset, 0, dev_sum)
+            tracks[f"n_{d}"] = np.where(is_reset, 0, n_dev)
+            alerted |= is_alert
+
+        # the new level becomes the reference, so that only further changes are reported
+        for d in [1, -1]:
+            for n in ["cusum", "sum", "n"]:
+                tracks[f"{n}_{d}"] = np.where(alerted, 0, tracks[f"{n}_{d}"])
+        tracks["learn_left"] = np.where(alerted, n_learn, tracks["learn_left"])
+        tracks["learn_sum"] = np.where(alerted, 0, tracks["learn_sum"])
+        tracks["learn_n"] = np.where(alerted, 0, tracks["learn_n"])
+
+    state = {
+        "reference": {
+            "mean": pd.Series(mean, index=channels),
+            "sigma": reference["sigma"],
+        },
+        "tracks": pd.DataFrame(tracks, index=channels),
+    }
+
+    return get_alert_table(alerts, times), state
+
+
+def get_alert_table(alerts: list, times: pd.DatetimeIndex) -> pd.DataFrame:
+    """Return the table of change-point alerts (see :func:`detect_change_points`), with times in ns converted to the time zone of ``times``."""
+    alerts = pd.DataFrame(
+        alerts, columns=["channel", "start", "detected", "direction", "shift"]
+    )
+    for col in ["start", "detected"]:
+        alerts[col] = pd.to_datetime(alerts[col].astype(np.int64), utc=True)
+        if times.tz is None:
+            alerts[col] = alerts[col].dt.tz_localize(None)
+        else:
+            alerts[col] = alerts[col].dt.tz_convert(times.tz)
+
+    return alerts
+
+
+def update_change_points(
+    df: pd.DataFrame, cp_state: dict | None, open_start: pd.Timestamp
+) -> dict | None:
+    """
+    Continue the change-point detection (see :func:`detect_change_points`) on the closed time buckets of a time-indexed dataframe that were not processed yet.
+
+    Return the updated state, with the alerts raised so far ('alerts') and the last processed time bucket ('last'),
+    or None if there are not enough closed buckets to evaluate the reference yet.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Time-indexed dataframe (datetime vs channel), eg resampled mean values.
+    cp_state : dict
+        State returned by a previous call; if None, the detection starts from scratch.
+    open_start : pd.Timestamp
+        Start of the buckets that are still open, ie that could change at the next call; they are not processed.
+    """
+    closed = df[df.index < open_start]
+    if cp_state is None:
+        alerts, det_state = detect_change_points(closed)
+        if det_state is None:
+            return None
+    else:
+        closed = closed[closed.index > cp_state["last"]]
+        if closed.empty:
+            return cp_state
+        new_alerts, det_state = detect_change_points(closed, state=cp_state)
+        alerts = (
+            cp_state["alerts"]
+            if new_alerts.empty
+            else pd.concat([cp_state["alerts"], new_alerts], ignore_index=True)
+        )
+
+    return det_state | {"alerts": alerts, "last": closed.index[-1]}
+
+
+def build_new_files(generated_path: str, period: str, run: str, data_type="phy"):
+    """
+    Generate and store resampled HDF files for a given data run and extract summary info.
+
+    This function:
+
+      - loads the original `.hdf` file for the specified `period` and `run`
+      - extracts available keys from the HDF file
+      - updates the per-bucket statistics (count, sum, sum of squares, min, max, quantiles) of each key with the rows added since the previous call,
+        storing them in a ``-res_state.hdf`` file next to the original one
+      - derives the resampled time series for multiple time intervals (10min, 60min) from the bucket statistics
+      - stores each resampled dataset into a separate HDF file; next to the mean values saved under the original key,
+        the count, std, min, max and quantile values (see ``BUCKET_QUANTILES``) are saved under '<key>_count', '<key>_std', '<key>_min', '<key>_max', '<key>_q05', ...
+      - detects level shifts of the closed 10min mean values (see :func:`update_change_points`) and stores the alert table under '<key>_alerts' of the 10min file;
+        the detection state is kept in the ``-res_state.hdf`` file, so that the reference and the alerts already raised do not change between calls
+      - extracts metadata from the 'info' key and saves it as a .yaml file
+
+    Only the rows of the last (still open) 60min bucket and the new rows are read from the original file;
+    keys whose already processed rows were rewritten in the meantime are processed again from scratch.
+    Keys of % variations ('_var') are derived from the statistics of the corresponding absolute values and their reference mean, without reading them.
+    Count, sum, min and max of coarser time intervals are derived from the finest one, without re-reading any data.
+
+    Parameters
+    ----------
+    generated_path : str
+        Root directory where the data is stored and where new files will be written.
+    period : str
+        Period (e.g. 'p03') used to construct paths.
+    run : str
+        Run (e.g. 'r001') used to construct paths.
+    data_type : str
+        Data type to load; default: 'phy'.
+    """
+    run_folder = os.path.join(
+        generated_path, "generated/plt/hit", data_type, period, run
+    )
+    data_file = os.path.join(run_folder, f"l200-{period}-{run}-{data_type}-geds.hdf")
+
+    if not os.path.exists(data_file):
+        utils.logger.debug(f"File not found: {data_file}. Exit here.")
+        sys.exit()
+
+    with h5py.File(data_file, "r") as f:
+        my_keys = list(f.keys())
+        # number of stored rows, available without reading any data
+        n_rows = {
+            k: f[k]["axis1"].shape[0]
+            for k in my_keys
+            if isinstance(f[k], h5py.Group) and "axis1" in f[k]
+        }
+
+    info_dict = {"keys": my_keys}
+
+    # the finest resolution is the one we keep track of, the others are derived from it
+    resampling_times = ["10min", "60min"]
+    finest_unit = resampling_times[0]
+    coarsest_unit = resampling_times[-1]
+
+    state_file = os.path.join(
+        run_folder, f"l200-{period}-{run}-{data_type}-geds-res_state.hdf"
+    )
+    bookkeeping, state = load_bucket_state(state_file)
+    change_points = load_change_point_state(state_file)
+    new_bookkeeping = {}
+    new_state = {}
+    mean_dfs = {}
+
+    # absolute values first, so that % variations can be derived from them
+    data_keys = [k for k in my_keys if "info" not in k and "_mean" not in k]
+    data_keys = sorted(data_keys, key=lambda k: k.endswith("_var"))
+
+    for k in my_keys:
+        if "info" in k:
+            original_df = pd.read_hdf(data_file, key=k)
+            original_df = original_df.astype(str)
+            info_dict.update(
+                {
+                    k: {
+                        "subsystem": original_df.loc["subsystem", "Value"],
+                        "unit": original_df.loc["unit", "Value"],
+                        "label": original_df.loc["label", "Value"],
+                        "event_type": original_df.loc["event_type", "Value"],
+                        "lower_lim_var": original_df.loc["lower_lim_var", "Value"],
+                        "upper_lim_var": original_df.loc["upper_lim_var", "Value"],
+                        "lower_lim_abs": original_df.loc["lower_lim_abs", "Value"],
+                        "upper_lim_abs": original_df.loc["upper_lim_abs", "Value"],
+                    }
+                }
+            )
+        # mean dataframe is kept
+        elif "_mean" in k:
+            mean_dfs[k] = pd.read_hdf(data_file, key=k)
+
+    for k in data_keys:
+        # % variations: (x / mean - 1) * 100 is an affine transformation of the absolute values
+        base_key = k[: -len("_var")]
+        if (
+            k.endswith("_var")
+            and base_key in new_state
+            and f"{base_key}_mean" in mean_dfs
+        ):
+            ref_mean = mean_dfs[f"{base_key}_mean"].iloc[0]
+            new_state[k] = {
+                unit: rescale_bucket_stats(stats, 100 / ref_mean, -100)
+                for unit, stats in new_state[base_key].items()
+            }
+            continue
 
-    for idx, resample_unit in enumerate(resampling_times):
+        n_done, n_open = (
+            (int(bookkeeping.at[k, "n_rows"]), int(bookkeeping.at[k, "n_open"]))
+            if k in bookkeeping.index
+            else (0, 0)
+        )
+        n_total = n_rows.get(k)
+        is_valid = (
+            k in state and n_total is not None and 0 <= n_open < n_done <= n_total
+        )
+        if is_valid:
+            # already processed rows must be untouched
+            last_row = pd.read_hdf(data_file, key=k, start=n_done - 1, stop=n_done)
+            is_valid = get_row_fingerprint(last_row) == bookkeeping.at[k, "fingerprint"]
+        if not is_valid:
+            n_done, n_open = 0, 0
+            change_points.pop(k, None)
+
+        # the last bucket could be still open: read again its rows, together with the new ones
+        new_df = pd.read_hdf(data_file, key=k, start=n_open)
+        new_df.index = pd.to_datetime(new_df.index)
+        utils.logger.debug(
+            "...%s: %d rows to process (%d new)",
+            k,
+            len(new_df),
+            n_open + len(new_df) - n_done,
+        )
+        new_state[k] = {
+            finest_unit: get_bucket_stats(new_df, finest_unit)
+            | get_bucket_quantiles(new_df, finest_unit)
+        }
+        new_state[k].update(
+            {
+                unit: get_bucket_quantiles(new_df, unit)
+                for unit in resampling_times
+                if unit != finest_unit
+            }
+        )
+        if new_df.empty:
+            continue
+
+        # keep closed buckets from the previous state, and replace the open ones
+        if is_valid:
+            open_start = new_df.index.min().floor(coarsest_unit)
+            for unit, stats in new_state[k].items():
+                for stat, df in stats.items():
+                    old_df = state[k][unit][stat]
+                    stats[stat] = pd.concat([old_df[old_df.index < open_start], df])
+
+        last_start = new_df.index.max().floor(coarsest_unit)
+        new_bookkeeping[k] = {
+            "n_rows": n_open + len(new_df),
+            "n_open": n_open + int(np.argmax(new_df.index >= last_start)),
+            "fingerprint": get_row_fingerprint(new_df),
+        }
+
+    for resample_unit in resampling_times:
         new_file = os.path.join(
-            generated_path,
-            "generated/plt/hit",
-            data_type,
-            period,
-            run,
+            run_folder,
             f"l200-{period}-{run}-{data_type}-geds-res_{resample_unit}.hdf",
         )
         # remove it if already exists so we can start again to append resampled data
@@ -2053,61 +3327,449 @@ def build_new_files(generated_path: str, period: str, run: str, data_type="phy")
             os.remove(new_file)
 
         for k in my_keys:
-            if "info" in k:
-                # do it once
-                if idx == 0:
-                    original_df = pd.read_hdf(data_file, key=k)
-                    original_df = original_df.astype(str)
-                    info_dict.update(
-                        {
-                            k: {
-                                "subsystem": original_df.loc["subsystem", "Value"],
-                                "unit": original_df.loc["unit", "Value"],
-                                "label": original_df.loc["label", "Value"],
-                                "event_type": original_df.loc["event_type", "Value"],
-                                "lower_lim_var": original_df.loc[
-                                    "lower_lim_var", "Value"
-                                ],
-                                "upper_lim_var": original_df.loc[
-                                    "upper_lim_var", "Value"
-                                ],
-                                "lower_lim_abs": original_df.loc[
-                                    "lower_lim_abs", "Value"
-                                ],
-                                "upper_lim_abs": original_df.loc[
-                                    "upper_lim_abs", "Value"
-                                ],
-                            }
-                        }
-                    )
+            if k in mean_dfs:
+                mean_dfs[k].to_hdf(new_file, key=k, mode="a")
+            if k not in new_state:
                 continue
 
-            original_df = pd.read_hdf(data_file, key=k)
+            stats = (
+                new_state[k][finest_unit]
+                if resample_unit == finest_unit
+                else merge_bucket_stats([new_state[k][finest_unit]], resample_unit)
+                | new_state[k][resample_unit]
+            )
+            frames = get_resampled_frames(stats, resample_unit)
+            for name, resampled_df in frames.items():
+                key_name = k if name == "mean" else f"{k}_{name}"
+                resampled_df.to_hdf(new_file, key=key_name, mode="a")
+
+            # level shifts over the finest time series (% variations share the ones of absolute values)
+            if resample_unit == finest_unit and not k.endswith("_var"):
+                mean_df = frames["mean"]
+                if not mean_df.empty:
+                    cp_state = update_change_points(
+                        mean_df,
+                        change_points.get(k),
+                        mean_df.index[-1].floor(coarsest_unit),
+                    )
+                    if cp_state is None:
+                        change_points.pop(k, None)
+                    else:
+                        change_points[k] = cp_state
+                alerts = (
+                    change_points[k]["alerts"]
+                    if k in change_points
+                    else get_alert_table([], pd.DatetimeIndex(mean_df.index))
+                )
+                if not alerts.empty:
+                    utils.logger.debug("...%s: %d change points", k, len(alerts))
+                alerts.to_hdf(new_file, key=f"{k}_alerts", mode="a")
+
+    # only absolute values are tracked, % variations are derived at every call
+    save_bucket_state(
+        state_file,
+        pd.DataFrame.from_dict(
+            new_bookkeeping, orient="index", columns=["n_rows", "n_open", "fingerprint"]
+        ),
+        {k: new_state[k] for k in new_bookkeeping},
+        {k: change_points[k] for k in new_bookkeeping if k in change_points},
+    )
 
-            # mean dataframe is kept
-            if "_mean" in k:
-                original_df.to_hdf(new_file, key=k, mode="a")
-                continue
+    json_output = os.path.join(
+        run_folder, f"l200-{period}-{run}-{data_type}-geds-info.yaml"
+    )
+    with open(json_output, "w") as file:
+        json.dump(info_dict, file, indent=4)
 
-            original_df.index = pd.to_datetime(original_df.index)
-            # resample
-            resampled_df = original_df.resample(resample_unit).mean()
-            # substitute the original df with the resampled one
-            original_df = resampled_df
-            # append resampled data to the new file
-            resampled_df.to_hdf(new_file, key=k, mode="a")
-
-        if idx == 0:
-            json_output = os.path.join(
-                generated_path,
-                "generated/plt/hit",
-                data_type,
-                period,
-                run,
-                f"l200-{period}-{run}-{data_type}-geds-info.yaml",
+
+def draw_gain_shift(
+    pulser_data: dict,
+    pars_data: dict,
+    plot_type: str,
+    no_pulser: bool,
+    fixed_zoom: bool,
+    quadratic: bool,
+    zoom: bool,
+    xlim_idx: int,
+    title: str,
+    decimate: bool = False,
+):
+    """
+    Draw the gain shift of a detector over a period, together with calibration results, and return the figure.
+
+    Parameters
+    ----------
+    pulser_data : dict
+        Resampled geds and pulser data, as returned by :func:`get_pulser_data`.
+    pars_data : dict
+        Calibration results, as returned by :func:`get_calib_pars`.
+    plot_type : str
+        'corr' to plot pulser-corrected gain shifts (if the pulser is available), 'uncorr' otherwise.
+    no_pulser : bool
+        True if the detector has no pulser entries, ie only calibration results are drawn.
+    fixed_zoom : bool
+        True to zoom over a fixed y range, instead of one based on data, when zooming.
+    quadratic : bool
+        True if you want to plot the quadratic resolution too.
+    zoom : bool
+        True to zoom over y axis.
+    xlim_idx : int
+        Index (from the end) of the run start used to set the x axis limits.
+    title : str
+        Figure title.
+    decimate : bool
+        True to draw at most a few points per pixel column, keeping extremes (see :func:`utils.get_decimation_indices`); default: False.
+    """
+    fig, ax = plt.subplots(figsize=(12, 4))
+    t0 = pars_data["run_start"]
+    if not no_pulser:
+        # PULS01ANA has a signal - we can correct GEDS energies for it!
+        if pulser_data["pul_cusp"]["kevdiff_av"] is not None and plot_type == "corr":
+            pul_cusp_av = pulser_data["pul_cusp"]["kevdiff_av"].values.astype(float)
+            diff_av = pulser_data["diff"]["kevdiff_av"].values.astype(float)
+            diff_std = pulser_data["diff"]["kevdiff_std"].values.astype(float)
+            x = pulser_data["diff"]["kevdiff_av"].index.values
+            if decimate:
+                idx = utils.get_decimation_indices(
+                    x,
+                    [pul_cusp_av, diff_av - diff_std, diff_av + diff_std],
+                    utils.get_decimation_buckets(ax),
+                )
+                x, pul_cusp_av = x[idx], pul_cusp_av[idx]
+                diff_av, diff_std = diff_av[idx], diff_std[idx]
+
+            plt.fill_between(
+                x,
+                diff_av - diff_std,
+                diff_av + diff_std,
+                color="k",
+                alpha=0.2,
+                label=r"±1$\sigma$",
+            )
+            plt.plot(x, pul_cusp_av, "C2", label="PULS01ANA")
+            plt.plot(x, diff_av, "C4", label="GED corrected")
+        else:
+            ged_av = pulser_data["ged"]["kevdiff_av"].values.astype(float)
+            ged_std = pulser_data["ged"]["kevdiff_std"].values.astype(float)
+            x = pulser_data["ged"]["kevdiff_av"].index.values
+            if decimate:
+                idx = utils.get_decimation_indices(
+                    x,
+                    [ged_av - ged_std, ged_av + ged_std],
+                    utils.get_decimation_buckets(ax),
+                )
+                x, ged_av, ged_std = x[idx], ged_av[idx], ged_std[idx]
+
+            plt.fill_between(
+                x,
+                ged_av - ged_std,
+                ged_av + ged_std,
+                color="k",
+                alpha=0.2,
+                label=r"±1$\sigma$",
+            )
+            plt.plot(
+                x,
+                ged_av,
+                color="dodgerblue",
+                label="GED uncorrected",
+            )
+
+    plt.plot(
+        pars_data["run_start"] - pd.Timedelta(hours=5),
+        pars_data["fep_diff"],
+        "kx",
+        label="FEP gain",
+    )
+    plt.plot(
+        pars_data["run_start"] - pd.Timedelta(hours=5),
+        pars_data["cal_const_diff"],
+        "rx",
+        label="cal. const. diff",
+    )
+
+    for ti in pars_data["run_start"]:
+        plt.axvline(ti, color="dimgrey", ls="--")
+
+    for i in range(len(t0)):
+        if i == len(pars_data["run_start"]) - 1:
+            plt.plot(
+                [t0[i], t0[i] + pd.Timedelta(days=7)],
+                [pars_data["res"][i] / 2, pars_data["res"][i] / 2],
+                "b-",
+            )
+            plt.plot(
+                [t0[i], t0[i] + pd.Timedelta(days=7)],
+                [
+                    -pars_data["res"][i] / 2,
+                    -pars_data["res"][i] / 2,
+                ],
+                "b-",
+            )
+            if quadratic:
+                plt.plot(
+                    [t0[i], t0[i] + pd.Timedelta(days=7)],
+                    [
+                        pars_data["res_quad"][i] / 2,
+                        pars_data["res_quad"][i] / 2,
+                    ],
+                    color="dodgerblue",
+                    linestyle="-",
+                )
+                plt.plot(
+                    [t0[i], t0[i] + pd.Timedelta(days=7)],
+                    [
+                        -pars_data["res_quad"][i] / 2,
+                        -pars_data["res_quad"][i] / 2,
+                    ],
+                    color="dodgerblue",
+                    linestyle="-",
+                )
+        else:
+            plt.plot(
+                [t0[i], t0[i + 1]],
+                [pars_data["res"][i] / 2, pars_data["res"][i] / 2],
+                "b-",
+            )
+            plt.plot(
+                [t0[i], t0[i + 1]],
+                [
+                    -pars_data["res"][i] / 2,
+                    -pars_data["res"][i] / 2,
+                ],
+                "b-",
+            )
+            if quadratic:
+                plt.plot(
+                    [t0[i], t0[i + 1]],
+                    [
+                        pars_data["res_quad"][i] / 2,
+                        pars_data["res_quad"][i] / 2,
+                    ],
+                    color="dodgerblue",
+                    linestyle="-",
+                )
+                plt.plot(
+                    [t0[i], t0[i + 1]],
+                    [
+                        -pars_data["res_quad"][i] / 2,
+                        -pars_data["res_quad"][i] / 2,
+                    ],
+                    color="dodgerblue",
+                    linestyle="-",
+                )
+
+        if str(pars_data["res"][i] / 2 * 1.1) != "nan" and i < len(pars_data["res"]) - (
+            xlim_idx - 1
+        ):
+            plt.text(
+                t0[i],
+                pars_data["res"][i] / 2 * 1.1,
+                "{:.2f}".format(pars_data["res"][i]),
+                color="b",
+            )
+
+        if quadratic:
+            if str(pars_data["res_quad"][i] / 2 * 1.5) != "nan" and i < len(
+                pars_data["res"]
+            ) - (xlim_idx - 1):
+                plt.text(
+                    t0[i],
+                    pars_data["res_quad"][i] / 2 * 1.5,
+                    "{:.2f}".format(pars_data["res_quad"][i]),
+                    color="dodgerblue",
+                )
+
+    fig.suptitle(title)
+    plt.ylabel(r"Energy diff / keV")
+    plt.plot([0, 1], [0, 1], "b", label="Qbb FWHM keV lin.")
+    if quadratic:
+        plt.plot(
+            [1, 2],
+            [1, 2],
+            "dodgerblue",
+            label="Qbb FWHM keV quadr.",
+        )
+
+    if zoom:
+        if fixed_zoom:
+            plt.ylim(-3, 3)
+        else:
+            bound = np.average(pulser_data["ged"]["cusp_av"].dropna())
+            plt.ylim(-2.5 * bound, 2.5 * bound)
+    max_date = pulser_data["ged"]["kevdiff_av"].index.max()
+    time_difference = max_date.tz_localize(None) - t0[-xlim_idx].tz_localize(None)
+    plt.xlim(
+        t0[0] - pd.Timedelta(hours=8),
+        t0[-xlim_idx] + time_difference * 1.5,
+    )  # pd.Timedelta(days=7))# --> change me to resize the width of the last run
+    plt.legend(loc="lower left")
+    plt.tight_layout()
+
+    return fig
+
+
+def draw_parameter_time_series(
+    pulser_data: dict,
+    pars_data: dict,
+    inspected_parameter: str,
+    par_info: dict,
+    no_pulser: bool,
+    is_corrected: bool,
+    zoom: bool,
+    xlim_idx: int,
+    title: str,
+    decimate: bool = False,
+):
+    """
+    Draw the variations of a parameter of a detector over a run and return the figure.
+
+    Parameters
+    ----------
+    pulser_data : dict
+        Resampled geds and pulser data, as returned by :func:`get_pulser_data`.
+    pars_data : dict
+        Calibration results, as returned by :func:`get_calib_pars`.
+    inspected_parameter : str
+        Inspected parameter, eg 'TrapemaxCtcCal'.
+    par_info : dict
+        Plot settings of the inspected parameter (eg 'ylabel', 'colors', 'limits').
+    no_pulser : bool
+        True if the detector has no pulser entries, ie no data are drawn.
+    is_corrected : bool
+        True to draw pulser-corrected values.
+    zoom : bool
+        True to zoom over y axis.
+    xlim_idx : int
+        Index (from the end) of the run start used to set the x axis limits.
+    title : str
+        Figure title.
+    decimate : bool
+        True to draw at most a few points per pixel column, keeping extremes (see :func:`utils.get_decimation_indices`); default: False.
+    """
+    fig, ax = plt.subplots(figsize=(12, 4))
+    t0 = pars_data["run_start"]
+    if not no_pulser:
+        if is_corrected:
+            pul_cusp_av = pulser_data["pul_cusp"]["kevdiff_av"].values.astype(float)
+            diff_av = pulser_data["diff"]["kevdiff_av"].values.astype(float)
+            diff_std = pulser_data["diff"]["kevdiff_std"].values.astype(float)
+            x = pulser_data["diff"]["kevdiff_av"].index.values
+            if decimate:
+                idx = utils.get_decimation_indices(
+                    x,
+                    [pul_cusp_av, diff_av - diff_std, diff_av + diff_std],
+                    utils.get_decimation_buckets(ax),
+                )
+                x, pul_cusp_av = x[idx], pul_cusp_av[idx]
+                diff_av, diff_std = diff_av[idx], diff_std[idx]
+
+            plt.plot(x, pul_cusp_av, "C2", label="PULS01ANA")
+            plt.plot(x, diff_av, "C4", label="GED corrected")
+            plt.fill_between(
+                x,
+                diff_av - diff_std,
+                diff_av + diff_std,
+                color="k",
+                alpha=0.2,
+                label=r"±1$\sigma$",
+            )
+        else:
+            vals_av = pulser_data["ged"]["kevdiff_av"].values.astype(float)
+            vals_std = pulser_data["ged"]["kevdiff_std"].values.astype(float)
+            x = pulser_data["ged"]["kevdiff_av"].index.values
+            if decimate:
+                idx = utils.get_decimation_indices(
+                    x,
+                    [vals_av - vals_std, vals_av + vals_std],
+                    utils.get_decimation_buckets(ax),
+                )
+                x, vals_av, vals_std = x[idx], vals_av[idx], vals_std[idx]
+
+            plt.plot(
+                x,
+                vals_av,
+                color=par_info["colors"][0],
+                label="GED uncorrected",
+            )
+            plt.fill_between(
+                x,
+                vals_av - vals_std,
+                vals_av + vals_std,
+                color="k",
+                alpha=0.2,
+                label=r"±1$\sigma$",
             )
-            with open(json_output, "w") as file:
-                json.dump(info_dict, file, indent=4)
+
+    # plot resolution only for the energy parameters
+    if inspected_parameter == "TrapemaxCtcCal":
+        plt.plot(
+            [t0[0], t0[0] + pd.Timedelta(days=7)],
+            [pars_data["res"][0] / 2, pars_data["res"][0] / 2],
+            color=par_info["colors"][1],
+            ls="-",
+        )
+        plt.plot(
+            [t0[0], t0[0] + pd.Timedelta(days=7)],
+            [-pars_data["res"][0] / 2, -pars_data["res"][0] / 2],
+            color=par_info["colors"][1],
+            ls="-",
+        )
+
+        if str(pars_data["res"][0] / 2 * 1.1) != "nan" and 0 < len(pars_data["res"]) - (
+            xlim_idx - 1
+        ):
+            plt.text(
+                t0[0],
+                pars_data["res"][0] / 2 * 1.1,
+                "{:.2f}".format(pars_data["res"][0]),
+                color=par_info["colors"][1],
+            )
+        plt.plot(
+            [0, 1],
+            [0, 1],
+            color=par_info["colors"][1],
+            label="Qbb FWHM keV lin.",
+        )
+    else:
+        if par_info["limits"][1] is not None:
+            plt.plot(
+                [t0[0], t0[0] + pd.Timedelta(days=7)],
+                [
+                    par_info["limits"][1],
+                    par_info["limits"][1],
+                ],
+                color=par_info["colors"][1],
+                ls="-",
+            )
+        if par_info["limits"][0] is not None:
+            plt.plot(
+                [t0[0], t0[0] + pd.Timedelta(days=7)],
+                [
+                    par_info["limits"][0],
+                    par_info["limits"][0],
+                ],
+                color=par_info["colors"][1],
+                ls="-",
+            )
+
+    plt.ylabel(par_info["ylabel"])
+    fig.suptitle(title)
+
+    if zoom is True:
+        bound = np.average(pulser_data["ged"]["kevdiff_std"].dropna())
+        plt.ylim(-3.5 * bound, 3.5 * bound)
+
+    max_date = pulser_data["ged"]["kevdiff_av"].index.max()
+    time_difference = max_date.tz_localize(None) - t0[-xlim_idx].tz_localize(None)
+    plt.xlim(
+        t0[0] - pd.Timedelta(hours=0.5),
+        t0[-xlim_idx] + time_difference * 1.1,
+    )
+    plt.legend(loc="lower left")
+    plt.tight_layout()
+
+    return fig
 
 
 def plot_time_series(
@@ -2125,6 +3787,7 @@ def plot_time_series(
     partition: bool,
     quadratic: bool,
     zoom: bool,
+    decimate: bool = False,
 ):
     """
     Generate and save time-series plots of calibration and monitoring data for germanium detectors across multiple runs.
@@ -2165,6 +3828,8 @@ def plot_time_series(
         True if you want to plot the quadratic resolution too; default: False.
     zoom : bool
         True to zoom over y axis; default: False.
+    decimate : bool
+        True to draw at most a few points per pixel column of long time series, keeping extremes; default: False.
     """
     avail_runs = []
     for entry in runs:
@@ -2244,34 +3909,34 @@ def plot_time_series(
         os.makedirs(end_folder, exist_ok=True)
         shelve_path = os.path.join(end_folder, f"l200-{period}-phy-monitoring")
         utils.logger.debug(f"...inspecting Gain over {period}")
-        with shelve.open(shelve_path, "c", protocol=pickle.HIGHEST_PROTOCOL) as shelf:
-            for plot_type in ["corr", "uncorr"]:
-                for string, det_list in str_chns.items():
-                    for channel_name in det_list:
-                        channel = detectors[channel_name]["channel_str"]
-                        rawid = detectors[channel_name]["daq_rawid"]
-                        pos = detectors[channel_name]["position"]
-
-                        resampling_time = "1h"  # if len(runs)>1 else "10T"
-
-                        rawid = np.int64(rawid)
-                        if rawid not in set(dfs[0].columns):
-                            utils.logger.debug(
-                                f"{channel} is not present in the dataframe!"
-                            )
-                            continue
+        resampling_time = "1h"  # if len(runs)>1 else "10T"
+        # all channels are resampled and corrected at once
+        all_pulser_data = get_all_pulser_data(
+            resampling_time,
+            period,
+            dfs,
+            get_available_rawids(str_chns, detectors, dfs[0]),
+            escale=escale_val,
+            variations=True,
+        )
+        specs = []
+        calib_pars = {}
+        for plot_type in ["corr", "uncorr"]:
+            for string, det_list in str_chns.items():
+                for channel_name in det_list:
+                    channel = detectors[channel_name]["channel_str"]
+                    rawid = detectors[channel_name]["daq_rawid"]
+                    pos = detectors[channel_name]["position"]
 
-                        pulser_data = get_pulser_data(
-                            resampling_time,
-                            period,
-                            dfs,
-                            rawid,
-                            escale=escale_val,
-                            variations=True,
+                    rawid = np.int64(rawid)
+                    if rawid not in set(dfs[0].columns):
+                        utils.logger.debug(
+                            f"{channel} is not present in the dataframe!"
                         )
+                        continue
 
-                        fig, ax = plt.subplots(figsize=(12, 4))
-                        pars_data = get_calib_pars(
+                    if channel_name not in calib_pars:
+                        calib_pars[channel_name] = get_calib_pars(
                             auto_dir_path,
                             period,
                             run_list,
@@ -2282,218 +3947,40 @@ def plot_time_series(
                             fit=fit_flag,
                         )
 
-                        t0 = pars_data["run_start"]
-                        if not eval(flag_expr):
-                            # PULS01ANA has a signal - we can correct GEDS energies for it!
-                            if (
-                                pulser_data["pul_cusp"]["kevdiff_av"] is not None
-                                and plot_type == "corr"
-                            ):
-                                pul_cusp_av = pulser_data["pul_cusp"][
-                                    "kevdiff_av"
-                                ].values.astype(float)
-                                diff_av = pulser_data["diff"][
-                                    "kevdiff_av"
-                                ].values.astype(float)
-                                diff_std = pulser_data["diff"][
-                                    "kevdiff_std"
-                                ].values.astype(float)
-                                x = pulser_data["diff"]["kevdiff_av"].index.values
-
-                                plt.fill_between(
-                                    x,
-                                    diff_av - diff_std,
-                                    diff_av + diff_std,
-                                    color="k",
-                                    alpha=0.2,
-                                    label=r"±1$\sigma$",
-                                )
-                                plt.plot(x, pul_cusp_av, "C2", label="PULS01ANA")
-                                plt.plot(x, diff_av, "C4", label="GED corrected")
-                            else:
-                                ged_av = pulser_data["ged"]["kevdiff_av"].values.astype(
-                                    float
-                                )
-                                ged_std = pulser_data["ged"][
-                                    "kevdiff_std"
-                                ].values.astype(float)
-                                x = pulser_data["ged"]["kevdiff_av"].index.values
-
-                                plt.fill_between(
-                                    x,
-                                    ged_av - ged_std,
-                                    ged_av + ged_std,
-                                    color="k",
-                                    alpha=0.2,
-                                    label=r"±1$\sigma$",
-                                )
-                                plt.plot(
-                                    x,
-                                    ged_av,
-                                    color="dodgerblue",
-                                    label="GED uncorrected",
-                                )
-
-                        plt.plot(
-                            pars_data["run_start"] - pd.Timedelta(hours=5),
-                            pars_data["fep_diff"],
-                            "kx",
-                            label="FEP gain",
-                        )
-                        plt.plot(
-                            pars_data["run_start"] - pd.Timedelta(hours=5),
-                            pars_data["cal_const_diff"],
-                            "rx",
-                            label="cal. const. diff",
-                        )
-
-                        for ti in pars_data["run_start"]:
-                            plt.axvline(ti, color="dimgrey", ls="--")
-
-                        for i in range(len(t0)):
-                            if i == len(pars_data["run_start"]) - 1:
-                                plt.plot(
-                                    [t0[i], t0[i] + pd.Timedelta(days=7)],
-                                    [pars_data["res"][i] / 2, pars_data["res"][i] / 2],
-                                    "b-",
-                                )
-                                plt.plot(
-                                    [t0[i], t0[i] + pd.Timedelta(days=7)],
-                                    [
-                                        -pars_data["res"][i] / 2,
-                                        -pars_data["res"][i] / 2,
-                                    ],
-                                    "b-",
-                                )
-                                if quadratic:
-                                    plt.plot(
-                                        [t0[i], t0[i] + pd.Timedelta(days=7)],
-                                        [
-                                            pars_data["res_quad"][i] / 2,
-                                            pars_data["res_quad"][i] / 2,
-                                        ],
-                                        color="dodgerblue",
-                                        linestyle="-",
-                                    )
-                                    plt.plot(
-                                        [t0[i], t0[i] + pd.Timedelta(days=7)],
-                                        [
-                                            -pars_data["res_quad"][i] / 2,
-                                            -pars_data["res_quad"][i] / 2,
-                                        ],
-                                        color="dodgerblue",
-                                        linestyle="-",
-                                    )
-                            else:
-                                plt.plot(
-                                    [t0[i], t0[i + 1]],
-                                    [pars_data["res"][i] / 2, pars_data["res"][i] / 2],
-                                    "b-",
-                                )
-                                plt.plot(
-                                    [t0[i], t0[i + 1]],
-                                    [
-                                        -pars_data["res"][i] / 2,
-                                        -pars_data["res"][i] / 2,
-                                    ],
-                                    "b-",
-                                )
-                                if quadratic:
-                                    plt.plot(
-                                        [t0[i], t0[i + 1]],
-                                        [
-                                            pars_data["res_quad"][i] / 2,
-                                            pars_data["res_quad"][i] / 2,
-                                        ],
-                                        color="dodgerblue",
-                                        linestyle="-",
-                                    )
-                                    plt.plot(
-                                        [t0[i], t0[i + 1]],
-                                        [
-                                            -pars_data["res_quad"][i] / 2,
-                                            -pars_data["res_quad"][i] / 2,
-                                        ],
-                                        color="dodgerblue",
-                                        linestyle="-",
-                                    )
-
-                            if str(pars_data["res"][i] / 2 * 1.1) != "nan" and i < len(
-                                pars_data["res"]
-                            ) - (xlim_idx - 1):
-                                plt.text(
-                                    t0[i],
-                                    pars_data["res"][i] / 2 * 1.1,
-                                    "{:.2f}".format(pars_data["res"][i]),
-                                    color="b",
-                                )
-
-                            if quadratic:
-                                if str(
-                                    pars_data["res_quad"][i] / 2 * 1.5
-                                ) != "nan" and i < len(pars_data["res"]) - (
-                                    xlim_idx - 1
-                                ):
-                                    plt.text(
-                                        t0[i],
-                                        pars_data["res_quad"][i] / 2 * 1.5,
-                                        "{:.2f}".format(pars_data["res_quad"][i]),
-                                        color="dodgerblue",
-                                    )
-
-                        fig.suptitle(
-                            f"period: {period} - string: {string} - position: {pos} - ged: {channel_name}"
-                        )
-                        plt.ylabel(r"Energy diff / keV")
-                        plt.plot([0, 1], [0, 1], "b", label="Qbb FWHM keV lin.")
-                        if quadratic:
-                            plt.plot(
-                                [1, 2],
-                                [1, 2],
-                                "dodgerblue",
-                                label="Qbb FWHM keV quadr.",
-                            )
-
-                        if zoom:
-                            if flag_expr:
-                                plt.ylim(-3, 3)
-                            else:
-                                bound = np.average(
-                                    pulser_data["ged"]["cusp_av"].dropna()
-                                )
-                                plt.ylim(-2.5 * bound, 2.5 * bound)
-                        max_date = pulser_data["ged"]["kevdiff_av"].index.max()
-                        time_difference = max_date.tz_localize(None) - t0[
-                            -xlim_idx
-                        ].tz_localize(None)
-                        plt.xlim(
-                            t0[0] - pd.Timedelta(hours=8),
-                            t0[-xlim_idx] + time_difference * 1.5,
-                        )  # pd.Timedelta(days=7))# --> change me to resize the width of the last run
-                        plt.legend(loc="lower left")
-                        plt.tight_layout()
-
-                        if save_pdf:
-                            mgt_folder = os.path.join(end_folder, "pdf", f"st{string}")
-                            os.makedirs(mgt_folder, exist_ok=True)
-
-                            pdf_name = os.path.join(
-                                mgt_folder,
-                                f"{period}_string{string}_pos{pos}_{channel_name}_{plot_type}_gain_shift.pdf",
-                            )
-                            plt.savefig(pdf_name)
-
-                        # serialize+save the plot
-                        serialized_plot = pickle.dumps(plt.gcf())
-                        shelf[
-                            f"{period}_string{string}_pos{pos}_{channel_name}_{plot_type}_gain_shift"
-                        ] = serialized_plot
-                        plt.close(fig)
+                    # structure of pickle files:
+                    #  - p08_string1_pos1_V02160A_param
+                    #  - p08_string1_pos2_V02160B_param
+                    #  - ...
+                    plot_name = f"{period}_string{string}_pos{pos}_{channel_name}_{plot_type}_gain_shift"
+                    specs.append(
+                        {
+                            "function": draw_gain_shift,
+                            "kwargs": {
+                                "pulser_data": get_drawn_pulser_data(
+                                    all_pulser_data[rawid]
+                                ),
+                                "pars_data": calib_pars[channel_name],
+                                "plot_type": plot_type,
+                                "no_pulser": eval(flag_expr),
+                                "fixed_zoom": bool(flag_expr),
+                                "quadratic": quadratic,
+                                "zoom": zoom,
+                                "xlim_idx": xlim_idx,
+                                "title": f"period: {period} - string: {string} - position: {pos} - ged: {channel_name}",
+                                "decimate": decimate,
+                            },
+                            "formats": ["pdf"] if save_pdf else [],
+                            "pdf_path": os.path.join(
+                                end_folder, "pdf", f"st{string}", f"{plot_name}.pdf"
+                            ),
+                            "shelf_key": plot_name,
+                        }
+                    )
 
-                        # structure of pickle files:
-                        #  - p08_string1_pos1_V02160A_param
-                        #  - p08_string1_pos2_V02160B_param
-                        #  - ...
+        rendered = utils.render_figures(specs)
+        # serialize+save the plots
+        with shelve.open(shelve_path, "c", protocol=pickle.HIGHEST_PROTOCOL) as shelf:
+            utils.save_rendered_figures(specs, rendered, shelf)
 
     # parameters (bsln, gain, ...) variations over run
     info = utils.MTG_PLOT_INFO
@@ -2562,233 +4049,132 @@ def plot_time_series(
                 f"...inspecting {inspected_parameter} over {current_run}"
             )
 
-            with shelve.open(
-                shelve_path, "c", protocol=pickle.HIGHEST_PROTOCOL
-            ) as shelf:
-                for string, det_list in str_chns.items():
-                    for channel_name in det_list:
-                        channel = detectors[channel_name]["channel_str"]
-                        rawid = detectors[channel_name]["daq_rawid"]
-                        pos = detectors[channel_name]["position"]
-
-                        resampling_time = "1h"
-                        rawid = np.int64(rawid)
-                        if rawid not in set(dfs[0].columns):
-                            utils.logger.debug(
-                                f"{channel} is not present in the dataframe!"
-                            )
-                            continue
+            resampling_time = "1h"
+            all_pulser_data = get_all_pulser_data(
+                resampling_time,
+                period,
+                dfs,
+                get_available_rawids(str_chns, detectors, dfs[0]),
+                escale=escale_par,
+                variations=info[inspected_parameter]["percentage"],
+            )
+            specs = []
+            for string, det_list in str_chns.items():
+                for channel_name in det_list:
+                    channel = detectors[channel_name]["channel_str"]
+                    rawid = detectors[channel_name]["daq_rawid"]
+                    pos = detectors[channel_name]["position"]
 
-                        pulser_data = get_pulser_data(
-                            resampling_time,
-                            period,
-                            dfs,
-                            rawid,
-                            escale=escale_par,
-                            variations=info[inspected_parameter]["percentage"],
+                    rawid = np.int64(rawid)
+                    if rawid not in set(dfs[0].columns):
+                        utils.logger.debug(
+                            f"{channel} is not present in the dataframe!"
                         )
+                        continue
 
-                        fig, ax = plt.subplots(figsize=(12, 4))
-                        pars_data = get_calib_pars(
-                            auto_dir_path,
-                            period,
-                            [current_run],
-                            [channel, channel_name],
-                            partition,
-                            data_type,
-                            escale=escale_par,
-                            fit=fit_flag,
-                        )
-                        threshold = (
-                            [-pars_data["res"][0] / 2, pars_data["res"][0] / 2]
-                            if "Trapemax" in inspected_parameter
-                            else info[inspected_parameter]["limits"]
-                        )
+                    pulser_data = all_pulser_data[rawid]
+
+                    pars_data = get_calib_pars(
+                        auto_dir_path,
+                        period,
+                        [current_run],
+                        [channel, channel_name],
+                        partition,
+                        data_type,
+                        escale=escale_par,
+                        fit=fit_flag,
+                    )
+                    threshold = (
+                        [-pars_data["res"][0] / 2, pars_data["res"][0] / 2]
+                        if "Trapemax" in inspected_parameter
+                        else info[inspected_parameter]["limits"]
+                    )
 
-                        t0 = pars_data["run_start"]
-                        if not eval(flag_expr):
-                            check_kevdiff = None
-                            if (
-                                info[inspected_parameter]["percentage"] is True
-                                and float(escale_par) == 1.0
-                            ):
-                                check_kevdiff = pulser_data["ged"]["kevdiff_av"] * 100
-                            else:
-                                check_kevdiff = pulser_data["ged"]["kevdiff_av"]
-                            # check threshold and update YAML summary file
-                            # (for energy, do it only for TrapemaxCtcCal and not Trapemax at the moment)
-                            if inspected_parameter != "Trapemax":
-                                utils.check_threshold(
-                                    check_kevdiff,
-                                    channel_name,
-                                    last_checked,
-                                    t0,
-                                    threshold,
-                                    info[inspected_parameter]["title"],
-                                    output,
-                                )
-
-                            # PULS01ANA has a signal - we can correct GEDS energies for it!
-                            # only in the case of energy parameters
-                            if (
-                                pulser_data["pul_cusp"]["kevdiff_av"] is not None
-                                and inspected_parameter == "TrapemaxCtcCal"
-                            ):
-                                pul_cusp_av = pulser_data["pul_cusp"][
-                                    "kevdiff_av"
-                                ].values.astype(float)
-                                diff_av = pulser_data["diff"][
-                                    "kevdiff_av"
-                                ].values.astype(float)
-                                diff_std = pulser_data["diff"][
-                                    "kevdiff_std"
-                                ].values.astype(float)
-                                x = pulser_data["diff"]["kevdiff_av"].index.values
-
-                                plt.plot(x, pul_cusp_av, "C2", label="PULS01ANA")
-                                plt.plot(x, diff_av, "C4", label="GED corrected")
-                                plt.fill_between(
-                                    x,
-                                    diff_av - diff_std,
-                                    diff_av + diff_std,
-                                    color="k",
-                                    alpha=0.2,
-                                    label=r"±1$\sigma$",
-                                )
-
-                                results[inspected_parameter].update(
-                                    {channel_name: pul_cusp_av.values.astype(float)}
-                                )
-                            # else, no correction is applied
-                            else:
-                                if (
-                                    info[inspected_parameter]["percentage"] is True
-                                    and float(escale_par) == 1.0
-                                ):
-                                    pulser_data["ged"]["kevdiff_av"] *= 100
-                                    pulser_data["ged"]["kevdiff_std"] *= 100
-
-                                vals_av = pulser_data["ged"][
-                                    "kevdiff_av"
-                                ].values.astype(float)
-                                vals_std = pulser_data["ged"][
-                                    "kevdiff_std"
-                                ].values.astype(float)
-                                x = pulser_data["ged"]["kevdiff_av"].index.values
-
-                                plt.plot(
-                                    x,
-                                    vals_av,
-                                    color=info[inspected_parameter]["colors"][0],
-                                    label="GED uncorrected",
-                                )
-                                plt.fill_between(
-                                    x,
-                                    vals_av - vals_std,
-                                    vals_av + vals_std,
-                                    color="k",
-                                    alpha=0.2,
-                                    label=r"±1$\sigma$",
-                                )
-
-                                results[inspected_parameter].update(
-                                    {
-                                        channel_name: pulser_data["ged"][
-                                            "kevdiff_av"
-                                        ].values.astype(float)
-                                    }
-                                )
-
-                        # plot resolution only for the energy parameters
-                        if inspected_parameter == "TrapemaxCtcCal":
-                            plt.plot(
-                                [t0[0], t0[0] + pd.Timedelta(days=7)],
-                                [pars_data["res"][0] / 2, pars_data["res"][0] / 2],
-                                color=info[inspected_parameter]["colors"][1],
-                                ls="-",
-                            )
-                            plt.plot(
-                                [t0[0], t0[0] + pd.Timedelta(days=7)],
-                                [-pars_data["res"][0] / 2, -pars_data["res"][0] / 2],
-                                color=info[inspected_parameter]["colors"][1],
-                                ls="-",
+                    t0 = pars_data["run_start"]
+                    no_pulser = eval(flag_expr)
+                    # PULS01ANA has a signal - we can correct GEDS energies for it!
+                    # only in the case of energy parameters
+                    is_corrected = (
+                        pulser_data["pul_cusp"]["kevdiff_av"] is not None
+                        and inspected_parameter == "TrapemaxCtcCal"
+                    )
+                    if not no_pulser:
+                        check_kevdiff = None
+                        if (
+                            info[inspected_parameter]["percentage"] is True
+                            and float(escale_par) == 1.0
+                        ):
+                            check_kevdiff = pulser_data["ged"]["kevdiff_av"] * 100
+                        else:
+                            check_kevdiff = pulser_data["ged"]["kevdiff_av"]
+                        # check threshold and update YAML summary file
+                        # (for energy, do it only for TrapemaxCtcCal and not Trapemax at the moment)
+                        if inspected_parameter != "Trapemax":
+                            utils.check_threshold(
+                                check_kevdiff,
+                                channel_name,
+                                last_checked,
+                                t0,
+                                threshold,
+                                info[inspected_parameter]["title"],
+                                output,
                             )
 
-                            if str(pars_data["res"][0] / 2 * 1.1) != "nan" and 0 < len(
-                                pars_data["res"]
-                            ) - (xlim_idx - 1):
-                                plt.text(
-                                    t0[0],
-                                    pars_data["res"][0] / 2 * 1.1,
-                                    "{:.2f}".format(pars_data["res"][0]),
-                                    color=info[inspected_parameter]["colors"][1],
-                                )
-                            plt.plot(
-                                [0, 1],
-                                [0, 1],
-                                color=info[inspected_parameter]["colors"][1],
-                                label="Qbb FWHM keV lin.",
+                        if is_corrected:
+                            results[inspected_parameter].update(
+                                {
+                                    channel_name: pulser_data["pul_cusp"][
+                                        "kevdiff_av"
+                                    ].values.astype(float)
+                                }
                             )
+                        # else, no correction is applied
                         else:
-                            if info[inspected_parameter]["limits"][1] is not None:
-                                plt.plot(
-                                    [t0[0], t0[0] + pd.Timedelta(days=7)],
-                                    [
-                                        info[inspected_parameter]["limits"][1],
-                                        info[inspected_parameter]["limits"][1],
-                                    ],
-                                    color=info[inspected_parameter]["colors"][1],
-                                    ls="-",
-                                )
-                            if info[inspected_parameter]["limits"][0] is not None:
-                                plt.plot(
-                                    [t0[0], t0[0] + pd.Timedelta(days=7)],
-                                    [
-                                        info[inspected_parameter]["limits"][0],
-                                        info[inspected_parameter]["limits"][0],
-                                    ],
-                                    color=info[inspected_parameter]["colors"][1],
-                                    ls="-",
-                                )
-
-                        plt.ylabel(info[inspected_parameter]["ylabel"])
-                        fig.suptitle(
-                            f"period: {period} - string: {string} - position: {pos} - ged: {channel_name}"
-                        )
-
-                        if zoom is True:
-                            bound = np.average(
-                                pulser_data["ged"]["kevdiff_std"].dropna()
+                            if (
+                                info[inspected_parameter]["percentage"] is True
+                                and float(escale_par) == 1.0
+                            ):
+                                pulser_data["ged"]["kevdiff_av"] *= 100
+                                pulser_data["ged"]["kevdiff_std"] *= 100
+
+                            results[inspected_parameter].update(
+                                {
+                                    channel_name: pulser_data["ged"][
+                                        "kevdiff_av"
+                                    ].values.astype(float)
+                                }
                             )
-                            plt.ylim(-3.5 * bound, 3.5 * bound)
-
-                        max_date = pulser_data["ged"]["kevdiff_av"].index.max()
-                        time_difference = max_date.tz_localize(None) - t0[
-                            -xlim_idx
-                        ].tz_localize(None)
-                        plt.xlim(
-                            t0[0] - pd.Timedelta(hours=0.5),
-                            t0[-xlim_idx] + time_difference * 1.1,
-                        )
-                        plt.legend(loc="lower left")
-                        plt.tight_layout()
 
-                        if save_pdf:
-                            mgt_folder = os.path.join(end_folder, "pdf", f"st{string}")
-                            os.makedirs(mgt_folder, exist_ok=True)
+                    plot_name = f"{period}_{current_run}_string{string}_pos{pos}_{channel_name}_{inspected_parameter}"
+                    specs.append(
+                        {
+                            "function": draw_parameter_time_series,
+                            "kwargs": {
+                                "pulser_data": get_drawn_pulser_data(pulser_data),
+                                "pars_data": pars_data,
+                                "inspected_parameter": inspected_parameter,
+                                "par_info": info[inspected_parameter],
+                                "no_pulser": no_pulser,
+                                "is_corrected": is_corrected,
+                                "zoom": zoom,
+                                "xlim_idx": xlim_idx,
+                                "title": f"period: {period} - string: {string} - position: {pos} - ged: {channel_name}",
+                                "decimate": decimate,
+                            },
+                            "formats": ["pdf"] if save_pdf else [],
+                            "pdf_path": os.path.join(
+                                end_folder, "pdf", f"st{string}", f"{plot_name}.pdf"
+                            ),
+                            "shelf_key": plot_name,
+                        }
+                    )
 
-                            pdf_name = os.path.join(
-                                mgt_folder,
-                                f"{period}_{current_run}_string{string}_pos{pos}_{channel_name}_{inspected_parameter}.pdf",
-                            )
-                            plt.savefig(pdf_name)
-
-                        # serialize+save the plot
-                        serialized_plot = pickle.dumps(plt.gcf())
-                        shelf[
-                            f"{period}_{current_run}_string{string}_pos{pos}_{channel_name}_{inspected_parameter}"
-                        ] = serialized_plot
-                        plt.close(fig)
+            rendered = utils.render_figures(specs)
+            # serialize+save the plots
+            with shelve.open(
+                shelve_path, "c", protocol=pickle.HIGHEST_PROTOCOL
+            ) as shelf:
+                utils.save_rendered_figures(specs, rendered, shelf)
 
     with open(usability_map_file, "w") as f:
         yaml.dump(output, f)
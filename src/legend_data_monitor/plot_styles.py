@@ -23,6 +23,15 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 # -------------------------------------------------------------------------------
 
 
+def get_date_nums(times) -> np.ndarray:
+    """Convert timestamps (naive times are taken as UTC) to matplotlib date numbers, working on the datetime64 array instead of python datetime objects."""
+    times = pd.DatetimeIndex(times)
+    if times.tz is not None:
+        times = times.tz_convert("UTC").tz_localize(None)
+
+    return date2num(times.to_numpy())
+
+
 def plot_vs_time(
     data_channel: DataFrame,
     fig: Figure,
@@ -35,9 +44,8 @@ def plot_vs_time(
     # plot this data vs time
     # -------------------------------------------------------------------------
 
-    # need to plot this way, and not data_position.plot(...) because the datetime column is of type Timestamp
-    # plotting this way, to_pydatetime() converts it to type datetime which is needed for DateFormatter
-    # changing the type of the column itself with the table does not work
+    # timestamps are drawn as matplotlib date numbers (x ticks are set by hand below), which avoids
+    # converting every timestamp to a python datetime object
     data_channel = data_channel.sort_values("datetime")
 
     # if you inspect event rate, change the 'resampled' option from 'only' (if so) to 'no'
@@ -53,8 +61,15 @@ def plot_vs_time(
 
     if plot_info["resampled"] != "only":
         parameter_array = np.array(data_channel[plot_info["parameter"]])
+        time_array = get_date_nums(data_channel["datetime"])
+        # draw at most a few points per pixel column, keeping extremes (off by default)
+        if plot_info.get("decimate", False):
+            idx = utils.get_decimation_indices(
+                time_array, [parameter_array], utils.get_decimation_buckets(ax)
+            )
+            time_array, parameter_array = time_array[idx], parameter_array[idx]
         ax.plot(
-            np.array(data_channel["datetime"].dt.to_pydatetime()),
+            time_array,
             parameter_array[:, None],
             zorder=0,
             color=all_col,
@@ -70,11 +85,10 @@ def plot_vs_time(
         if not plot_info["parameter"] == "event_rate":
             # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ 1 - resampling
             # resample in given time window, as start pick the first timestamp in table
-            resampled = (
-                data_channel.set_index("datetime")
-                .resample(plot_info["time_window"], origin="start")
-                .mean(numeric_only=True)
+            resampler = data_channel.set_index("datetime").resample(
+                plot_info["time_window"], origin="start"
             )
+            resampled = resampler.mean(numeric_only=True)
             # will have datetime as index after resampling -> put back
             resampled = resampled.reset_index()
             # the timestamps in the resampled table will start from the first timestamp, and go with sampling intervals
@@ -84,8 +98,9 @@ def plot_vs_time(
             )
 
             parameter_array = np.array(resampled[plot_info["parameter"]])
+            resampled_x = get_date_nums(resampled["datetime"])
             ax.plot(
-                resampled["datetime"].dt.to_pydatetime(),
+                resampled_x,
                 parameter_array[:, None],
                 color=res_col,
                 zorder=1,
@@ -96,11 +111,7 @@ def plot_vs_time(
             # evaluation of std bands, if enabled
             if plot_info["std"] is True:
                 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ 2 - std evaluation
-                std_data = (
-                    data_channel.set_index("datetime")
-                    .resample(plot_info["time_window"], origin="start")
-                    .std(numeric_only=True)
-                )
+                std_data = resampler.std(numeric_only=True)
                 std_data = std_data.reset_index()
 
                 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ 3 - appending std to the resampled dataframe
@@ -110,7 +121,7 @@ def plot_vs_time(
                 )
 
                 ax.fill_between(
-                    resampled["datetime"].dt.to_pydatetime(),
+                    resampled_x,
                     resampled[plot_info["parameter"]] - new_dataframe["std"],
                     resampled[plot_info["parameter"]] + new_dataframe["std"],
                     alpha=0.25,
@@ -435,48 +446,33 @@ def plot_heatmap(
         ymax = 10000
         ybin = 100
 
-    # to plot spms data, we need a new dataframe with numeric-datetime column and 'unrolled'-list values column
-    # new_df = pd.DataFrame(columns=['datetime', plot_info["parameter"]])
-    new_df = pd.DataFrame()
-    for _, row in data_channel.iterrows():
-        for value in row[plot_info["parameter"]]:
-            # remove nan entries for simplicity (and since we have the possibility here)
-            if value is np.nan:
-                continue
-            new_row = [[row["datetime"], value]]
-            new_row = pd.DataFrame(
-                new_row, columns=["datetime", plot_info["parameter"]]
-            )
-            new_df = pd.concat([new_df, new_row], ignore_index=True, axis=0)
-
-    # make sure the datetime column is in UTC
-    new_df["datetime"] = pd.to_datetime(new_df["datetime"]).dt.tz_localize("UTC")
-    # convert to numeric values for plotting
-    x_values = pd.to_numeric(
-        new_df["datetime"].dt.tz_convert("UTC").dt.to_pydatetime()
-    ).values
-    y_values = new_df[plot_info["parameter"]]
+    # spms data are jagged (several values per event): flatten them, repeating the timestamp of each event
+    # for each of its values, and bin them directly
+    values = data_channel[plot_info["parameter"]].map(np.atleast_1d)
+    lengths = values.map(len).to_numpy()
+    y_values = (
+        np.concatenate(values.to_numpy()).astype(float) if len(values) else np.array([])
+    )
+    x_values = np.repeat(get_date_nums(data_channel["datetime"]), lengths)
+    # remove nan entries for simplicity (and since we have the possibility here)
+    is_valid = ~np.isnan(y_values)
+
+    min_x = date2num(data_channel.iloc[0]["datetime"])
+    max_x = date2num(data_channel.iloc[-1]["datetime"])
     # plot data
     h, xedges, yedges = np.histogram2d(
-        x_values,
-        y_values,
-        bins=[xbin, ybin],
-        range=[
-            [data_channel.iloc[0]["datetime"], data_channel.iloc[-1]["datetime"]],
-            [ymin, ymax],
-        ],
+        x_values[is_valid],
+        y_values[is_valid],
+        bins=[max(xbin, 1), ybin],
+        range=[[min_x, max_x], [ymin, ymax]],
     )
-    # cmap = copy(fig.get_cmap(col_map))
-    # cmap.set_bad(cmap(0))
 
-    ax.pcolor(xedges, yedges, h.T, cmap=col_map)  # norm=mpl.colors.LogNorm(),
+    ax.pcolormesh(xedges, yedges, h.T, cmap=col_map)  # norm=mpl.colors.LogNorm(),
 
     # TO DO: add major locators (pay attention when you have only one point!)
 
     # set date format
     # --- time ticks/labels on x-axis
-    min_x = date2num(data_channel.iloc[0]["datetime"])
-    max_x = date2num(data_channel.iloc[-1]["datetime"])
     time_points = np.linspace(min_x, max_x, 10)
     labels = [num2date(time).strftime("%Y\n%m/%d\n%H:%M") for time in time_points]
 
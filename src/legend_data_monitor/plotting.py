@@ -1,4 +1,7 @@
+import glob
 import io
+import os
+import pickle
 from typing import Union
 
 import matplotlib.patches as mpatches
@@ -16,6 +19,7 @@ from . import (
     subsystem,
     utils,
 )
+from ._version import version
 
 # -------------------------------------------------------------------------
 
@@ -40,7 +44,12 @@ def make_subsystem_plots(
 ):
 
     plt_file = utils.get_output_plot_path(plt_path, "pdf")
-    pdf = PdfPages(plt_file)
+    # pages of each plot are cached by content, so that only plots whose data or settings changed are drawn again
+    # (one cache per subsystem, since each run removes the entries of plots it did not produce)
+    cache_dir = utils.get_output_plot_path(f"{plt_path}-{subsystem.type}", "pages")
+    os.makedirs(cache_dir, exist_ok=True)
+    sections = []
+    section_keys = set()
     is_pdf_saved = False
 
     for plot_title in plots:
@@ -74,6 +83,9 @@ def make_subsystem_plots(
         # resampling: applies only to vs time plot
         if "resampled" not in plot_settings:
             plot_settings["resampled"] = None
+        # decimation of long time series: off by default, to keep exact outputs
+        if "decimate" not in plot_settings:
+            plot_settings["decimate"] = False
         # status plot requires no plot style option (for now)
         if "plot_style" not in plot_settings:
             plot_settings["plot_style"] = None
@@ -119,8 +131,9 @@ def make_subsystem_plots(
         # - get channel mean
         # - calculate variation from mean, if asked
         # note: subsystem.data contains: absolute value of a param, the respective value for aux channel (with ratio and diff already computed)
-        data_analysis = analysis_data.AnalysisData(
-            subsystem.data, selection=plot_settings | dataset_info
+        # identical analyses (eg same parameter, event type and cuts in different plots) are evaluated only once
+        data_analysis = analysis_data.get_analysis_data(
+            subsystem, plot_settings | dataset_info
         )
         # check if the dataframe is empty; if so, skip this parameter
         if utils.check_empty_df(data_analysis):
@@ -134,8 +147,10 @@ def make_subsystem_plots(
 
         # this is ok for geds, but for spms? maybe another function will be necessary for this?
         # note: this will not do anything in case the parameter is from hit tier
-        aux_analysis, aux_ratio_analysis, aux_diff_analysis = analysis_data.get_aux_df(
-            subsystem.data.copy(), params, plot_settings | dataset_info, "pulser01ana"
+        aux_analysis, aux_ratio_analysis, aux_diff_analysis = (
+            analysis_data.get_aux_analysis_data(
+                subsystem, params, plot_settings | dataset_info, "pulser01ana"
+            )
         )
 
         # -------------------------------------------------------------------------
@@ -225,6 +240,7 @@ def make_subsystem_plots(
         plot_info["time_window"] = plot_settings["time_window"]
         plot_info["resampled"] = plot_settings["resampled"]
         plot_info["range"] = plot_settings["range"]
+        plot_info["decimate"] = plot_settings["decimate"]
 
         # information for shifting the channels or not (not needed only for the 'per channel' structure option) when plotting the std
         plot_info["std"] = True if plot_structure == "per channel" else False
@@ -309,13 +325,36 @@ def make_subsystem_plots(
         # call chosen plot structure + plotting
         # -------------------------------------------------------------------------
 
-        if "exposure" in plot_info["parameters"]:
-            string_visualization.exposure_plot(
-                subsystem, data_to_plot.data, plot_info, pdf
-            )
+        with_status = "status" in plot_settings and plot_settings["status"]
+        # the package version is part of the key, so that pages are drawn again after an update of the plotting code
+        section_key = utils.get_content_hash(
+            version,
+            subsystem.type,
+            subsystem.channel_map,
+            plot_info,
+            with_status,
+            data_to_plot.data,
+            data_analysis.data,
+        )
+        cached = load_cached_pages(cache_dir, section_key)
+        is_cached = cached is not None
+        if is_cached:
+            pages = cached["pages"]
+            # settings adjusted while drawing (eg 'resampled' for the event rate) are restored too
+            plot_info.update(cached["plot_info"])
+            utils.logger.info("...%d page(s) unchanged, taken from cache", len(pages))
         else:
-            utils.logger.debug("Plot structure: %s", plot_settings["plot_structure"])
-            plot_structure(data_to_plot.data, plot_info, pdf)
+            # pages are collected (pickled figures) and written to the pdf at the end
+            pages = []
+            if "exposure" in plot_info["parameters"]:
+                string_visualization.exposure_plot(
+                    subsystem, data_to_plot.data, plot_info, pages
+                )
+            else:
+                utils.logger.debug(
+                    "Plot structure: %s", plot_settings["plot_structure"]
+                )
+                plot_structure(data_to_plot.data, plot_info, pages)
 
         # For some reason, after some plotting functions the index is set to "channel".
         # We need to set it back otherwise string_visualization.py gets crazy.
@@ -325,25 +364,34 @@ def make_subsystem_plots(
         # call status plot
         # -------------------------------------------------------------------------
 
-        if "status" in plot_settings and plot_settings["status"]:
+        if with_status:
             if subsystem.type in ["pulser", "pulser01ana", "FCbsln", "muon"]:
                 utils.logger.debug(
                     f"Thresholds are not enabled for {subsystem.type}! Use you own eyes to do checks there"
                 )
             else:
-                # take care of one parameter and multiple parameters cases
+                # channels out of threshold are always checked (and warned about); the status map is drawn only if not cached
                 for param in params:
-                    if len(params) == 1:
-                        _ = string_visualization.status_plot(
-                            subsystem, data_analysis.data, plot_info, pdf
+                    # retrieve the necessary info for the specific parameter under study (just in the multi-parameters case)
+                    plot_info_param = (
+                        plot_info
+                        if len(params) == 1
+                        else save_data.get_param_info(param, plot_info)
+                    )
+                    if is_cached:
+                        string_visualization.check_status(
+                            subsystem, data_analysis.data, plot_info_param
                         )
-                    if len(params) > 1:
-                        # retrieved the necessary info for the specific parameter under study (just in the multi-parameters case)
-                        plot_info_param = save_data.get_param_info(param, plot_info)
-                        _ = string_visualization.status_plot(
-                            subsystem, data_analysis.data, plot_info_param, pdf
+                    else:
+                        string_visualization.status_plot(
+                            subsystem, data_analysis.data, plot_info_param, pages
                         )
 
+        if not is_cached:
+            save_cached_pages(cache_dir, section_key, pages, plot_info)
+        sections.append(pages)
+        section_keys.add(section_key)
+
         # -------------------------------------------------------------------------
         # save results (hdf format)
         # -------------------------------------------------------------------------
@@ -361,7 +409,8 @@ def make_subsystem_plots(
 
         is_pdf_saved = True
 
-    pdf.close()
+    write_pdf_pages(plt_file, sections)
+    prune_page_cache(cache_dir, section_keys)
     if is_pdf_saved:
         utils.logger.info(
             f"All plots saved in: \33[4m{plt_path}-{subsystem.type}.pdf\33[0m"
@@ -511,8 +560,15 @@ def plot_per_cc4(data_analysis: DataFrame, plot_info: dict, pdf: PdfPages):
         ["name", "position", "location", "cc4_channel", "cc4_id"]
     ]
     labels["channel"] = labels.index
-    labels["label"] = labels[["location", "position", "name", "cc4_channel"]].apply(
-        lambda x: f"s{x[0]}-p{x[1]}-{x[2]}-cc4 ch.{x[3]}", axis=1
+    labels["label"] = (
+        "s"
+        + labels["location"].astype(str)
+        + "-p"
+        + labels["position"].astype(str)
+        + "-"
+        + labels["name"].astype(str)
+        + "-cc4 ch."
+        + labels["cc4_channel"].astype(str)
     )
     # put it in the table
     data_analysis = data_analysis.set_index("channel")
@@ -605,8 +661,13 @@ def plot_per_string(data_analysis: DataFrame, plot_info: dict, pdf: PdfPages):
 
     labels = data_analysis.groupby("channel").first()[["name", "position"]]
     labels["channel"] = labels.index
-    labels["label"] = labels[["position", "channel", "name"]].apply(
-        lambda x: f"p{x[0]}-ch{str(x[1]).zfill(3)}-{x[2]}", axis=1
+    labels["label"] = (
+        "p"
+        + labels["position"].astype(str)
+        + "-ch"
+        + labels["channel"].astype(str).str.zfill(3)
+        + "-"
+        + labels["name"].astype(str)
     )
     # put it in the table
     data_analysis = data_analysis.set_index("channel")
@@ -712,8 +773,13 @@ def plot_array(data_analysis: DataFrame, plot_info: dict, pdf: PdfPages):
     # -------------------------------------------------------------------------------
     labels = data_analysis.groupby("channel").first()[["name", "location", "position"]]
     labels["channel"] = labels.index
-    labels["label"] = labels[["location", "position", "channel", "name"]].apply(
-        lambda x: f"p{x[1]}-ch{str(x[2])}-{x[3]}", axis=1
+    labels["label"] = (
+        "p"
+        + labels["position"].astype(str)
+        + "-ch"
+        + labels["channel"].astype(str)
+        + "-"
+        + labels["name"].astype(str)
     )
     # put it in the table
     data_analysis = data_analysis.set_index("channel")
@@ -871,9 +937,17 @@ def plot_per_barrel_and_position(
         ["name", "position", "location", "fiber"]
     ]
     labels["channel"] = labels.index
-    labels["label"] = labels[
-        ["position", "location", "fiber", "channel", "name"]
-    ].apply(lambda x: f"{x[0]}-{x[1]}-{x[2]}-ch{str(x[3]).zfill(3)}-{x[4]}", axis=1)
+    labels["label"] = (
+        labels["position"].astype(str)
+        + "-"
+        + labels["location"].astype(str)
+        + "-"
+        + labels["fiber"].astype(str)
+        + "-ch"
+        + labels["channel"].astype(str).str.zfill(3)
+        + "-"
+        + labels["name"].astype(str)
+    )
     # put it in the table
     data_analysis = data_analysis.set_index("channel")
     data_analysis["label"] = labels["label"]
@@ -961,9 +1035,8 @@ def plot_per_barrel_and_position(
                 y=1.15,
             )
             # fig.supylabel(f'{plotdata.param.label} [{plotdata.param.unit_label}]') # --> plot style
-            plt.savefig(pdf, format="pdf", bbox_inches="tight")
-            # figures are retained until explicitly closed; close to not consume too much memory
-            plt.close()
+            # figures are retained until explicitly closed; save_pdf closes it to not consume too much memory
+            save_pdf(plt, pdf)
 
             with io.BytesIO() as buf:
                 fig.savefig(buf, bbox_inches="tight")
@@ -1023,13 +1096,98 @@ def plot_limits(ax: plt.Axes, params: list, limits: Union[list, dict]):
                         ax.axhline(y=limits_param[1], color="red", linestyle="--")
 
 
-def save_pdf(plt, pdf: PdfPages):
-    """Save the plot to a PDF file. The plot is closed after save_data."""
-    if pdf:
+def save_pdf(plt, pdf: Union[PdfPages, list]):
+    """Save the plot to a PDF file, or append it as a pickled figure if a list of pages is given. The plot is closed after save_data."""
+    if isinstance(pdf, list):
+        pdf.append(pickle.dumps(plt.gcf()))
+        plt.close()
+    elif pdf:
         plt.savefig(pdf, format="pdf", bbox_inches="tight")
         plt.close()
 
 
+def get_cached_pages_path(cache_dir: str, key: str) -> str:
+    """Return the path of the cached pages identified by the content hash ``key``."""
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+
+def load_cached_pages(cache_dir: str, key: str) -> Union[dict, None]:
+    """
+    Load cached pages of a plot, if present.
+
+    Return a dictionary with the pickled figures ('pages') and the plot settings after drawing ('plot_info'), or None if no valid cache entry exists.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory with cached pages.
+    key : str
+        Content hash of the plot, see :func:`utils.get_content_hash`.
+    """
+    path = get_cached_pages_path(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError) as e:
+        utils.logger.debug("...ignoring cached pages %s: %s", path, e)
+        return None
+
+
+def save_cached_pages(cache_dir: str, key: str, pages: list, plot_info: dict):
+    """
+    Store pickled figures of a plot and its plot settings under the content hash ``key``.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory with cached pages.
+    key : str
+        Content hash of the plot, see :func:`utils.get_content_hash`.
+    pages : list
+        Pickled figures, in page order.
+    plot_info : dict
+        Plot settings after drawing.
+    """
+    path = get_cached_pages_path(cache_dir, key)
+    # write to a temporary file first, so that an interrupted run leaves no broken entry
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(
+            {"pages": pages, "plot_info": plot_info},
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, path)
+
+
+def prune_page_cache(cache_dir: str, keys: set):
+    """Remove cached pages whose content hash is not among ``keys``, ie plots that are no longer produced."""
+    for path in glob.glob(os.path.join(cache_dir, "*.pkl")):
+        if os.path.basename(path)[: -len(".pkl")] not in keys:
+            os.remove(path)
+
+
+def write_pdf_pages(plt_file: str, sections: list):
+    """
+    Write pages to a multi-page PDF file, in order.
+
+    Parameters
+    ----------
+    plt_file : str
+        Path of the output PDF file.
+    sections : list
+        List of lists of pickled figures, one list per plot.
+    """
+    with PdfPages(plt_file) as pdf:
+        for pages in sections:
+            for page in pages:
+                fig = pickle.loads(page)
+                fig.savefig(pdf, format="pdf", bbox_inches="tight")
+                plt.close(fig)
+
+
 # -------------------------------------------------------------------------------
 # mapping user keywords to plot style functions
 # -------------------------------------------------------------------------------
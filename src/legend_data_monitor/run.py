@@ -97,6 +97,11 @@ def add_user_config_parser(subparsers):
         "--config",
         help="""Path to config file (e.g. \"some_path/config_L200_r001_phy.yaml\").""",
     )
+    parser_auto_prod.add_argument(
+        "--explain",
+        action="store_true",
+        help="""Show the execution plan (parameters to load, shared analyses and their plots) with its estimated cost, and exit without loading data.""",
+    )
     parser_auto_prod.set_defaults(func=user_config_cli)
 
 
@@ -104,6 +109,10 @@ def user_config_cli(args):
     """Pass command line arguments to :func:`.core.control_plots`."""
     config_file = args.config
 
+    if args.explain:
+        legend_data_monitor.core.explain_plots(config_file)
+        return
+
     legend_data_monitor.core.control_plots(config_file)
 
 
@@ -121,6 +130,11 @@ def add_user_bunch_parser(subparsers):
         "--n_files",
         help="""Number (int) of files of a given run you want to inspect at each cycle.""",
     )
+    parser_auto_prod.add_argument(
+        "--explain",
+        action="store_true",
+        help="""Show the execution plan (parameters to load, shared analyses and their plots) with its estimated cost, and exit without loading data.""",
+    )
     parser_auto_prod.set_defaults(func=user_bunch_cli)
 
 
@@ -129,6 +143,10 @@ def user_bunch_cli(args):
     config_file = args.config
     n_files = args.n_files
 
+    if args.explain:
+        legend_data_monitor.core.explain_plots(config_file)
+        return
+
     legend_data_monitor.core.control_plots(config_file, n_files)
 
 
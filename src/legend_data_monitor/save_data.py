@@ -3,6 +3,7 @@ import shelve
 
 import h5py
 from pandas import DataFrame, concat, read_hdf
+from pandas.api.types import is_numeric_dtype
 
 from . import utils
 
@@ -453,6 +454,7 @@ def save_hdf(
         "time_window",
         "resampled",
         "unit_label",
+        "decimate",
     ]
 
     for param in parameters:
@@ -637,6 +639,15 @@ def save_hdf(
                     file_path,
                     saving,
                 )
+                # ... distributions of classifiers
+                if param_orig.endswith("_classifier"):
+                    get_sketch(
+                        df_to_save,
+                        param_orig,
+                        f"{utils.FLAGS_RENAME[evt_type]}_{param_orig_camel}",
+                        file_path,
+                        saving,
+                    )
         else:
             # ... absolute values
             get_pivot(
@@ -646,6 +657,14 @@ def save_hdf(
                 file_path,
                 saving,
             )
+            # ... distributions of absolute values
+            get_sketch(
+                df_to_save,
+                param_orig,
+                f"{utils.FLAGS_RENAME[evt_type]}_{param_orig_camel}",
+                file_path,
+                saving,
+            )
             # ... mean values
             get_pivot(
                 df_to_save,
@@ -664,59 +683,33 @@ def save_hdf(
             )
 
             # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            # RATIO WRT AUX CHANNEL
+            # RATIO/DIFFERENCE WRT AUX CHANNEL
             # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+            # absolute values and % variations are derived at read time (see utils.read_aux_variant)
+            # from the absolute values above and the AUX values, saved once per timestamp
+            aux_variants = {}
+            aux_values = None
             if not utils.check_empty_df(aux_ratio_analysis):
-                # ... absolute values
-                get_pivot(
-                    df_aux_ratio_to_save,
-                    param_orig,
-                    f"{utils.FLAGS_RENAME[evt_type]}_{param_orig_camel}_{aux_ch}Ratio",
-                    file_path,
-                    saving,
-                )
-                # ... mean values
-                get_pivot(
-                    df_aux_ratio_to_save,
-                    param_orig + "_mean",
-                    f"{utils.FLAGS_RENAME[evt_type]}_{param_orig_camel}_{aux_ch}Ratio_mean",
-                    file_path,
-                    saving,
-                )
-                # ... % variations wrt absolute values
-                get_pivot(
-                    df_aux_ratio_to_save,
-                    param_orig + "_var",
-                    f"{utils.FLAGS_RENAME[evt_type]}_{param_orig_camel}_{aux_ch}Ratio_var",
-                    file_path,
-                    saving,
-                )
-
-            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-            # DIFFERENCE WRT AUX CHANNEL
-            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+                aux_variants["Ratio"] = df_aux_ratio_to_save
+                aux_values = aux_ratio_analysis.aux_values
             if not utils.check_empty_df(aux_diff_analysis):
-                # ... absolute values
+                aux_variants["Diff"] = df_aux_diff_to_save
+                aux_values = aux_diff_analysis.aux_values
+            if aux_values is not None:
+                # ... AUX values (once per timestamp, from all channels)
                 get_pivot(
-                    df_aux_diff_to_save,
-                    param_orig,
-                    f"{utils.FLAGS_RENAME[evt_type]}_{param_orig_camel}_{aux_ch}Diff",
+                    aux_values,
+                    aux_ch,
+                    f"{utils.FLAGS_RENAME[evt_type]}_{param_orig_camel}_{aux_ch}",
                     file_path,
                     saving,
                 )
+            for variant, df_variant in aux_variants.items():
                 # ... mean values
                 get_pivot(
-                    df_aux_diff_to_save,
+                    df_variant,
                     param_orig + "_mean",
-                    f"{utils.FLAGS_RENAME[evt_type]}_{param_orig_camel}_{aux_ch}Diff_mean",
-                    file_path,
-                    saving,
-                )
-                # ... % variations wrt absolute values
-                get_pivot(
-                    df_aux_diff_to_save,
-                    param_orig + "_var",
-                    f"{utils.FLAGS_RENAME[evt_type]}_{param_orig_camel}_{aux_ch}Diff_var",
+                    f"{utils.FLAGS_RENAME[evt_type]}_{param_orig_camel}_{aux_ch}{variant}_mean",
                     file_path,
                     saving,
                 )
@@ -726,6 +719,29 @@ def save_hdf(
     )
 
 
+def get_aux_series(
+    df: DataFrame, parameter: str, aux_ch: str, event_type: str
+) -> DataFrame:
+    """
+    Return the AUX values of a given parameter once per timestamp, in the long format used by :func:`get_pivot` (channel and value columns named after ``aux_ch``).
+
+    Values are taken from all rows of the subsystem data ``df`` (column '<parameter>_<aux_ch>', see :meth:`.subsystem.Subsystem.include_aux`)
+    of the selected event type, so that they cover the timestamps of every channel.
+    """
+    df_aux = df.loc[
+        utils.get_event_mask(df, event_type),
+        ["datetime", f"{parameter}_{aux_ch}"],
+    ].drop_duplicates(subset="datetime")
+
+    return DataFrame(
+        {
+            "datetime": df_aux["datetime"].to_numpy(),
+            "channel": aux_ch,
+            aux_ch: df_aux[f"{parameter}_{aux_ch}"].to_numpy(),
+        }
+    )
+
+
 def get_pivot(
     df: DataFrame, parameter: str, key_name: str, file_path: str, saving: str
 ):
@@ -814,6 +830,34 @@ def get_pivot(
         df_pivot.to_hdf(file_path, key=key_name, mode="a")
 
 
+def get_sketch(
+    df: DataFrame, parameter: str, key_name: str, file_path: str, saving: str
+):
+    """
+    Build the histogram sketch (see :func:`utils.build_sketch`) of a parameter and save it in the sketch file next to the HDF monitoring file.
+
+    In 'append' mode, the new sketch is merged with the already saved one, so that distributions over long time ranges never require reading back the full series.
+    """
+    # eg SiPM parameters, where each entry is a list of values
+    if not is_numeric_dtype(df[parameter]):
+        return
+
+    df_pivot = df.pivot(index="datetime", columns="channel", values=parameter)
+    sketch = utils.build_sketch(df_pivot, utils.get_sketch_edges(parameter))
+    sketch_path = utils.get_sketch_path(file_path)
+
+    if saving == "append":
+        old_sketch = utils.load_sketch(sketch_path, key_name)
+        try:
+            sketch = utils.merge_sketches([old_sketch, sketch])
+        except ValueError:
+            utils.logger.warning(
+                f"Binning of the saved sketch {key_name} changed, we will create a new one."
+            )
+
+    utils.save_sketch(sketch_path, key_name, sketch)
+
+
 def check_existence_and_overwrite(file: str):
     """Check for the existence of a file, and if it exists removes it."""
     if os.path.exists(file):
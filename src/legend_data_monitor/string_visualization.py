@@ -7,6 +7,7 @@
 
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 import seaborn as sns
 from matplotlib.backends.backend_pdf import PdfPages
 from pandas import DataFrame, Timedelta, concat
@@ -17,11 +18,12 @@ from . import plotting, utils
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # CHANNELS' STATUS FUNCTION
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-def status_plot(subsystem, data_analysis: DataFrame, plot_info: dict, pdf: PdfPages):
-    # -------------------------------------------------------------------------
-    # plot a map with statuses of channels
-    # -------------------------------------------------------------------------
+def check_status(subsystem, data_analysis: DataFrame, plot_info: dict):
+    """
+    Evaluate the status of all channels wrt the thresholds of the plotted parameter, warning about channels out of threshold.
 
+    Return the status of all channels (OFF channels included) and the title of the status map, or None if there are no thresholds to check.
+    """
     banner = "\33[95m" + "~" * 50 + "\33[0m"
     utils.logger.info(banner)
     utils.logger.info("\33[95m S T A T U S  M A P : %s\33[0m", plot_info["title"])
@@ -55,90 +57,26 @@ def status_plot(subsystem, data_analysis: DataFrame, plot_info: dict, pdf: PdfPa
     if low_thr is None and high_thr is None:
         # there is no point to check values if there are no thresholds
         utils.logger.debug("... there are no thresholds to check for. We skip this!")
-        return
-
-    new_dataframe = DataFrame()
-    # loop over individual channels (otherwise, the problematic timestamps apply to all detectors, even the OK ones) and create a summary dataframe
-    for channel in data_analysis["channel"].unique():
-        # select one block of DataFrame
-        data_per_ch = data_analysis.loc[data_analysis["channel"] == channel]
-        # let's save some info (they could be lost after resampling, or wrongly averaged - this keeps us safe from similar bugs)
-        name = (data_per_ch["name"].unique())[0]
-        location = (data_per_ch["location"].unique())[0]
-        position = (data_per_ch["position"].unique())[0]
-        # if not the event rate, study the status looking at the resample values
-        if not plot_info["parameter"] == "event_rate":
-            data_per_ch = (
-                data_per_ch.set_index("datetime")
-                .resample(plot_info["time_window"], origin="start")
-                .mean(numeric_only=True)
-            )
-            data_per_ch = data_per_ch.reset_index()
-            data_per_ch["datetime"] = (
-                data_per_ch["datetime"] + Timedelta(plot_info["time_window"]) / 2
-            )
-
-        status = 0  # -> OK detector (update it if it's out of threshold)
-        # get timestamp where the interval is out of threshold
-        out_thr_datetimes = np.array([], dtype="datetime64")
-        if low_thr is not None or high_thr is not None:
-            if low_thr is None and high_thr is not None:
-                if (data_per_ch[plot_info["parameter"]] > high_thr).any():
-                    status = 1  # -> problematic detector
-                    out_thr_datetimes = np.append(
-                        out_thr_datetimes,
-                        data_per_ch.loc[
-                            data_per_ch[plot_info["parameter"]] > high_thr, "datetime"
-                        ].values,
-                    )
-
-            if low_thr is not None and high_thr is None:
-                if (data_per_ch[plot_info["parameter"]] < low_thr).any():
-                    status = 1  # -> problematic detector
-                    out_thr_datetimes = np.append(
-                        out_thr_datetimes,
-                        data_per_ch.loc[
-                            data_per_ch[plot_info["parameter"]] < low_thr, "datetime"
-                        ].values,
-                    )
-
-            if low_thr is not None and high_thr is not None:
-                if (data_per_ch[plot_info["parameter"]] < low_thr).any() or (
-                    data_per_ch[plot_info["parameter"]] > high_thr
-                ).any():
-                    status = 1  # -> problematic detector
-                    out_thr_datetimes = np.append(
-                        out_thr_datetimes,
-                        data_per_ch.loc[
-                            data_per_ch[plot_info["parameter"]] > high_thr, "datetime"
-                        ].values,
-                    )
-                    out_thr_datetimes = np.append(
-                        out_thr_datetimes,
-                        data_per_ch.loc[
-                            data_per_ch[plot_info["parameter"]] < low_thr, "datetime"
-                        ].values,
-                    )
+        return None
+
+    # status of all channels at once (otherwise, the problematic timestamps apply to all detectors, even the OK ones)
+    new_dataframe, out_thr_datetimes = get_channel_status(
+        data_analysis,
+        plot_info["parameter"],
+        plot_info["time_window"],
+        low_thr,
+        high_thr,
+    )
 
-            # create a new row in the new dataframe with essential info (ie: channel, name, location, position, status)
-            new_row = [[channel, name, location, position, status]]
-            new_df = DataFrame(
-                new_row, columns=["channel", "name", "location", "position", "status"]
-            )
-            new_dataframe = concat([new_dataframe, new_df], ignore_index=True, axis=0)
-
-        # print message with timestamps where the detector is out of threshold
-        if len(out_thr_datetimes) != 0:
-            out_thr_datetimes = [
-                str(time).replace("T", " ")[:-10] for time in out_thr_datetimes
-            ]
-            utils.logger.warning(
-                "\033[93mChannel %s (str. %s, pos. %s) is out of threshold at:\n%s\033[0m",
-                channel,
-                location,
-                position,
-                out_thr_datetimes,
-            )
+    # print message with timestamps where the detector is out of threshold
+    for row in new_dataframe[new_dataframe["status"] == 1].itertuples():
+        utils.logger.warning(
+            "\033[93mChannel %s (str. %s, pos. %s) is out of threshold at:\n%s\033[0m",
+            row.channel,
+            row.location,
+            row.position,
+            out_thr_datetimes[row.channel],
+        )
 
     # --------------------------------------------------------------------------------------------------------------------------
     # include OFF channels and see what is their status
@@ -208,6 +146,20 @@ def status_plot(subsystem, data_analysis: DataFrame, plot_info: dict, pdf: PdfPa
             "Status map summary for " + plot_info["parameter"] + ":\n%s", output_result
         )
 
+    return new_dataframe, plot_title
+
+
+def status_plot(subsystem, data_analysis: DataFrame, plot_info: dict, pdf: PdfPages):
+    # -------------------------------------------------------------------------
+    # plot a map with statuses of channels
+    # -------------------------------------------------------------------------
+
+    status = check_status(subsystem, data_analysis, plot_info)
+    if status is None:
+        return
+    new_dataframe, plot_title = status
+    result = new_dataframe.pivot(index="position", columns="location", values="status")
+
     # --------------------------------------------------------------------------------------------------------------------------
     # create the figure
     fig = plt.figure(num=None, figsize=(8, 12), dpi=80, facecolor="w", edgecolor="k")
@@ -278,6 +230,100 @@ def status_plot(subsystem, data_analysis: DataFrame, plot_info: dict, pdf: PdfPa
     return fig
 
 
+def get_channel_status(
+    data_analysis: DataFrame,
+    parameter: str,
+    time_window: str,
+    low_thr: float | None,
+    high_thr: float | None,
+):
+    """
+    Evaluate the status of all channels in one grouped reduction.
+
+    Unless the parameter is the event rate, values of each channel are first averaged in time windows starting from the first
+    timestamp of the channel (as ``resample(time_window, origin="start")`` does).
+    A channel is problematic (status 1) if any (averaged) value is out of thresholds, otherwise it is OK (status 0).
+
+    Return a dataframe with columns 'channel', 'name', 'location', 'position' and 'status' (one row per channel), and a dictionary
+    with the list of times (as strings) where each problematic channel is out of thresholds.
+
+    Parameters
+    ----------
+    data_analysis : DataFrame
+        Analysis dataframe with 'channel', 'name', 'location', 'position', 'datetime' and parameter columns.
+    parameter : str
+        Parameter to check.
+    time_window : str
+        Time window used to average values, eg '10min'.
+    low_thr : float | None
+        Low threshold, if any.
+    high_thr : float | None
+        High threshold, if any.
+    """
+    channels, first, codes = np.unique(
+        data_analysis["channel"].to_numpy(), return_index=True, return_inverse=True
+    )
+    # let's save some info (they could be lost after resampling, or wrongly averaged - this keeps us safe from similar bugs)
+    info = data_analysis.iloc[first][["channel", "name", "location", "position"]]
+    values = data_analysis[parameter].to_numpy(dtype=float)
+    times = data_analysis["datetime"]
+    # if not the event rate, study the status looking at the resample values
+    if not parameter == "event_rate":
+        window = Timedelta(time_window)
+        times_ns = pd.DatetimeIndex(times).as_unit("ns").asi8
+        start = np.full(len(channels), np.iinfo(np.int64).max)
+        np.minimum.at(start, codes, times_ns)
+        bucket = (times_ns - start[codes]) // window.value
+        # one key per (channel, time window): average values with a single bincount
+        n_buckets = int(bucket.max()) + 1 if len(bucket) else 1
+        keys = codes * n_buckets + bucket
+        is_valid = ~np.isnan(values)
+        sums = np.bincount(
+            keys[is_valid],
+            weights=values[is_valid],
+            minlength=len(channels) * n_buckets,
+        )
+        counts = np.bincount(keys[is_valid], minlength=len(channels) * n_buckets)
+        keys = np.flatnonzero(counts)
+        codes, bucket = np.divmod(keys, n_buckets)
+        values = sums[keys] / counts[keys]
+        # resampled values are placed in the middle of their time window
+        times = pd.Series(
+            pd.to_datetime(
+                start[codes] + bucket * window.value + window.value // 2, utc=True
+            )
+        )
+
+    is_out = np.zeros(len(values), dtype=bool)
+    if high_thr is not None:
+        is_out |= values > high_thr
+    if low_thr is not None:
+        is_out |= values < low_thr
+
+    status = np.zeros(len(channels), dtype=int)
+    status[np.unique(codes[is_out])] = 1
+    new_dataframe = info.assign(status=status).reset_index(drop=True)
+
+    out_times = pd.DatetimeIndex(times)[is_out]
+    if out_times.tz is not None:
+        out_times = out_times.tz_convert("UTC").tz_localize(None)
+    out_thr = DataFrame(
+        {
+            "channel": channels[codes[is_out]],
+            "datetime": [
+                time.replace("T", " ")
+                for time in np.datetime_as_string(out_times.to_numpy(), unit="s")
+            ],
+        }
+    ).sort_values("datetime", kind="stable")
+    out_thr_datetimes = {
+        channel: list(datetimes)
+        for channel, datetimes in out_thr.groupby("channel")["datetime"]
+    }
+
+    return new_dataframe, out_thr_datetimes
+
+
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 # EXPOSURE FUNCTION
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -108,6 +108,8 @@ class Subsystem:
         # -------------------------------------------------------------------------
         # have something before get_data() is called just in case
         self.data = pd.DataFrame()
+        # analyses of the data shared by plots (see analysis_data.get_analysis_data)
+        self.analysis_cache = {}
 
     def get_data(self, parameters: typing.Union[str, list_of_str, tuple_of_str] = ()):
         """
@@ -328,73 +330,42 @@ class Subsystem:
             self.flag_muon_events()
         utils.logger.info("... flagge pulser | FC bsl | muon events")
 
-    def include_aux(
-        self, params: Union[str, list], dataset: dict, plot: dict, aux_ch: str
-    ):
-        """Include in a new column data coming from PULS01ANA aux channel, to either compute a ratio or a difference with data coming from the inspected subsystem."""
+    def include_aux(self, params: Union[str, list], dataset: dict, aux_ch: str):
+        """Include in new columns data coming from PULS01ANA aux channel, to either compute a ratio or a difference with data coming from the inspected subsystem; parameters not merged yet are loaded at once."""
         # auxiliary channel of reference (fixed for the moment)
         aux_channel = "pulser01ana"
-        # both options (diff and ratio) are present -> BAD! For this parameter we do not subtract/divide for any AUX entry
-        if "AUX_ratio" in plot.keys() and "AUX_diff" in plot.keys():
-            utils.logger.error(
-                "\033[91mYou selected both 'AUX_ratio' and 'AUX_diff' for %s. Pick one!\033[0m",
-                plot["parameters"],
-            )
-            sys.exit()
-        # one option (either diff or ratio) is present
-        if "AUX_ratio" in plot.keys() or "AUX_diff" in plot.keys():
-            # check if the selected AUX channel exists, otherwise continue
-            if "AUX_ratio" in plot.keys() and plot["AUX_ratio"] is True:
-                utils.logger.debug(
-                    "... you are going to plot the parameter accounting for the ratio wrt PULS01ANA data"
-                )
-            if "AUX_diff" in plot.keys() and plot["AUX_diff"] is True:
-                utils.logger.debug(
-                    "... you are going to plot the parameter accounting for the difference wrt PULS01ANA data"
-                )
+        params = [params] if isinstance(params, str) else list(params)
 
-            utils.logger.debug(
-                "... but now we are going to perform diff/ratio with PULS01ANA entries"
-            )
-
-        def add_aux(param):
+        def add_aux(params):
             aux_subsys = Subsystem(aux_channel, dataset=dataset)
             # get data for these parameters and time range given in the dataset
             # (if no parameters given to plot, baseline and wfmax will always be loaded to flag pulser events anyway)
-            aux_subsys.get_data(param)
+            aux_subsys.get_data(params)
 
             # Merge the dataframes based on the 'datetime' column
             utils.logger.debug(
                 "... merging the PULS01ANA dataframe with the original one"
             )
             self.data = self.data.merge(
-                aux_subsys.data[["datetime", param]], on="datetime", how="left"
-            )
-
-            # ratio
-            self.data[f"{param}_{aux_ch}Ratio"] = (
-                self.data[f"{param}_x"] / self.data[f"{param}_y"]
-            )
-            # diff
-            self.data[f"{param}_{aux_ch}Diff"] = (
-                self.data[f"{param}_x"] - self.data[f"{param}_y"]
+                aux_subsys.data[["datetime"] + params], on="datetime", how="left"
             )
+            # ratio/diff wrt the AUX channel are derived when needed (see analysis_data.get_aux_df)
             # rename columns (absolute values)
-            self.data = self.data.rename(
-                columns={f"{param}_x": param, f"{param}_y": f"{param}_{aux_ch}"}
-            )
+            for param in params:
+                self.data = self.data.rename(
+                    columns={f"{param}_x": param, f"{param}_y": f"{param}_{aux_ch}"}
+                )
 
-        # one-parameter case
-        if (isinstance(params, list) and len(params) == 1) or isinstance(params, str):
-            param = params if isinstance(params, str) else params[0]
+        params_to_add = []
+        for param in params:
             # check if the parameter under study is special; if so, skip it
             if param in utils.SPECIAL_PARAMETERS.keys():
                 utils.logger.warning(
                     "\033[93m'%s' is a special parameter. "
                     + "For the moment, we skip the ratio/diff wrt the AUX channel and plot the parameter as it is.\033[0m",
-                    params,
+                    param,
                 )
-                return
+                continue
             if param in [
                 "quality_cuts",
                 "geds/quality/is_not_bb_like/is_delayed_discharge",
@@ -402,9 +373,9 @@ class Subsystem:
             ]:
                 utils.logger.warning(
                     "\033[93m'%s' does not require the ratio/diff wrt the AUX channel. Skip this step.\033[0m",
-                    params,
+                    param,
                 )
-                return
+                continue
             # check if the parameter under study is from 'hit' tier; if so, skip it
             if (
                 param in utils.PARAMETER_TIERS.keys()
@@ -413,31 +384,14 @@ class Subsystem:
                 utils.logger.warning(
                     "\033[93m'%s' is saved in hit tier, for which no AUX channel is present. "
                     + "We skip the ratio/diff wrt the AUX channel and plot the parameter as it is.\033[0m",
-                    params,
+                    param,
                 )
-                return
+                continue
             if f"{param}_{aux_channel}" not in list(self.data.columns):
-                add_aux(params)
+                params_to_add.append(param)
 
-        # multiple-parameters case
-        if isinstance(params, list) and len(params) > 1:
-            for param in params:
-                if param in utils.SPECIAL_PARAMETERS.keys():
-                    utils.logger.warning(
-                        "\033[93m'%s' is a special parameter. "
-                        + "For the moment, we skip the ratio/diff wrt the AUX channel and plot the parameter as it is.\033[0m",
-                        params,
-                    )
-                    return
-                if utils.PARAMETER_TIERS[param] == "hit":
-                    utils.logger.warning(
-                        "\033[93m'%s' is saved in hit tier, for which no AUX channel is present. "
-                        + "We skip the ratio/diff wrt the AUX channel and plot the parameter as it is.\033[0m",
-                        param,
-                    )
-                    continue
-                if f"{param}_{aux_channel}" not in list(self.data.columns):
-                    add_aux(params)
+        if params_to_add:
+            add_aux(params_to_add)
 
     def flag_pulser_events(self, pulser=None):
         """Flag pulser events. If a pulser object was provided, flag pulser events in data based on its flag."""
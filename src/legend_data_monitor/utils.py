@@ -1,17 +1,26 @@
 import glob
+import hashlib
 import importlib.resources
+import io
 import json
 import logging
+import multiprocessing
 import os
+import pickle
 import re
 import smtplib
 import sys
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from functools import lru_cache
 
 import h5py
+import matplotlib
+import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import yaml
@@ -113,6 +122,26 @@ with open(pkg / "settings" / "remove-keys.yaml") as f:
 with open(pkg / "settings" / "remove-dets.yaml") as f:
     REMOVE_DETS = yaml.load(f, Loader=yaml.CLoader)["remove-dets"]
 
+# number of decoded HDF frames kept in memory by read_hdf_cached (least recently used ones are dropped first)
+HDF_CACHE_SIZE = 32
+
+# maximum number of worker processes rendering figures in parallel (see render_figures);
+# each spawned worker pays a few seconds of imports, more than drawing the figures of a typical run,
+# so figures are drawn in the current process unless set with the LEGEND_DATA_MONITOR_RENDER_WORKERS environment variable
+RENDER_MAX_WORKERS = max(
+    1, int(os.environ.get("LEGEND_DATA_MONITOR_RENDER_WORKERS", 1))
+)
+
+# directory where metadata derived for each production version are stored
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "legend-data-monitor",
+)
+# quality bitmask schemas (see get_bitmask_schema)
+BITMASK_CACHE_DIR = os.path.join(CACHE_DIR, "bitmasks")
+# run x detector exposure tables (see exposure.get_exposure_table)
+EXPOSURE_CACHE_DIR = os.path.join(CACHE_DIR, "exposure")
+
 # -------------------------------------------------------------------------
 # Subsystem related functions (for getting channel map & status)
 # -------------------------------------------------------------------------
@@ -808,12 +837,133 @@ def load_tier_config(path: str, version: str, tier_name: str):
     return config_data
 
 
-def get_all_plot_parameters(subsystem: str, config: dict):
-    """Get list of all parameters needed for all plots for given subsystem."""
+def resolve_bitmask_flags(path: str, version: str) -> dict | None:
+    """
+    Read the evt tier configuration of a production and return the flag values defining good quality events.
+
+    Return a dictionary with the required value of each flag ('flags', eg {'is_valid_baseline': 1}) and the configuration files they were read from ('sources'),
+    or None if no evt tier configuration is found.
+
+    Parameters
+    ----------
+    path : str
+        Path to the processing environment, e.g. '/data2/public/prodenv/prod-blind'.
+    version : str
+        Version of data under inspection, e.g. 'tmp-auto'.
+    """
+    for subdir in ["tier_evt", "tier/evt"]:
+        config_dir = os.path.join(path, version, "inputs/dataprod/config", subdir)
+        files = glob.glob(os.path.join(config_dir, "*-all-evt_config.yaml"))
+        if files:
+            break
+    else:
+        return None
+
+    filepath = files[0]
+    # every file consulted is a source: an update of any of them can change the flags
+    sources = [os.path.abspath(filepath)]
+    with open(filepath) as file:
+        evt_config = yaml.load(file, Loader=yaml.CLoader)
+
+    # older productions keep the QC expressions in a dedicated geds_qc evt configuration
+    operations = evt_config["operations"]
+    if (
+        "_geds___quality___is_bb_like" not in operations
+        or "geds___quality___is_not_bb_like___is_delayed_discharge" not in operations
+    ):
+        filepath = glob.glob(os.path.join(config_dir, "*-geds_qc-evt_config.yaml"))[0]
+        sources.append(os.path.abspath(filepath))
+        with open(filepath) as file:
+            operations = yaml.load(file, Loader=yaml.CLoader)["operations"]
+    expression = operations["geds___quality___is_not_bb_like___is_delayed_discharge"][
+        "expression"
+    ]
+
+    # extract key-value pairs like: hit.is_something == number
+    matches = re.findall(r"hit\.(\w+)\s*==\s*(\d+)", expression)
+
+    return {
+        "flags": {key: int(value) for key, value in matches},
+        "sources": sources,
+    }
+
+
+def get_version_key(path: str, version: str) -> str:
+    """Return a short key identifying a production version, used to name files of cached metadata."""
+    return hashlib.sha256(os.path.join(path, version).encode()).hexdigest()[:16]
+
+
+def get_bitmask_cache_path(path: str, version: str) -> str:
+    """Return the file storing the quality bitmask schema of a production version (see :func:`get_bitmask_schema`)."""
+    return os.path.join(BITMASK_CACHE_DIR, f"{get_version_key(path, version)}.json")
+
+
+@lru_cache(maxsize=None)
+def get_bitmask_schema(path: str, version: str) -> dict | None:
+    """
+    Return the quality bitmask schema of a production version, as read-only arrays of flag names ('flags') and required values ('values').
+
+    The schema is resolved once per production version: it is kept in memory and stored on disk (see ``BITMASK_CACHE_DIR``),
+    where it is reused as long as the evt tier configuration it was read from is unchanged. Return None if no evt tier configuration is found.
+
+    Parameters
+    ----------
+    path : str
+        Path to the processing environment, e.g. '/data2/public/prodenv/prod-blind'.
+    version : str
+        Version of data under inspection, e.g. 'tmp-auto'.
+    """
+    cache_path = get_bitmask_cache_path(path, version)
+    schema = None
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if all(
+            list(get_file_signature(source)) == signature
+            for source, signature in cached["sources"].items()
+        ):
+            schema = cached
+            logger.debug("... quality bitmask schema taken from %s", cache_path)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    if schema is None:
+        resolved = resolve_bitmask_flags(path, version)
+        if resolved is None:
+            return None
+        schema = {
+            "flags": resolved["flags"],
+            "sources": {
+                source: list(get_file_signature(source))
+                for source in resolved["sources"]
+            },
+        }
+        try:
+            os.makedirs(BITMASK_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(schema, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.debug("... quality bitmask schema not stored on disk: %s", e)
+
+    flags = np.array(list(schema["flags"].keys()), dtype=str)
+    values = np.array(list(schema["flags"].values()), dtype=np.int64)
+    flags.setflags(write=False)
+    values.setflags(write=False)
+
+    return {"flags": flags, "values": values}
+
+
+def get_all_plot_parameters(
+    subsystem: str, config: dict, hit_config: dict | None = None
+):
+    """Get list of all parameters needed for all plots for given subsystem; the hit tier config (for QC and classifier flags) is loaded if not provided."""
     version = config["dataset"]["version"]
     path = config["dataset"]["path"]
     # load hit QC and classifier flags
-    hit_config = load_tier_config(path, version, "hit")
+    if hit_config is None:
+        hit_config = load_tier_config(path, version, "hit")
     is_entries = [
         entry
         for entry in hit_config["outputs"]
@@ -992,15 +1142,127 @@ def bunch_dataset(config: dict, n_files=None):
     return filtered_files
 
 
+def get_file_signature(file_path: str) -> tuple:
+    """Return the modification time (ns) and size of a file, used to invalidate cached reads once the file changes."""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_directory_signature(dir_path: str) -> str:
+    """Return a hex digest of the names, modification times (ns) and sizes of all files below a directory (a missing directory counts as empty), used to invalidate cached metadata once any of them changes."""
+    signatures = []
+    for root, dirs, files in os.walk(dir_path):
+        dirs.sort()
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
+            signatures.append(
+                (os.path.relpath(file_path, dir_path), *get_file_signature(file_path))
+            )
+
+    return get_content_hash(signatures)
+
+
+@lru_cache(maxsize=256)
+def get_hdf_keys_at(hdf_path: str, signature: tuple) -> tuple:
+    """Return the keys of a HDF file with the given signature (see :func:`get_file_signature`); results are cached."""
+    with pd.HDFStore(hdf_path, mode="r") as store:
+        return tuple(store.keys())
+
+
+@lru_cache(maxsize=HDF_CACHE_SIZE)
+def read_hdf_at(hdf_path: str, signature: tuple, key: str) -> DataFrame:
+    """Read a key of a HDF file with the given signature (see :func:`get_file_signature`); results are cached, do not modify them in place."""
+    return pd.read_hdf(hdf_path, key=key)
+
+
+def get_hdf_keys(hdf_path: str) -> tuple:
+    """Return the keys of a HDF file, re-reading them only if the file changed since the last call."""
+    if not os.path.exists(hdf_path):
+        # nothing to cache, let HDFStore raise the usual error
+        with pd.HDFStore(hdf_path, mode="r") as store:
+            return tuple(store.keys())
+
+    return get_hdf_keys_at(os.path.abspath(hdf_path), get_file_signature(hdf_path))
+
+
+def read_hdf_cached(hdf_path: str, key: str) -> DataFrame | None:
+    """
+    Read a key ('key' or '/key') of a HDF file, or return None if the key does not exist.
+
+    Decoded frames are kept in a process-wide LRU cache (see ``HDF_CACHE_SIZE``) keyed by path, modification time, size and key,
+    so that repeated reads of an unchanged file do not open and parse it again; a copy is returned, that can be freely modified.
+
+    Parameters
+    ----------
+    hdf_path : str
+        Path to the HDF file.
+    key : str
+        Key to read.
+    """
+    key = "/" + key.lstrip("/")
+    hdf_path = os.path.abspath(hdf_path)
+    signature = get_file_signature(hdf_path)
+    if key not in get_hdf_keys_at(hdf_path, signature):
+        return None
+
+    return read_hdf_at(hdf_path, signature, key).copy()
+
+
+def read_aux_variant(
+    hdf_path: str, key: str, aux_ch: str, variant: str
+) -> DataFrame | None:
+    """
+    Read the ratio/difference wrt an AUX channel of the values saved under a key, or None if not available.
+
+    The AUX values are saved once per timestamp (key '<key>_<aux_ch>'), and are broadcast against the values of all channels;
+    files written before this was the case store the full datetime x channel matrix, which is read instead.
+
+    Parameters
+    ----------
+    hdf_path : str
+        Path to the HDF file.
+    key : str
+        Key of the absolute values, eg 'IsPulser_Baseline'.
+    aux_ch : str
+        Auxiliary channel, eg 'pulser01ana'.
+    variant : str
+        'Ratio' or 'Diff', optionally followed by '_var' for % variations wrt the saved mean values (eg 'Ratio_var').
+    """
+    aux = read_hdf_cached(hdf_path, f"{key}_{aux_ch}")
+    if aux is None:
+        return read_hdf_cached(hdf_path, f"{key}_{aux_ch}{variant}")
+    values = read_hdf_cached(hdf_path, key)
+    if values is None:
+        return None
+
+    # AUX values may be saved for timestamps without values (eg removed by cuts)
+    aux = aux[aux_ch]
+    aux = aux[~aux.index.duplicated(keep="last")].reindex(values.index)
+    variant, _, var = variant.partition("_")
+    df = values.div(aux, axis=0) if variant == "Ratio" else values.sub(aux, axis=0)
+    if var:
+        mean = read_hdf_cached(hdf_path, f"{key}_{aux_ch}{variant}_mean")
+        if mean is None:
+            return None
+        df = (df / mean.iloc[0] - 1) * 100
+
+    return df
+
+
+def clear_hdf_cache():
+    """Drop all the cached HDF keys and frames."""
+    get_hdf_keys_at.cache_clear()
+    read_hdf_at.cache_clear()
+
+
 def check_key_existence(hdf_path: str, key_to_load: str) -> bool:
     """Check if a specific key exists in the specified hdf file path."""
     try:
-        with pd.HDFStore(hdf_path, mode="r") as store:
-            if key_to_load in store.keys():
-                return True
-            else:
-                logger.debug(f"Key '{key_to_load}' not found in {hdf_path}")
-                return False
+        if key_to_load in get_hdf_keys(hdf_path):
+            return True
+        else:
+            logger.debug(f"Key '{key_to_load}' not found in {hdf_path}")
+            return False
     except FileNotFoundError:
         logger.debug(f"HDF file '{hdf_path}' does not exist")
         return False
@@ -1009,6 +1271,163 @@ def check_key_existence(hdf_path: str, key_to_load: str) -> bool:
         return False
 
 
+def get_decimation_buckets(ax) -> int:
+    """Return the number of pixel columns spanned by an axis, used as number of buckets when decimating a series drawn on it."""
+    return max(1, int(np.ceil(ax.bbox.width)))
+
+
+def get_decimation_indices(x, ys: list, n_buckets: int) -> np.ndarray:
+    """
+    Return the (sorted) indices of the points to draw when decimating series that share the x values ``x``.
+
+    The x range is split into ``n_buckets`` equal buckets (eg one per pixel column) and, for each bucket, the first and last points
+    are kept together with the minimum and the maximum of each series, so that spikes and gaps remain visible once drawn.
+    All points are kept if there are less than 4 points per bucket.
+
+    Parameters
+    ----------
+    x : array-like
+        Sorted x values (numeric or datetime64).
+    ys : list
+        List of y arrays, with the same length of ``x``.
+    n_buckets : int
+        Number of buckets, see :func:`get_decimation_buckets`.
+    """
+    x = np.asarray(x)
+    n = len(x)
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    x = x.astype(float)
+    span = x[-1] - x[0]
+    bucket = (
+        np.minimum(((x - x[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+        if span > 0
+        else np.zeros(n, dtype=np.int64)
+    )
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    keep = [starts, ends]
+    for y in ys:
+        y = np.asarray(y, dtype=float)
+        is_finite = np.isfinite(y)
+        # within each bucket, points are sorted by value (nan entries last)
+        order = np.lexsort((np.where(is_finite, y, np.inf), bucket))
+        n_finite = np.add.reduceat(is_finite.astype(np.int64), starts)
+        keep.append(order[starts])
+        keep.append(order[starts + np.maximum(n_finite, 1) - 1])
+
+    return np.unique(np.concatenate(keep))
+
+
+def init_render_worker():
+    """Select the non-interactive Agg backend in a figure rendering worker."""
+    matplotlib.use("Agg")
+
+
+def render_figure(spec: dict) -> dict:
+    """
+    Draw a figure from a plot spec and return its serialized outputs.
+
+    A plot spec is a picklable dictionary with:
+
+      - 'function': module-level function drawing and returning the figure
+      - 'kwargs': keyword arguments of 'function' (the already prepared data to draw)
+      - 'formats': formats in which the figure is exported ('pdf', 'png'); the pickled figure is always returned
+      - 'savefig': keyword arguments of ``Figure.savefig``, eg ``{"bbox_inches": "tight"}``
+
+    Return a dictionary with the bytes of each output ('pickle', 'pdf', 'png') and the rendering time in seconds ('time').
+
+    Parameters
+    ----------
+    spec : dict
+        Plot spec.
+    """
+    start = time.perf_counter()
+    fig = spec["function"](**spec.get("kwargs", {}))
+
+    outputs = {}
+    for fmt in spec.get("formats", []):
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, **spec.get("savefig", {}))
+        outputs[fmt] = buffer.getvalue()
+    outputs["pickle"] = pickle.dumps(fig)
+    plt.close(fig)
+
+    outputs["time"] = time.perf_counter() - start
+    return outputs
+
+
+def render_figures(specs: list, max_workers: int | None = None) -> list:
+    """
+    Render plot specs (see :func:`render_figure`) in a bounded pool of processes using the Agg backend, and return their outputs in the order of the specs.
+
+    Figures are rendered in the current process unless more workers are configured (see ``RENDER_MAX_WORKERS``).
+    The wall time and the speedup with respect to rendering the figures one by one are logged.
+
+    Parameters
+    ----------
+    specs : list
+        List of plot specs.
+    max_workers : int
+        Maximum number of worker processes; default: RENDER_MAX_WORKERS.
+    """
+    if not specs:
+        return []
+
+    n_workers = max(1, min(len(specs), max_workers or RENDER_MAX_WORKERS))
+    start = time.perf_counter()
+    if n_workers == 1:
+        rendered = [render_figure(spec) for spec in specs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_render_worker,
+        ) as executor:
+            rendered = list(executor.map(render_figure, specs))
+    wall_time = time.perf_counter() - start
+
+    render_time = sum(output["time"] for output in rendered)
+    logger.info(
+        "...rendered %d figures in %.2f s with %d worker(s) (speedup: %.2fx)",
+        len(specs),
+        wall_time,
+        n_workers,
+        render_time / wall_time if wall_time > 0 else 1.0,
+    )
+
+    return rendered
+
+
+def save_rendered_figures(specs: list, rendered: list, shelf=None):
+    """
+    Write rendered figures to disk in the order of the specs: exported formats go to the paths stored under '<format>_path' in each spec (if any), pickled figures to the shelve object under the spec 'shelf_key' (if any).
+
+    Parameters
+    ----------
+    specs : list
+        List of plot specs.
+    rendered : list
+        Outputs of :func:`render_figures` for the given specs.
+    shelf
+        Open shelve object where pickled figures are stored; default: None.
+    """
+    for spec, outputs in zip(specs, rendered):
+        for fmt in spec.get("formats", []):
+            path = spec.get(f"{fmt}_path")
+            if path is None:
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(outputs[fmt])
+        if shelf is not None and spec.get("shelf_key") is not None:
+            shelf[spec["shelf_key"]] = outputs["pickle"]
+
+
 # -------------------------------------------------------------------------
 # Config file related functions (for building files)
 # -------------------------------------------------------------------------
@@ -1144,6 +1563,55 @@ def get_output_plot_path(plt_path: str, extension: str) -> str:
     return plt_file
 
 
+def get_content_hash(*objs) -> str:
+    """
+    Return a hex digest identifying the content of the given objects, to be used as cache key.
+
+    DataFrames and Series are hashed through their values, index and column names; any other object through its representation.
+
+    Parameters
+    ----------
+    objs
+        Objects to hash (eg data to plot and plot settings).
+    """
+    digest = hashlib.sha256()
+    for obj in objs:
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            try:
+                hashed = pd.util.hash_pandas_object(obj, index=True)
+            except TypeError:
+                # unhashable entries (eg lists) are hashed through their string representation
+                hashed = pd.util.hash_pandas_object(obj.astype(str), index=True)
+            digest.update(hashed.to_numpy().tobytes())
+            if isinstance(obj, pd.DataFrame):
+                digest.update(repr(list(obj.columns)).encode())
+        else:
+            digest.update(repr(obj).encode())
+
+    return digest.hexdigest()
+
+
+def get_event_mask(df: DataFrame, event_type: str) -> np.ndarray:
+    """Return a boolean mask of the rows of ``df`` belonging to a given event type ('pulser', 'FCbsln', 'muon', 'phy', 'K_events' or 'all')."""
+    if event_type == "all":
+        return np.ones(len(df), dtype=bool)
+    if event_type == "pulser":
+        return df["flag_pulser"].to_numpy(dtype=bool)
+    if event_type == "FCbsln":
+        return df["flag_fc_bsln"].to_numpy(dtype=bool)
+    if event_type == "muon":
+        return df["flag_muon"].to_numpy(dtype=bool)
+    if event_type == "phy":
+        return ~(
+            df["flag_pulser"].to_numpy(dtype=bool)
+            | df["flag_fc_bsln"].to_numpy(dtype=bool)
+            | df["flag_muon"].to_numpy(dtype=bool)
+        )
+    # K_events
+    energy = df[SPECIAL_PARAMETERS["K_events"][0]].to_numpy()
+    return ~df["flag_pulser"].to_numpy(dtype=bool) & (energy > 1430) & (energy < 1575)
+
+
 # -------------------------------------------------------------------------
 # Other functions
 # -------------------------------------------------------------------------
@@ -2040,3 +2508,293 @@ def build_detector_info(metadata_path, start_key=None):
             str_chns[string].append(det)
 
     return {"detectors": detectors, "str_chns": dict(str_chns)}
+
+
+# -------------------------------------------------------------------------
+# Histogram sketches
+# -------------------------------------------------------------------------
+# moments kept next to the histogram of each channel, with the aggregation used to merge them
+SKETCH_MOMENTS = {
+    "count": "sum",
+    "sum": "sum",
+    "sumsq": "sum",
+    "min": "min",
+    "max": "max",
+}
+
+# binning of QC classifiers, as shown in the classifier distribution plots
+QC_CLASSIFIER_EDGES = np.arange(-15, 15 + 0.4, 0.4)
+
+
+def get_sketch_bin_edges(
+    min_abs: float = 1e-3, max_abs: float = 1e7, rel_width: float = 0.01
+) -> np.ndarray:
+    """
+    Return bin edges with a constant relative width, for both positive and negative values.
+
+    Quantiles estimated from a histogram built with these edges have a relative error below ``rel_width``,
+    independently of the parameter scale; values with absolute value below ``min_abs`` fall in a single central bin.
+
+    Parameters
+    ----------
+    min_abs : float
+        Smallest absolute value resolved by the binning; default: 1e-3.
+    max_abs : float
+        Largest absolute value covered by the binning, larger values fall in under/overflow bins; default: 1e7.
+    rel_width : float
+        Relative width of each bin; default: 0.01.
+    """
+    n_bins = int(np.ceil(np.log(max_abs / min_abs) / np.log1p(rel_width)))
+    positive = min_abs * (1 + rel_width) ** np.arange(n_bins + 1)
+
+    return np.concatenate([-positive[::-1], positive])
+
+
+SKETCH_BIN_EDGES = get_sketch_bin_edges()
+
+
+def get_sketch_edges(parameter: str) -> np.ndarray:
+    """Return the bin edges used for the histogram sketch of a given parameter (QC classifiers keep the binning of their distribution plots)."""
+    if parameter.lower().endswith("classifier"):
+        return QC_CLASSIFIER_EDGES
+
+    return SKETCH_BIN_EDGES
+
+
+def get_sketch_path(hdf_path: str) -> str:
+    """Return the path of the file storing the histogram sketches next to a given HDF monitoring file."""
+    return os.path.splitext(hdf_path)[0] + "-sketch.hdf"
+
+
+def build_sketch(df: DataFrame, bin_edges=None, resample_unit: str = "60min") -> dict:
+    """
+    Build a mergeable histogram sketch of each channel in each time bucket of a time-indexed dataframe.
+
+    The sketch is a dictionary with:
+
+      - 'hist': sparse histogram counts (columns 'datetime', 'channel', 'bin', 'count'), where 'bin' is the index of the lower bin edge,
+        with -1 and len(edges) - 1 collecting under/overflows
+      - 'moments': exact count, sum, sum of squares, min and max (columns 'datetime', 'channel', ...)
+      - 'edges': the bin edges
+
+    Parameters
+    ----------
+    df : DataFrame
+        Time-indexed dataframe (datetime vs channel), eg a key of the monitoring HDF files.
+    bin_edges : array-like
+        Bin edges of the histogram; default: ``SKETCH_BIN_EDGES``.
+    resample_unit : str
+        Width of the time buckets, eg '60min'; default: '60min'.
+    """
+    bin_edges = (
+        SKETCH_BIN_EDGES if bin_edges is None else np.asarray(bin_edges, dtype=float)
+    )
+    values = df.to_numpy(dtype=float)
+    buckets = pd.to_datetime(df.index).floor(resample_unit)
+    rows, cols = np.nonzero(~np.isnan(values))
+    values = values[rows, cols]
+
+    bins = np.searchsorted(bin_edges, values, side="right") - 1
+    # the last edge is included in the last bin, as for np.histogram
+    bins[values == bin_edges[-1]] = len(bin_edges) - 2
+    flat = DataFrame(
+        {
+            "datetime": buckets[rows],
+            "channel": df.columns[cols],
+            "bin": bins,
+            "value": values,
+            "value2": values**2,
+        }
+    )
+
+    hist = flat.groupby(["datetime", "channel", "bin"]).size().rename("count")
+    grouped = flat.groupby(["datetime", "channel"])
+    moments = DataFrame(
+        {
+            "count": grouped["value"].count(),
+            "sum": grouped["value"].sum(),
+            "sumsq": grouped["value2"].sum(),
+            "min": grouped["value"].min(),
+            "max": grouped["value"].max(),
+        }
+    )
+
+    return {
+        "hist": hist.reset_index(),
+        "moments": moments.reset_index(),
+        "edges": bin_edges,
+    }
+
+
+def merge_sketches(sketches: list, by: list | None = None) -> dict:
+    """
+    Merge a list of histogram sketches as returned by :func:`build_sketch`.
+
+    Parameters
+    ----------
+    sketches : list
+        List of sketches, built with the same bin edges; None entries are skipped.
+    by : list
+        Columns identifying the histograms to keep separate; default: ['datetime', 'channel'].
+        Use ['channel'] to merge all time buckets, eg to get the distribution over a full run or period.
+    """
+    sketches = [s for s in sketches if s is not None]
+    by = ["datetime", "channel"] if by is None else list(by)
+    edges = sketches[0]["edges"]
+    if any(not np.array_equal(s["edges"], edges) for s in sketches[1:]):
+        raise ValueError("Cannot merge histogram sketches with different bin edges")
+
+    hist = pd.concat([s["hist"] for s in sketches])
+    moments = pd.concat([s["moments"] for s in sketches])
+
+    return {
+        "hist": hist.groupby(by + ["bin"], as_index=False)["count"].sum(),
+        "moments": moments.groupby(by, as_index=False).agg(SKETCH_MOMENTS),
+        "edges": edges,
+    }
+
+
+def get_sketch_summary(sketch: dict, quantiles: list | None = None) -> DataFrame:
+    """
+    Return count, mean, std (zero degrees of freedom), min, max and quantiles of each channel from a histogram sketch, merging all its time buckets.
+
+    Quantiles are linearly interpolated within bins, with under/overflow bins bounded by the exact min/max values.
+
+    Parameters
+    ----------
+    sketch : dict
+        Histogram sketch as returned by :func:`build_sketch` or :func:`merge_sketches`.
+    quantiles : list
+        Quantiles to estimate; default: [0.05, 0.25, 0.5, 0.75, 0.95].
+    """
+    quantiles = [0.05, 0.25, 0.5, 0.75, 0.95] if quantiles is None else quantiles
+    sketch = merge_sketches([sketch], by=["channel"])
+    moments = sketch["moments"].set_index("channel")
+    edges = sketch["edges"]
+
+    summary = DataFrame(index=moments.index)
+    summary["count"] = moments["count"]
+    summary["mean"] = moments["sum"] / moments["count"]
+    summary["std"] = np.sqrt(
+        (moments["sumsq"] / moments["count"] - summary["mean"] ** 2).clip(lower=0)
+    )
+    summary["min"] = moments["min"]
+    summary["max"] = moments["max"]
+    summary[quantiles] = np.nan
+
+    for channel, hist in sketch["hist"].groupby("channel"):
+        hist = hist.sort_values("bin")
+        bins = hist["bin"].to_numpy()
+        counts = hist["count"].to_numpy(dtype=float)
+        low = edges[np.clip(bins, 0, len(edges) - 1)]
+        high = edges[np.clip(bins + 1, 0, len(edges) - 1)]
+        low = np.clip(low, moments.at[channel, "min"], moments.at[channel, "max"])
+        high = np.clip(high, moments.at[channel, "min"], moments.at[channel, "max"])
+        low[bins < 0] = moments.at[channel, "min"]
+        high[bins >= len(edges) - 1] = moments.at[channel, "max"]
+
+        cumulative = np.cumsum(counts)
+        ranks = np.asarray(quantiles) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, ranks), len(counts) - 1)
+        fraction = (ranks - (cumulative[idx] - counts[idx])) / counts[idx]
+        summary.loc[channel, quantiles] = low[idx] + fraction * (high[idx] - low[idx])
+
+    return summary
+
+
+def get_channel_histograms(df: DataFrame, bin_edges) -> tuple:
+    """
+    Return the counts of each channel in the given bins (channel vs bin) and the number of valid entries of each channel, binning all channels in a single pass.
+
+    Values equal to the last edge are counted in the last bin, as for np.histogram; values outside the bins only enter the number of valid entries.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Dataframe with one column per channel.
+    bin_edges : array-like
+        Bin edges of the histogram.
+    """
+    bin_edges = np.asarray(bin_edges, dtype=float)
+    n_bins = len(bin_edges) - 1
+    n_channels = len(df.columns)
+    values = df.to_numpy(dtype=float)
+    rows, cols = np.nonzero(~np.isnan(values))
+    values = values[rows, cols]
+
+    bins = np.searchsorted(bin_edges, values, side="right") - 1
+    bins[values == bin_edges[-1]] = n_bins - 1
+    is_in = (bins >= 0) & (bins < n_bins)
+    counts = np.bincount(
+        cols[is_in] * n_bins + bins[is_in], minlength=n_channels * n_bins
+    ).reshape(n_channels, n_bins)
+
+    channels = df.columns.rename("channel")
+    return (
+        DataFrame(counts, index=channels, columns=pd.RangeIndex(n_bins, name="bin")),
+        pd.Series(np.bincount(cols, minlength=n_channels), index=channels),
+    )
+
+
+def get_sketch_histogram(sketch: dict, bin_edges) -> DataFrame:
+    """
+    Return the counts of each channel in the given bins (channel vs bin), merging all the time buckets of a histogram sketch.
+
+    Counts of the sketch bins are assigned to the output bin containing their center; they are exact if the output bins are the ones of the sketch.
+
+    Parameters
+    ----------
+    sketch : dict
+        Histogram sketch as returned by :func:`build_sketch` or :func:`merge_sketches`.
+    bin_edges : array-like
+        Bin edges of the output histogram.
+    """
+    bin_edges = np.asarray(bin_edges, dtype=float)
+    sketch = merge_sketches([sketch], by=["channel"])
+    hist = sketch["hist"]
+    edges = sketch["edges"]
+
+    # under/overflows of the sketch are dropped
+    hist = hist[(hist["bin"] >= 0) & (hist["bin"] < len(edges) - 1)]
+    centers = (edges[hist["bin"]] + edges[hist["bin"] + 1]) / 2
+    out_bins = np.searchsorted(bin_edges, centers, side="right") - 1
+    is_in = (out_bins >= 0) & (out_bins < len(bin_edges) - 1)
+
+    channels = sketch["moments"]["channel"]
+    counts = DataFrame(
+        {
+            "channel": hist["channel"].to_numpy()[is_in],
+            "bin": out_bins[is_in],
+            "count": hist["count"].to_numpy()[is_in],
+        }
+    )
+
+    return (
+        counts.pivot_table(
+            index="channel", columns="bin", values="count", aggfunc="sum"
+        )
+        .reindex(index=channels, columns=range(len(bin_edges) - 1))
+        .fillna(0)
+    )
+
+
+def save_sketch(file_path: str, key: str, sketch: dict):
+    """Save a histogram sketch under '<key>_hist', '<key>_moments' and '<key>_edges' of a HDF file."""
+    sketch["hist"].to_hdf(file_path, key=f"{key}_hist", mode="a")
+    sketch["moments"].to_hdf(file_path, key=f"{key}_moments", mode="a")
+    pd.Series(sketch["edges"]).to_hdf(file_path, key=f"{key}_edges", mode="a")
+
+
+def load_sketch(file_path: str, key: str) -> dict | None:
+    """Load a histogram sketch saved with :func:`save_sketch`; return None if the file or the key does not exist."""
+    if not os.path.exists(file_path):
+        return None
+
+    with pd.HDFStore(file_path, mode="r") as store:
+        if f"/{key}_hist" not in store.keys():
+            return None
+        return {
+            "hist": store[f"/{key}_hist"],
+            "moments": store[f"/{key}_moments"],
+            "edges": store[f"/{key}_edges"].to_numpy(),
+        }
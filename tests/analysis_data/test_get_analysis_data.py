@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from legend_data_monitor import analysis_data
+
+
+class MockAnalysisData:
+    calls = 0
+
+    def __init__(self, data, selection):
+        MockAnalysisData.calls += 1
+        self.data = data.copy()
+        self.parameters = selection["parameters"]
+
+
+def make_selection(**kwargs):
+    selection = {
+        "parameters": "baseline",
+        "event_type": "phy",
+        "cuts": [],
+        "variation": True,
+        "time_window": "10T",
+    }
+    selection.update(kwargs)
+    return selection
+
+
+def test_get_analysis_data_reuses_results(monkeypatch):
+    monkeypatch.setattr(analysis_data, "AnalysisData", MockAnalysisData)
+    MockAnalysisData.calls = 0
+    df = pd.DataFrame({"channel": [1, 2], "baseline": [10.0, 20.0]})
+    subsystem = SimpleNamespace(data=df, analysis_cache={})
+
+    first = analysis_data.get_analysis_data(subsystem, make_selection())
+    # same analysis, requested with a different 'variation' flag
+    second = analysis_data.get_analysis_data(subsystem, make_selection(variation=False))
+    assert MockAnalysisData.calls == 1
+    pd.testing.assert_frame_equal(first.data, second.data)
+
+    # callers get their own copy of the results
+    first.data["baseline"] = 0.0
+    third = analysis_data.get_analysis_data(subsystem, make_selection())
+    assert list(third.data["baseline"]) == [10.0, 20.0]
+
+    # a different analysis, or different subsystem data, is computed again
+    analysis_data.get_analysis_data(subsystem, make_selection(cuts=["K_lines"]))
+    subsystem.data = df.copy()
+    analysis_data.get_analysis_data(subsystem, make_selection())
+    assert MockAnalysisData.calls == 3
+
+    # results are kept by the subsystem only
+    other = SimpleNamespace(data=subsystem.data, analysis_cache={})
+    analysis_data.get_analysis_data(other, make_selection())
+    assert MockAnalysisData.calls == 4
+
+    analysis_data.clear_analysis_cache(subsystem)
+    assert subsystem.analysis_cache == {}
+    analysis_data.get_analysis_data(subsystem, make_selection())
+    assert MockAnalysisData.calls == 5
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.analysis_data import get_aux_df
+
+
+def make_subsystem_df(n=6):
+    times = pd.date_range("2024-01-01", periods=n, freq="1min", tz="UTC")
+    df = pd.DataFrame(
+        {
+            "datetime": np.tile(times, 2),
+            "channel": np.repeat([1, 2], n),
+            "name": np.repeat(["V01", "V02"], n),
+            "location": 1,
+            "position": np.repeat([1, 2], n),
+            "status": "on",
+            "flag_pulser": True,
+            "flag_fc_bsln": False,
+            "flag_muon": False,
+            "baseline": np.arange(2 * n, dtype=float) + 10,
+            # AUX values, repeated for each channel
+            "baseline_pulser02": np.tile(np.arange(n, dtype=float) + 1, 2),
+        }
+    )
+    for col in [
+        "HV_card",
+        "HV_channel",
+        "cc4_channel",
+        "cc4_id",
+        "daq_card",
+        "daq_crate",
+        "det_type",
+    ]:
+        df[col] = 0
+    return df
+
+
+def test_get_aux_df():
+    df = make_subsystem_df()
+    df_orig = df.copy()
+    selection = {
+        "parameters": ["baseline"],
+        "event_type": "all",
+        "path": "",
+        "version": "",
+    }
+
+    aux, ratio, diff = get_aux_df(df, ["baseline"], selection, "pulser02")
+
+    # AUX values are kept once (one channel only)
+    assert list(aux.data["channel"].unique()) == [1]
+    np.testing.assert_array_equal(aux.data["baseline"], np.arange(6) + 1.0)
+
+    # ratio/difference are derived for every channel
+    data = df_orig.sort_values(["channel", "datetime"])
+    np.testing.assert_allclose(
+        ratio.data["baseline"], data["baseline"] / data["baseline_pulser02"]
+    )
+    np.testing.assert_allclose(
+        diff.data["baseline"], data["baseline"] - data["baseline_pulser02"]
+    )
+    assert "baseline_pulser02" not in aux.data.columns
+
+    # the subsystem data are left untouched
+    pd.testing.assert_frame_equal(df, df_orig)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.analysis_data import get_event_rate, get_fwhm
+
+
+def make_df(n_channels=5, n=400, seed=1):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-01", tz="UTC")
+    frames = []
+    for ch in range(n_channels):
+        # channels start/end at different times, with gaps
+        offsets = np.sort(rng.uniform(ch * 300, 7200 - ch * 200, n))
+        offsets = offsets[(offsets < 2000) | (offsets > 3000)]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "channel": 1000 + (n_channels - ch),
+                    "datetime": start + pd.to_timedelta(offsets, unit="s"),
+                    "trapEmax": rng.normal(100, 5 + ch, len(offsets)),
+                }
+            )
+        )
+    df = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=seed)
+    df.loc[df.index[:10], "trapEmax"] = np.nan
+    return df
+
+
+def reference_event_rate(df, freq, dt_seconds):
+    # implementation with groupby + resample (size() counts rows as count()["channel"] did with older pandas)
+    event_rate = (
+        df.set_index("datetime")
+        .groupby("channel")
+        .resample(freq, origin="start")
+        .size()
+        .to_frame(name="event_rate")
+        .reset_index()
+    )
+    event_rate["event_rate"] = event_rate["event_rate"] * 1.0 / dt_seconds
+    event_rate["datetime"] = event_rate["datetime"] + pd.Timedelta(freq) / 2
+    return event_rate
+
+
+def test_get_event_rate():
+    df = make_df()
+
+    event_rate = get_event_rate(df, "10T")
+
+    pd.testing.assert_frame_equal(
+        event_rate, reference_event_rate(df, "600s", 600), check_dtype=False
+    )
+    # empty windows are kept
+    assert (event_rate["event_rate"] == 0).any()
+
+
+def test_get_fwhm():
+    df = make_df()
+
+    fwhm = get_fwhm(df, "trapEmax")
+
+    expected = df.groupby("channel")["trapEmax"].transform(
+        lambda x: 2.355 * np.sqrt(np.mean((x - np.mean(x, axis=0)) ** 2, axis=0))
+    )
+    np.testing.assert_allclose(fwhm, expected.to_numpy())
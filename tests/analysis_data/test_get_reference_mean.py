@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.analysis_data import (
+    get_reference_mean,
+    get_reference_state_path,
+    get_saved_df_hdf,
+)
+
+
+class MockAnalysisData:
+    def __init__(self, data):
+        self.data = data
+
+
+def make_long_df(start, n, seed):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=n, freq="10min", tz="UTC")
+    df = pd.DataFrame(
+        {
+            "datetime": np.repeat(idx, 3),
+            "channel": np.tile([1, 2, 3], n),
+            "baseline": rng.normal(100, 5, 3 * n),
+        }
+    )
+    # a missing value
+    df.loc[4, "baseline"] = np.nan
+    return df
+
+
+def save_pivot(df, file_path, key):
+    df_pivot = df.pivot(index="datetime", columns="channel", values="baseline")
+    try:
+        df_pivot = pd.concat([pd.read_hdf(file_path, key=key), df_pivot])
+    except (FileNotFoundError, KeyError):
+        pass
+    df_pivot.to_hdf(file_path, key=key, mode="a")
+
+
+def test_get_reference_mean_append(tmp_path, monkeypatch):
+    read_hdf = pd.read_hdf
+    read_rows = []
+
+    def counting_read_hdf(*args, **kwargs):
+        df = read_hdf(*args, **kwargs)
+        if "start" in kwargs:
+            read_rows.append(len(df))
+        return df
+
+    monkeypatch.setattr(pd, "read_hdf", counting_read_hdf)
+    file_path = str(tmp_path / "l200-p01-r001-phy-geds.hdf")
+    key = "IsPulser_Baseline"
+    save_pivot(make_long_df("2025-01-01", 5, 0), file_path, key)
+
+    # new data come in several cycles; the reference window grows over both saved and new data
+    starts = ["2025-01-01 01:00", "2025-01-02", "2025-01-05", "2025-01-05 02:00"]
+    for seed, start in enumerate(starts, start=1):
+        new_data = make_long_df(start, 20, seed)
+        self = MockAnalysisData(new_data)
+
+        expected = get_saved_df_hdf(
+            self, "geds", "baseline", pd.read_hdf(file_path, key=key)
+        )
+        result = get_reference_mean(self, file_path, key, "baseline")
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+        save_pivot(new_data, file_path, key)
+
+    assert pd.read_hdf(get_reference_state_path(file_path), key=key).shape[0] == 3
+    # saved rows are read once when entering the reference window, plus one row per cycle to check them
+    window = pd.read_hdf(get_reference_state_path(file_path), key=f"{key}_window")
+    assert sum(read_rows) <= window.at[0, "n_rows"] + len(starts)
+
+
+def test_get_reference_mean_rewritten_key(tmp_path):
+    file_path = str(tmp_path / "l200-p01-r001-phy-geds.hdf")
+    key = "IsPulser_Baseline"
+    save_pivot(make_long_df("2025-01-01", 30, 0), file_path, key)
+    get_reference_mean(
+        MockAnalysisData(make_long_df("2025-01-02", 5, 1)), file_path, key, "baseline"
+    )
+
+    # the key is replaced by different data: the state is not valid anymore
+    pd.DataFrame().to_hdf(file_path, key=key, mode="a")
+    save_pivot(make_long_df("2025-01-01", 30, 2), file_path, key)
+    self = MockAnalysisData(make_long_df("2025-01-02", 5, 3))
+
+    expected = get_saved_df_hdf(
+        self, "geds", "baseline", pd.read_hdf(file_path, key=key)
+    )
+    result = get_reference_mean(self, file_path, key, "baseline")
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_get_reference_mean_legacy_kind(tmp_path):
+    # files written with pandas < 3 store nanosecond timestamps with a unitless 'datetime64' kind
+    file_path = str(tmp_path / "l200-p01-r001-phy-geds.hdf")
+    key = "IsPulser_Baseline"
+    saved = make_long_df("2025-01-01", 30, 0)
+    saved["datetime"] = saved["datetime"].dt.as_unit("ns")
+    save_pivot(saved, file_path, key)
+    with pd.HDFStore(file_path, mode="a") as store:
+        store.get_node(key).axis1._v_attrs.kind = "datetime64"
+    self = MockAnalysisData(make_long_df("2025-01-02", 5, 1))
+
+    expected = get_saved_df_hdf(
+        self, "geds", "baseline", pd.read_hdf(file_path, key=key)
+    )
+    result = get_reference_mean(self, file_path, key, "baseline")
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
@@ -0,0 +1,73 @@
+from legend_data_monitor import core, utils
+
+
+def make_config():
+    vs_time = {"plot_structure": "per channel", "plot_style": "vs time"}
+    return {
+        "dataset": {"path": "prod", "version": "ref", "type": "phy"},
+        "subsystems": {
+            "geds": {
+                "Baselines": {
+                    "parameters": "baseline",
+                    "event_type": "pulser",
+                    "time_window": "1H",
+                    **vs_time,
+                },
+                "Baselines histogram": {
+                    "parameters": "baseline",
+                    "event_type": "pulser",
+                    "time_window": "1H",
+                    "plot_structure": "array",
+                    "plot_style": "histogram",
+                },
+                "Gain in phy events": {
+                    "parameters": "cuspEmax",
+                    "event_type": "phy",
+                    "cuts": "is_valid_0vbb",
+                    **vs_time,
+                },
+                "Saved gain": {"parameters": "cuspEmax", "event_type": "phy"},
+                "Baseline vs gain": {
+                    "parameters": ["baseline", "trapTmax"],
+                    "event_type": "pulser",
+                    "plot_structure": "array",
+                    "plot_style": "par vs par",
+                },
+            }
+        },
+    }
+
+
+def test_get_execution_plan(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        utils, "load_tier_config", lambda *args: calls.append(args) or {"outputs": []}
+    )
+
+    plan = core.get_execution_plan(make_config())["geds"]
+
+    # the hit tier config is read once
+    assert len(calls) == 1
+    assert plan["parameters"] == ["baseline", "cuspEmax", "is_valid_0vbb", "trapTmax"]
+    # PULS01ANA values are used by single-parameter plots only
+    assert plan["aux_parameters"] == ["baseline", "cuspEmax"]
+    # plots sharing parameters, event type, cuts and time window share their analysis
+    assert list(plan["analyses"].values()) == [
+        ["Baselines", "Baselines histogram"],
+        ["Gain in phy events"],
+        ["Saved gain"],
+        ["Baseline vs gain"],
+    ]
+    assert plan["outputs"]["saves"] == ["Saved gain"]
+    # one read for the subsystem and one for PULS01ANA, instead of one for each merged parameter
+    assert plan["cost"] == {
+        "reads": 2,
+        "baseline_reads": 4,
+        "analyses": 4,
+        "baseline_analyses": 5,
+        "outputs": 5,
+    }
+
+    text = core.format_execution_plan({"geds": plan})
+    assert "-> save: Saved gain" in text
+    assert "2 data reads (vs 4" in text
@@ -0,0 +1,19 @@
+import os
+
+from legend_data_monitor import exposure
+
+
+def test_get_diode_mass(tmp_path):
+    diodes = tmp_path / "ref" / "inputs" / "hardware" / "detectors" / "germanium"
+    diodes = diodes / "diodes"
+    diodes.mkdir(parents=True)
+    diode = diodes / "V00001A.yaml"
+    diode.write_text("production:\n  mass_in_g: 2000\n")
+
+    assert exposure.get_diode_mass(str(tmp_path), "ref", "V00001A") == 2
+
+    # an updated diode file is read again
+    diode.write_text("production:\n  mass_in_g: 2500\n")
+    stat = os.stat(diode)
+    os.utime(diode, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert exposure.get_diode_mass(str(tmp_path), "ref", "V00001A") == 2.5
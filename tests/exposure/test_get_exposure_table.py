@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+
+from legend_data_monitor import exposure, utils
+
+
+def make_runinfo(livetime_r001=86400.0):
+    return {
+        "p03": {
+            "r000": {
+                "phy": {"start_key": "20230101T000000Z", "livetime_in_s": 172800.0}
+            },
+            "r001": {
+                "phy": {"start_key": "20230201T000000Z", "livetime_in_s": livetime_r001}
+            },
+        }
+    }
+
+
+@pytest.fixture
+def run_detectors(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "EXPOSURE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(exposure, "EXPOSURE_TABLES", {})
+    calls = []
+
+    def get_run_detectors(path, version, first_timestamp):
+        calls.append(first_timestamp)
+        return pd.DataFrame(
+            {
+                "name": ["B00001A", "V00002A", "P00003A"],
+                "det_type": ["BEGe", "ICPC", "PPC"],
+                "mass_in_kg": [0.5, 2.0, 1.0],
+                "usability": ["on", "on", "ac"],
+                "valid_psd": [True, False, False],
+            }
+        )
+
+    monkeypatch.setattr(exposure, "get_run_detectors", get_run_detectors)
+    return calls
+
+
+def test_get_exposure_table(run_detectors):
+    runs = ["r000", "r001"]
+    table = exposure.get_exposure_table(make_runinfo(), "p03", runs, "prod", "ref")
+    assert len(table) == 6
+    assert run_detectors == ["20230101T000000Z", "20230201T000000Z"]
+
+    result = exposure.get_exposure(table, "p03", runs)
+    assert result["livetime_in_d"] == pytest.approx(3)
+    assert result["mass_in_kg"] == pytest.approx(7)
+    assert result["on"] == pytest.approx(3 / 365.25 * 2.5)
+    assert result["on_valid_psd"] == pytest.approx(3 / 365.25 * 0.5)
+    assert result["ac_dets"] == pytest.approx(
+        {"BEGe": 0, "ICPC": 0, "COAX": 0, "PPC": 3 / 365.25}
+    )
+    assert exposure.get_exposure(table, "p03", ["r001"])["livetime_in_d"] == 1
+
+    # a new process reads the table from disk, metadata are read again only for runs that changed
+    exposure.EXPOSURE_TABLES.clear()
+    runinfo = make_runinfo(livetime_r001=2 * 86400.0)
+    table = exposure.get_exposure_table(runinfo, "p03", runs, "prod", "ref")
+    assert run_detectors == [
+        "20230101T000000Z",
+        "20230201T000000Z",
+        "20230201T000000Z",
+    ]
+    assert len(table) == 6
+    assert exposure.get_exposure(table, "p03", runs)["livetime_in_d"] == 4
+
+    # nothing to update
+    exposure.get_exposure_table(runinfo, "p03", runs, "prod", "ref")
+    assert len(run_detectors) == 3
+
+
+def test_get_exposure_table_metadata_change(run_detectors, tmp_path):
+    runs = ["r000", "r001"]
+    prod = str(tmp_path / "prod")
+    statuses = tmp_path / "prod" / "ref" / "inputs" / "datasets" / "statuses"
+    statuses.mkdir(parents=True)
+    (statuses / "l200-p03-r000-T%-all-config.yaml").write_text("B00001A: {}\n")
+
+    exposure.get_exposure_table(make_runinfo(), "p03", runs, prod, "ref")
+    exposure.get_exposure_table(make_runinfo(), "p03", runs, prod, "ref")
+    assert len(run_detectors) == 2
+
+    # a status change invalidates both the table in memory and the one on disk
+    (statuses / "l200-p03-r000-T%-all-config.yaml").write_text("B00001A: {a: 1}\n")
+    exposure.get_exposure_table(make_runinfo(), "p03", runs, prod, "ref")
+    assert len(run_detectors) == 4
+
+    exposure.EXPOSURE_TABLES.clear()
+    exposure.get_exposure_table(make_runinfo(), "p03", runs, prod, "ref")
+    assert len(run_detectors) == 4
+
+    (statuses / "l200-p03-r001-T%-all-config.yaml").write_text("B00001A: {}\n")
+    exposure.EXPOSURE_TABLES.clear()
+    exposure.get_exposure_table(make_runinfo(), "p03", runs, prod, "ref")
+    assert len(run_detectors) == 6
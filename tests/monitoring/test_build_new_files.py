@@ -1,9 +1,10 @@
 import json
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from legend_data_monitor.monitoring import build_new_files
+from legend_data_monitor.monitoring import build_new_files, load_change_point_state
 
 
 def make_hdf(path, key, df, mode="w"):
@@ -65,3 +66,114 @@ def test_build_new_files_missing_file(tmp_path):
     run = "r001"
     with pytest.raises(SystemExit):
         build_new_files(str(tmp_path), period, run)
+
+
+def test_build_new_files_incremental(tmp_path):
+    period = "p01"
+    run = "r001"
+    base_dir = tmp_path / "generated/plt/hit/phy" / period / run
+    base_dir.mkdir(parents=True, exist_ok=True)
+    data_file = base_dir / f"l200-{period}-{run}-phy-geds.hdf"
+
+    idx = pd.date_range("2025-01-01 00:02", periods=300, freq="47s", tz="UTC")
+    df = pd.DataFrame(
+        {1: np.linspace(10, 20, 300), 2: np.linspace(5, 1, 300)}, index=idx
+    )
+    mean = df.iloc[:30].mean().to_frame().T
+    make_hdf(data_file, "IsPulser_Baseline", df.iloc[:100])
+    make_hdf(data_file, "IsPulser_Baseline_mean", mean, mode="a")
+    make_hdf(
+        data_file,
+        "IsPulser_Baseline_var",
+        (df.iloc[:100] / mean.iloc[0] - 1) * 100,
+        mode="a",
+    )
+    build_new_files(str(tmp_path), period, run)
+    assert (base_dir / f"l200-{period}-{run}-phy-geds-res_state.hdf").exists()
+
+    # new rows are appended, variations are rewritten with a new mean
+    mean = df.iloc[:50].mean().to_frame().T
+    make_hdf(data_file, "IsPulser_Baseline", df, mode="a")
+    make_hdf(data_file, "IsPulser_Baseline_mean", mean, mode="a")
+    make_hdf(
+        data_file, "IsPulser_Baseline_var", (df / mean.iloc[0] - 1) * 100, mode="a"
+    )
+    build_new_files(str(tmp_path), period, run)
+
+    for resample_unit in ["10min", "60min"]:
+        res_file = base_dir / f"l200-{period}-{run}-phy-geds-res_{resample_unit}.hdf"
+        pd.testing.assert_frame_equal(
+            pd.read_hdf(res_file, key="IsPulser_Baseline"),
+            df.resample(resample_unit).mean(),
+            check_freq=False,
+        )
+        pd.testing.assert_frame_equal(
+            pd.read_hdf(res_file, key="IsPulser_Baseline_var"),
+            ((df / mean.iloc[0] - 1) * 100).resample(resample_unit).mean(),
+            check_freq=False,
+        )
+        pd.testing.assert_frame_equal(
+            pd.read_hdf(res_file, key="IsPulser_Baseline_mean"), mean
+        )
+
+        # statistics of each bucket, including the ones still open at the first call
+        resampled = df.resample(resample_unit)
+        pd.testing.assert_frame_equal(
+            pd.read_hdf(res_file, key="IsPulser_Baseline_std"),
+            resampled.std(),
+            check_freq=False,
+        )
+        pd.testing.assert_frame_equal(
+            pd.read_hdf(res_file, key="IsPulser_Baseline_count"),
+            resampled.count().astype(float),
+            check_freq=False,
+        )
+        pd.testing.assert_frame_equal(
+            pd.read_hdf(res_file, key="IsPulser_Baseline_q50"),
+            resampled.median(),
+            check_freq=False,
+        )
+        pd.testing.assert_frame_equal(
+            pd.read_hdf(res_file, key="IsPulser_Baseline_var_q05"),
+            ((df / mean.iloc[0] - 1) * 100).resample(resample_unit).quantile(0.05),
+            check_freq=False,
+        )
+
+
+def test_build_new_files_change_points(tmp_path):
+    period = "p01"
+    run = "r001"
+    base_dir = tmp_path / "generated/plt/hit/phy" / period / run
+    base_dir.mkdir(parents=True, exist_ok=True)
+    data_file = base_dir / f"l200-{period}-{run}-phy-geds.hdf"
+    res_file = base_dir / f"l200-{period}-{run}-phy-geds-res_10min.hdf"
+
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2025-01-01", periods=24 * 60, freq="min", tz="UTC")
+    df = pd.DataFrame(rng.normal(0, 1, size=(len(idx), 2)), index=idx, columns=[1, 2])
+    # channel 2: jump at 10h
+    df.loc[df.index >= idx[0] + pd.Timedelta("10h"), 2] += 3
+
+    make_hdf(data_file, "IsPulser_Baseline", df.iloc[: 12 * 60])
+    build_new_files(str(tmp_path), period, run)
+    first = pd.read_hdf(res_file, key="IsPulser_Baseline_alerts")
+    assert first["channel"].to_list() == [2]
+
+    make_hdf(data_file, "IsPulser_Baseline", df)
+    build_new_files(str(tmp_path), period, run)
+    second = pd.read_hdf(res_file, key="IsPulser_Baseline_alerts")
+
+    # alerts raised at previous calls are kept as they are
+    pd.testing.assert_frame_equal(second.iloc[: len(first)], first)
+    assert second["channel"].to_list() == [2]
+    # the detection state is kept up to the last closed bucket (the last 60min are still open)
+    state_file = base_dir / f"l200-{period}-{run}-phy-geds-res_state.hdf"
+    cp_state = load_change_point_state(str(state_file))["IsPulser_Baseline"]
+    assert cp_state["last"] == pd.Timestamp("2025-01-01 22:50", tz="UTC")
+    pd.testing.assert_frame_equal(cp_state["alerts"], second)
+
+    # no new data: same alerts
+    build_new_files(str(tmp_path), period, run)
+    pd.testing.assert_frame_equal(
+        pd.read_hdf(res_file, key="IsPulser_Baseline_alerts"), second
+    )
@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor import utils
+from legend_data_monitor.monitoring import (
+    build_qc_histograms,
+    get_qc_histograms_path,
+    load_qc_histograms,
+)
+
+
+def write_geds_file(tmp_path):
+    run_dir = tmp_path / "p99" / "r000"
+    run_dir.mkdir(parents=True)
+    idx = pd.date_range("2024-05-01 00:00:00", periods=300, freq="13s", tz="UTC")
+    rng = np.random.default_rng(4)
+    my_file = run_dir / "l200-p99-r000-phy-geds.hdf"
+
+    def frame(loc, scale):
+        return pd.DataFrame(
+            {
+                1104000: rng.normal(loc, scale, len(idx)),
+                1104001: rng.normal(loc, scale, len(idx)),
+            },
+            index=idx,
+        )
+
+    frame(100, 80).to_hdf(my_file, key="IsPhysics_TrapemaxCtcCal", mode="w")
+    for evt in ["All", "IsPulser", "IsBsln", "IsPhysics"]:
+        frame(0, 5).to_hdf(my_file, key=f"{evt}_IsValidBlSlopeClassifier", mode="a")
+
+    return my_file
+
+
+def test_build_qc_histograms(tmp_path):
+    my_file = write_geds_file(tmp_path)
+
+    qc_histograms = build_qc_histograms(
+        str(tmp_path), "p99", "r000", ["IsValidBlSlopeClassifier"]
+    )
+    assert os.path.exists(get_qc_histograms_path(str(tmp_path), "p99", "r000"))
+
+    counts = qc_histograms["counts"]
+    totals = qc_histograms["totals"]
+    assert set(counts.index.get_level_values("evt")) == {
+        "All",
+        "IsPulser",
+        "IsBsln",
+        "IsPhysics",
+    }
+
+    df = pd.read_hdf(my_file, key="All_IsValidBlSlopeClassifier")
+    expected, _ = np.histogram(df[1104001], bins=utils.QC_CLASSIFIER_EDGES)
+    np.testing.assert_array_equal(
+        counts.loc[("IsValidBlSlopeClassifier", "All", 1104001)].to_numpy(), expected
+    )
+    assert totals.loc[("IsValidBlSlopeClassifier", "All", 1104001)] == len(df)
+
+    # the energy cut only keeps physics events above 25 keV
+    energy = pd.read_hdf(my_file, key="IsPhysics_TrapemaxCtcCal")
+    assert (
+        totals.loc[("IsValidBlSlopeClassifier", "IsPhysics", 1104000)]
+        == (energy[1104000] > 25).sum()
+    )
+
+
+def test_load_qc_histograms_reuses_saved_histograms(tmp_path):
+    write_geds_file(tmp_path)
+    build_qc_histograms(str(tmp_path), "p99", "r000", ["IsValidBlSlopeClassifier"])
+    path = get_qc_histograms_path(str(tmp_path), "p99", "r000")
+    mtime = os.path.getmtime(path)
+
+    qc_histograms = load_qc_histograms(
+        str(tmp_path), "p99", "r000", ["IsValidBlSlopeClassifier"]
+    )
+
+    assert os.path.getmtime(path) == mtime
+    np.testing.assert_allclose(qc_histograms["edges"], utils.QC_CLASSIFIER_EDGES)
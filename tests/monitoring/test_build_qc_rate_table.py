@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.monitoring import (
+    build_qc_rate_table,
+    get_qc_rates_path,
+    load_qc_rate_table,
+)
+
+
+def write_geds_file(tmp_path, flags=("IsDischarge", "IsSaturated")):
+    run_dir = tmp_path / "p99" / "r000"
+    run_dir.mkdir(parents=True)
+    idx = pd.date_range("2024-05-01 00:00:00", periods=500, freq="29s", tz="UTC")
+    rng = np.random.default_rng(3)
+    my_file = run_dir / "l200-p99-r000-phy-geds.hdf"
+    for i, flag in enumerate(flags):
+        df = pd.DataFrame(
+            {
+                1104000: rng.random(len(idx)) < 0.1,
+                1104001: rng.random(len(idx)) < 0.3,
+            },
+            index=idx,
+        )
+        df.to_hdf(my_file, key=f"IsPhysics_{flag}", mode="w" if i == 0 else "a")
+
+    return my_file
+
+
+def test_build_qc_rate_table(tmp_path):
+    my_file = write_geds_file(tmp_path)
+
+    qc_rates = build_qc_rate_table(
+        str(tmp_path), "p99", "r000", ["IsDischarge", "IsSaturated", "IsMissing"]
+    )
+    assert os.path.exists(get_qc_rates_path(str(tmp_path), "p99", "r000"))
+    assert list(qc_rates["flags"]) == ["IsDischarge", "IsSaturated", "IsMissing"]
+    assert set(qc_rates["averages"]["flag"]) == {"IsDischarge", "IsSaturated"}
+
+    df = pd.read_hdf(my_file, key="IsPhysics_IsSaturated")
+    diff = (df.index.max() - df.index.min()).total_seconds()
+    averages = qc_rates["averages"].set_index(["flag", "channel"])
+    for rawid in df.columns:
+        assert averages.loc[("IsSaturated", rawid), "count"] == df[rawid].sum()
+        np.testing.assert_allclose(
+            averages.loc[("IsSaturated", rawid), "rate"], df[rawid].sum() / diff * 1000
+        )
+
+        rates = qc_rates["rates"]
+        sel = rates[(rates["flag"] == "IsSaturated") & (rates["channel"] == rawid)]
+        expected = df[rawid].resample("1h").sum() / 3600 * 1000
+        np.testing.assert_allclose(sel["rate"].values, expected.values)
+        assert (sel["datetime"].values == expected.index.values).all()
+
+
+def test_build_qc_rate_table_missing_file(tmp_path):
+    assert build_qc_rate_table(str(tmp_path), "p99", "r000") is None
+
+
+def test_load_qc_rate_table_reuses_table(tmp_path):
+    write_geds_file(tmp_path)
+    build_qc_rate_table(str(tmp_path), "p99", "r000", ["IsDischarge"])
+    qc_rates_path = get_qc_rates_path(str(tmp_path), "p99", "r000")
+    mtime = os.path.getmtime(qc_rates_path)
+
+    qc_rates = load_qc_rate_table(str(tmp_path), "p99", "r000", ["IsDischarge"])
+    assert os.path.getmtime(qc_rates_path) == mtime
+    assert set(qc_rates["averages"]["flag"]) == {"IsDischarge"}
+
+    # a flag that was not inspected yet triggers a rebuild
+    qc_rates = load_qc_rate_table(str(tmp_path), "p99", "r000", ["IsSaturated"])
+    assert set(qc_rates["averages"]["flag"]) == {"IsDischarge", "IsSaturated"}
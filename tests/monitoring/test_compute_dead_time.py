@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from legend_data_monitor.monitoring import compute_dead_time, get_dead_time_starts
+
+
+def loop_dead_time(times, window):
+    lost_time = 0.0
+    next_available = -np.inf
+    for t in times:
+        if t >= next_available:
+            lost_time += window
+            next_available = t + window
+    return lost_time
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_compute_dead_time_matches_loop(seed):
+    rng = np.random.default_rng(seed)
+    idx = pd.to_datetime(
+        np.sort(rng.uniform(1.7e9, 1.7e9 + 60, 5000)), unit="s"
+    ).as_unit("ns")
+    df = pd.DataFrame(
+        {1104000: rng.random(len(idx)) < 0.2, 1104001: rng.random(len(idx)) < 0.1},
+        index=idx,
+    )
+
+    times = idx.asi8 / 1e9
+    discharge_times = times[df.any(axis=1).to_numpy()]
+    expected = loop_dead_time(discharge_times, 0.01) / (times[-1] - times[0]) * 100
+
+    assert compute_dead_time(df, window_ms=10) == pytest.approx(expected, rel=1e-12)
+
+
+def test_compute_dead_time_no_discharges():
+    idx = pd.date_range("2024-01-01", periods=10, freq="1s")
+    df = pd.DataFrame({1104000: np.zeros(10, dtype=bool)}, index=idx)
+
+    assert compute_dead_time(df) == 0.0
+
+
+def test_get_dead_time_starts_chunked():
+    rng = np.random.default_rng(5)
+    times = np.sort(rng.uniform(0, 5, 3000))
+
+    starts, next_available = get_dead_time_starts(times, 0.01)
+    assert len(starts) * 0.01 == pytest.approx(loop_dead_time(times, 0.01))
+
+    # chunks carry the last open window over
+    chunked, next_chunk = [], -np.inf
+    for chunk in np.array_split(times, 7):
+        chunk_starts, next_chunk = get_dead_time_starts(chunk, 0.01, next_chunk)
+        chunked.append(chunk_starts)
+    np.testing.assert_array_equal(np.concatenate(chunked), starts)
+    assert next_chunk == next_available
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.monitoring import (
+    detect_change_points,
+    get_change_point_reference,
+)
+from legend_data_monitor.utils import find_over_threshold
+
+
+def make_df(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2025-01-01", periods=n, freq="10min", tz="UTC")
+    # % variations of three channels, with noise of 0.3%
+    df = pd.DataFrame(rng.normal(0, 0.3, size=(n, 3)), index=idx, columns=[1, 2, 3])
+    # channel 2: gain jump of +1% at bucket 400
+    df.iloc[400:, 1] += 1
+    # channel 3: slow drift, -1% over 500 buckets
+    df.iloc[500:, 2] -= np.linspace(0, 1, n - 500)
+    df.iloc[50:60, 0] = np.nan
+    return df
+
+
+def test_detect_change_points_synthetic_drifts():
+    df = make_df()
+    alerts, _ = detect_change_points(df)
+
+    # no false alarms on the stable channel
+    assert 1 not in alerts["channel"].values
+
+    # a jump is reported once, or refined by a second alert
+    jump = alerts[alerts["channel"] == 2]
+    assert len(jump) <= 2
+    assert (jump["direction"] == 1).all()
+    assert abs(jump.iloc[0]["start"] - df.index[400]) <= pd.Timedelta("60min")
+    assert jump.iloc[0]["detected"] - df.index[400] <= pd.Timedelta("3h")
+    assert abs(jump["shift"].sum() - 1) < 0.3
+
+    drift = alerts[alerts["channel"] == 3].iloc[0]
+    assert drift["direction"] == -1
+    assert drift["detected"] > df.index[500]
+
+    # a fixed threshold on the same data does not see the jump
+    assert not find_over_threshold(df[2], None, [df.index[0]], [-2.5, 2.5])
+
+
+def test_detect_change_points_streaming():
+    df = make_df()
+    alerts, _ = detect_change_points(df)
+
+    first, state = detect_change_points(
+        df.iloc[:450], reference=get_change_point_reference(df)
+    )
+    second, _ = detect_change_points(df.iloc[450:], state=state)
+    streamed = pd.concat([first, second], ignore_index=True)
+
+    pd.testing.assert_frame_equal(
+        streamed.sort_values(["detected", "channel"]).reset_index(drop=True),
+        alerts.sort_values(["detected", "channel"]).reset_index(drop=True),
+    )
+
+
+def test_detect_change_points_empty():
+    alerts, _ = detect_change_points(make_df().iloc[:0])
+    assert alerts.empty
+
+
+def test_detect_change_points_no_false_alarms():
+    rng = np.random.default_rng(1)
+    n = 2000
+    idx = pd.date_range("2025-01-01", periods=n, freq="10min", tz="UTC")
+    # noise only: gaussian, heavy-tailed and quantized channels
+    df = pd.DataFrame(rng.normal(0, 0.3, size=(n, 30)), index=idx)
+    df[30] = rng.standard_t(5, size=n)
+    df[31] = np.round(rng.normal(0, 1, size=n))
+    # constant channel: no spread, masked
+    df[32] = 1.0
+    # channel with only a few values in the reference window, masked
+    df[33] = rng.normal(0, 1, size=n)
+    df.iloc[:195, 33] = np.nan
+
+    alerts, state = detect_change_points(df)
+
+    # about 1 false alarm every 2e5 time buckets is expected (68000 here)
+    assert len(alerts) <= 1
+    assert not alerts["channel"].isin([30, 31, 32, 33]).any()
+    assert np.isnan(state["reference"]["sigma"][[32, 33]]).all()
+
+
+def test_detect_change_points_short_reference():
+    idx = pd.date_range("2025-01-01", periods=19, freq="10min", tz="UTC")
+    df = pd.DataFrame(np.zeros((19, 2)), index=idx, columns=[1, 2])
+    df.iloc[10:, 1] += 10
+
+    # too few time buckets to evaluate the reference: no detection
+    assert get_change_point_reference(df) is None
+    alerts, state = detect_change_points(df)
+    assert alerts.empty
+    assert state is None
+
+    # the reference window contains at least 20 buckets
+    idx = pd.date_range("2025-01-01", periods=40, freq="10min", tz="UTC")
+    df = pd.DataFrame({1: np.r_[np.zeros(9), np.ones(31)]}, index=idx)
+    assert get_change_point_reference(df)["mean"][1] == 1
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from legend_data_monitor.monitoring import get_all_pulser_data, get_pulser_data
+
+
+def make_dfs(with_pulser=True):
+    rng = np.random.default_rng(1)
+    idx = pd.date_range("2024-03-01 00:00:00", periods=600, freq="37s", tz="UTC")
+    geds = pd.DataFrame(
+        {
+            1104000: 1000 + rng.normal(0, 1, len(idx)),
+            1104001: 2000 + rng.normal(0, 2, len(idx)),
+            1104002: 1500 + rng.normal(0, 1, len(idx)),
+            1104003: np.nan,
+        },
+        index=idx,
+    )
+    # channels with gaps and a different time span
+    geds.iloc[:150, 1] = np.nan
+    geds.iloc[200:320, 2] = np.nan
+    geds.iloc[500:, 2] = np.nan
+
+    pulser = pd.DataFrame({1027203: 500 + rng.normal(0, 0.5, len(idx))}, index=idx)
+    pulser = pulser.drop(idx[10:20])
+    tp0est = pd.DataFrame({1027203: np.full(len(idx), 4.9e4)}, index=idx)
+    tp0est.iloc[::13] = 5.5e4
+
+    empty = pd.DataFrame()
+    return [
+        geds,
+        geds,
+        pulser if with_pulser else empty,
+        empty,
+        empty,
+        empty,
+        tp0est,
+    ]
+
+
+@pytest.mark.parametrize("with_pulser", [True, False])
+@pytest.mark.parametrize("variations", [True, False])
+def test_get_all_pulser_data_matches_single_channel(with_pulser, variations):
+    dfs = make_dfs(with_pulser)
+    channels = list(dfs[0].columns)
+
+    results = get_all_pulser_data("1h", "p03", dfs, channels, 2039, variations)
+
+    assert set(results) == set(channels)
+    # a channel without valid entries is skipped
+    assert results[1104003] is None
+    # outputs of a channel do not depend on the other channels processed with it
+    for channel in channels[:-1]:
+        expected = get_pulser_data("1h", "p03", dfs, channel, 2039, variations)
+        if expected is None:
+            assert results[channel] is None
+            continue
+        for group, entries in expected.items():
+            for name, ser in entries.items():
+                got = results[channel][group][name]
+                if ser is None:
+                    assert got is None
+                else:
+                    pd.testing.assert_series_equal(got, ser, rtol=1e-12)
+
+
+def test_get_all_pulser_data_empty_after_filtering():
+    dfs = make_dfs()
+    dfs[0] = dfs[0].iloc[:0]
+
+    results = get_all_pulser_data("1h", "p03", dfs, [1104000, 1104001], 2039)
+
+    assert results == {1104000: None, 1104001: None}
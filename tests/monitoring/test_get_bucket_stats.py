@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.monitoring import (
+    get_bucket_quantiles,
+    get_bucket_stats,
+    get_resampled_frames,
+    merge_bucket_stats,
+    rescale_bucket_stats,
+)
+
+
+def make_df(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2025-01-01 00:03", periods=n, freq="37s", tz="UTC")
+    df = pd.DataFrame(rng.normal(100, 5, size=(n, 3)), index=idx, columns=[1, 2, 3])
+    df.iloc[5:20, 1] = np.nan
+    return df
+
+
+def test_get_bucket_stats_matches_resample():
+    df = make_df()
+    stats = get_bucket_stats(df, "10min")
+
+    resampled = df.resample("10min")
+    pd.testing.assert_frame_equal(
+        stats["count"], resampled.count().astype(float), check_freq=False
+    )
+    pd.testing.assert_frame_equal(stats["min"], resampled.min(), check_freq=False)
+    pd.testing.assert_frame_equal(stats["max"], resampled.max(), check_freq=False)
+    pd.testing.assert_frame_equal(
+        get_resampled_frames(stats, "10min")["mean"],
+        resampled.mean(),
+        check_freq=False,
+    )
+
+
+def test_get_resampled_frames():
+    df = make_df()
+    # an empty bucket in the middle of the time range
+    df = df[(df.index < "2025-01-01 00:40") | (df.index >= "2025-01-01 00:50")]
+    stats = get_bucket_stats(df, "10min") | get_bucket_quantiles(df, "10min")
+    frames = get_resampled_frames(stats, "10min")
+
+    resampled = df.resample("10min")
+    pd.testing.assert_frame_equal(
+        frames["count"], resampled.count().astype(float), check_freq=False
+    )
+    pd.testing.assert_frame_equal(frames["std"], resampled.std(), check_freq=False)
+    pd.testing.assert_frame_equal(frames["min"], resampled.min(), check_freq=False)
+    pd.testing.assert_frame_equal(frames["q50"], resampled.median(), check_freq=False)
+    pd.testing.assert_frame_equal(
+        frames["q95"], resampled.quantile(0.95), check_freq=False
+    )
+
+
+def test_merge_bucket_stats_split_and_coarsen():
+    df = make_df()
+    # split inside a bucket, the trailing bucket is updated by the merge
+    stats = merge_bucket_stats(
+        [
+            get_bucket_stats(df.iloc[:77], "10min"),
+            get_bucket_stats(df.iloc[77:], "10min"),
+        ]
+    )
+    full = get_bucket_stats(df, "10min")
+    for stat in full:
+        pd.testing.assert_frame_equal(stats[stat], full[stat], check_freq=False)
+
+    # coarser buckets derived from finer ones
+    coarse = merge_bucket_stats([stats], "60min")
+    pd.testing.assert_frame_equal(
+        get_resampled_frames(coarse, "60min")["mean"],
+        df.resample("60min").mean(),
+        check_freq=False,
+    )
+
+
+def test_rescale_bucket_stats():
+    df = make_df()
+    scale = pd.Series([2.0, -1.0, 0.5], index=[1, 2, 3])
+    stats = rescale_bucket_stats(
+        get_bucket_stats(df, "10min") | get_bucket_quantiles(df, "10min"), scale, -100
+    )
+    expected = get_bucket_stats(df * scale - 100, "10min") | get_bucket_quantiles(
+        df * scale - 100, "10min"
+    )
+
+    for stat in expected:
+        pd.testing.assert_frame_equal(stats[stat], expected[stat], check_freq=False)
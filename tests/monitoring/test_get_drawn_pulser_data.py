@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.monitoring import get_all_pulser_data, get_drawn_pulser_data
+
+
+def test_get_drawn_pulser_data():
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2024-03-01", periods=300, freq="37s", tz="UTC")
+    geds = pd.DataFrame({1104000: 1000 + rng.normal(0, 1, len(idx))}, index=idx)
+    pulser = pd.DataFrame({1027203: 500 + rng.normal(0, 0.5, len(idx))}, index=idx)
+    empty = pd.DataFrame()
+    pulser_data = get_all_pulser_data(
+        "10min",
+        "p03",
+        [geds, geds, pulser, empty, empty, empty, empty],
+        [1104000],
+        escale=2039,
+        variations=True,
+    )[1104000]
+
+    drawn = get_drawn_pulser_data(pulser_data)
+
+    assert drawn.keys() == pulser_data.keys()
+    for name, series in drawn.items():
+        assert list(series) == ["kevdiff_av", "kevdiff_std"]
+        for key in series:
+            assert series[key] is pulser_data[name][key]
+    assert get_drawn_pulser_data(None) is None
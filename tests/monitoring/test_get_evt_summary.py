@@ -0,0 +1,141 @@
+import awkward as ak
+import numpy as np
+import pandas as pd
+from lgdo import Array, Table, VectorOfVectors, lh5
+
+from legend_data_monitor.monitoring import (
+    count_channels_by_bucket,
+    get_evt_summary,
+)
+
+
+def make_evt(rng, n, t0):
+    timestamps = t0 + np.sort(rng.uniform(0, 4 * 3600, n))
+    rawids = ak.Array(
+        [
+            list(rng.choice([1104000, 1104001, 1104002], rng.integers(0, 3)))
+            for _ in range(n)
+        ]
+    )
+    fields = {
+        "geds": rng.random(n) < 0.9,
+        "puls": rng.random(n) < 0.1,
+        "is_forced": rng.random(n) < 0.3,
+        "is_bb_like": rng.random(n) < 0.7,
+        "is_delayed_discharge": rng.random(n) < 0.05,
+    }
+    evt = Table(
+        col_dict={
+            "coincident": Table(
+                col_dict={
+                    "geds": Array(fields["geds"]),
+                    "puls": Array(fields["puls"]),
+                }
+            ),
+            "trigger": Table(
+                col_dict={
+                    "is_forced": Array(fields["is_forced"]),
+                    "timestamp": Array(timestamps),
+                }
+            ),
+            "geds": Table(
+                col_dict={
+                    "quality": Table(
+                        col_dict={
+                            "is_bb_like": Array(fields["is_bb_like"]),
+                            "is_not_bb_like": Table(
+                                col_dict={
+                                    "is_delayed_discharge": Array(
+                                        fields["is_delayed_discharge"]
+                                    ),
+                                    "rawid": VectorOfVectors(rawids),
+                                }
+                            ),
+                        }
+                    )
+                }
+            ),
+        }
+    )
+    fields["timestamp"] = timestamps
+    fields["rawid"] = rawids
+    return evt, fields
+
+
+def test_get_evt_summary(tmp_path):
+    rng = np.random.default_rng(7)
+    files, all_fields = [], []
+    for i, t0 in enumerate([1.7e9, 1.7e9 + 4 * 3600]):
+        evt, fields = make_evt(rng, 400, t0)
+        evt_file = str(tmp_path / f"evt_{i}.lh5")
+        lh5.write(evt, "evt", evt_file, wo_mode="of")
+        files.append(evt_file)
+        all_fields.append(fields)
+
+    summary = get_evt_summary(files, "1h")
+
+    fields = {
+        key: (
+            ak.concatenate([f[key] for f in all_fields])
+            if key == "rawid"
+            else np.concatenate([f[key] for f in all_fields])
+        )
+        for key in all_fields[0]
+    }
+    ts = pd.to_datetime(fields["timestamp"], unit="s")
+
+    # forced triggers
+    forced = pd.Series(1, index=ts[fields["is_forced"]]).resample("h").sum()
+    pd.testing.assert_series_equal(
+        summary["events"]["forced"].loc[forced.index],
+        forced,
+        check_names=False,
+        check_freq=False,
+    )
+    evt_all = fields["geds"] & ~fields["puls"] & ~fields["is_forced"]
+    assert summary["events"]["all"].sum() == evt_all.sum()
+    assert (
+        summary["events"]["qc_fail"].sum()
+        == (evt_all & ~fields["is_delayed_discharge"] & ~fields["is_bb_like"]).sum()
+    )
+
+    # per-channel FT failures, counted event by event
+    mask = fields["is_forced"] & ~fields["is_bb_like"] & ~fields["is_delayed_discharge"]
+    temp = fields["rawid"][mask]
+    y = {ch: np.zeros(mask.sum()) for ch in set(ak.flatten(temp))}
+    for i in range(len(temp)):
+        for ch in temp[i]:
+            y[ch][i] += 1
+    expected = pd.DataFrame(y, index=ts[mask]).resample("h").sum()
+
+    result = summary["ft_failures"]
+    assert set(result.columns) == set(expected.columns)
+    np.testing.assert_array_equal(result.index.values, expected.index.values)
+    for ch in expected.columns:
+        np.testing.assert_array_equal(result[ch].values, expected[ch].values)
+
+
+def test_count_channels_by_bucket_empty():
+    result = count_channels_by_bucket(np.array([0.0, 10.0]), ak.Array([[], []]), "1h")
+    assert result.empty
+
+
+def test_get_evt_summary_dead_time(tmp_path):
+    rng = np.random.default_rng(11)
+    files, discharge_times = [], []
+    for i, t0 in enumerate([1.7e9, 1.7e9 + 4 * 3600]):
+        evt, fields = make_evt(rng, 400, t0)
+        evt_file = str(tmp_path / f"evt_{i}.lh5")
+        lh5.write(evt, "evt", evt_file, wo_mode="of")
+        files.append(evt_file)
+        discharge_times.append(fields["timestamp"][fields["is_delayed_discharge"]])
+
+    events = get_evt_summary(files, "1h", window_ms=2e5)["events"]
+
+    n_windows, next_available = 0, -np.inf
+    for t in np.concatenate(discharge_times):
+        if t >= next_available:
+            n_windows += 1
+            next_available = t + 200
+    assert events["dead_windows"].sum() == n_windows
+    assert (events["dead_time"].dropna() >= 0).all()
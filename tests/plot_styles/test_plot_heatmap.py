@@ -0,0 +1,27 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.plot_styles import plot_heatmap
+
+
+def test_plot_heatmap():
+    times = pd.date_range("2024-05-01 00:00:00", periods=4, freq="1h", tz="UTC")
+    data_channel = pd.DataFrame(
+        {
+            "datetime": times,
+            "energy_in_pe": [[1.5, 2.5], [np.nan], [0.5, 9.5, 12.0], []],
+        }
+    )
+    plot_info = {"parameter": "energy_in_pe", "label": "Energy", "unit_label": "PE"}
+
+    fig, ax = plt.subplots()
+    plot_heatmap(data_channel, fig, ax, plot_info)
+
+    (mesh,) = ax.collections
+    counts = np.asarray(mesh.get_array())
+    # nan and out-of-range values are not counted
+    assert counts.sum() == 4
+    # 3 h * 1.5 / 1e3 s -> 16 time bins, 100 energy bins
+    assert counts.size == 16 * 100
+    plt.close(fig)
@@ -0,0 +1,67 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.dates import date2num
+
+from legend_data_monitor.plot_styles import get_date_nums, plot_vs_time
+
+
+def make_plot_info(resampled="also", std=True):
+    return {
+        "parameter": "baseline",
+        "resampled": resampled,
+        "time_window": "10min",
+        "std": std,
+        "range": [None, None],
+        "event_type": "phy",
+        "label": "Baseline",
+        "unit_label": "ADC",
+        "unit": "ADC",
+    }
+
+
+def test_get_date_nums():
+    times = pd.Series(
+        pd.date_range("2024-05-01 00:00:00", periods=5, freq="7min", tz="UTC")
+    )
+    expected = date2num(list(times.dt.to_pydatetime()))
+
+    np.testing.assert_allclose(get_date_nums(times), expected, rtol=0, atol=1e-9)
+    # naive timestamps are taken as UTC
+    np.testing.assert_allclose(
+        get_date_nums(times.dt.tz_localize(None)), expected, rtol=0, atol=1e-9
+    )
+
+
+def test_plot_vs_time():
+    times = pd.date_range("2024-05-01 00:00:00", periods=120, freq="1min", tz="UTC")
+    rng = np.random.default_rng(3)
+    data_channel = pd.DataFrame(
+        {"datetime": times, "baseline": rng.normal(100, 2, len(times))}
+    ).sample(frac=1, random_state=1)
+
+    fig, ax = plt.subplots()
+    plot_vs_time(data_channel, fig, ax, make_plot_info(), color="C1")
+
+    all_line, resampled_line = ax.lines
+    np.testing.assert_allclose(
+        all_line.get_xdata(), date2num(list(times.to_pydatetime())), atol=1e-9
+    )
+    np.testing.assert_allclose(
+        all_line.get_ydata(), data_channel.sort_values("datetime")["baseline"]
+    )
+
+    means = (
+        data_channel.set_index("datetime")
+        .resample("10min", origin="start")
+        .mean()["baseline"]
+    )
+    np.testing.assert_allclose(resampled_line.get_ydata(), means)
+    np.testing.assert_allclose(
+        resampled_line.get_xdata(),
+        date2num(list((means.index + pd.Timedelta("5min")).to_pydatetime())),
+        atol=1e-9,
+    )
+    # std band
+    assert len(ax.collections) == 1
+    plt.close(fig)
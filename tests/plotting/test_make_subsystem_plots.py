@@ -0,0 +1,108 @@
+import logging
+import os
+from types import SimpleNamespace
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor import analysis_data, plotting, string_visualization, utils
+
+
+def make_subsystem(status="on"):
+    channels = np.arange(4)
+    times = pd.date_range("2025-01-01", periods=60, freq="1min", tz="UTC")
+    baseline = np.full((len(times), len(channels)), 15000.0)
+    # channel 3 is out of threshold at the end
+    baseline[-5:, 3] = 20000.0
+    data = pd.DataFrame(
+        {
+            "datetime": np.repeat(times, len(channels)),
+            "channel": np.tile(channels, len(times)),
+            "name": np.tile([f"V0000{ch}A" for ch in channels], len(times)),
+            "location": np.tile(channels // 2 + 1, len(times)),
+            "position": np.tile(channels % 2 + 1, len(times)),
+            "cc4_id": None,
+            "cc4_channel": None,
+            "daq_crate": 0,
+            "daq_card": 0,
+            "HV_card": 0,
+            "HV_channel": 0,
+            "det_type": "icpc",
+            "status": "on",
+            "flag_pulser": True,
+            "flag_fc_bsln": False,
+            "flag_muon": False,
+            "baseline": baseline.ravel(),
+        }
+    )
+    channel_map = data.drop_duplicates("channel")[
+        ["channel", "name", "location", "position", "status"]
+    ].assign(status=["on", "on", status, "on"])
+    return SimpleNamespace(
+        type="geds", data=data, channel_map=channel_map, analysis_cache={}
+    )
+
+
+def make_plots():
+    return {
+        "Baseline": {
+            "parameters": "baseline",
+            "event_type": "pulser",
+            "plot_structure": "per string",
+            "plot_style": "vs time",
+            "resampled": "no",
+            "time_window": "10min",
+            "variation": True,
+            "status": True,
+        }
+    }
+
+
+def test_make_subsystem_plots_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.logger, "level", logging.INFO)
+    # the AUX analyses need metadata and are not part of this test
+    monkeypatch.setattr(
+        analysis_data,
+        "get_aux_analysis_data",
+        lambda *args: (pd.DataFrame(), pd.DataFrame(), pd.DataFrame()),
+    )
+    checked, drawn = [], []
+    check_status = string_visualization.check_status
+
+    def counting_check_status(*args):
+        status = check_status(*args)
+        checked.append(status[0].set_index("channel")["status"].to_dict())
+        return status
+
+    monkeypatch.setattr(string_visualization, "check_status", counting_check_status)
+    plot_per_string = plotting.PLOT_STRUCTURE["per string"]
+
+    def counting_plot(*args):
+        drawn.append(1)
+        return plot_per_string(*args)
+
+    monkeypatch.setattr(plotting, "PLOT_STRUCTURE", {"per string": counting_plot})
+
+    plt_path = str(tmp_path / "l200-p03-r000-phy")
+    info = {"path": str(tmp_path), "version": "v"}
+
+    def run(subsystem):
+        # status maps change the global plotting style
+        with plt.rc_context():
+            plotting.make_subsystem_plots(
+                subsystem, make_plots(), info, plt_path, "overwrite"
+            )
+
+    run(make_subsystem())
+    assert os.path.isdir(f"{plt_path}-geds.pages")
+    # cached pages are reused, channels are still checked
+    run(make_subsystem())
+    assert len(drawn) == 1
+    assert len(checked) == 2
+    assert checked[0] == checked[1]
+    assert checked[1][3] == 1
+
+    # a change in the channel map draws the pages again
+    run(make_subsystem(status="off"))
+    assert len(drawn) == 2
@@ -0,0 +1,66 @@
+import re
+
+import matplotlib.pyplot as plt
+
+from legend_data_monitor.plotting import (
+    get_cached_pages_path,
+    load_cached_pages,
+    prune_page_cache,
+    save_cached_pages,
+    save_pdf,
+    write_pdf_pages,
+)
+
+
+def draw_pages(n):
+    pages = []
+    for i in range(n):
+        plt.subplots(figsize=(3, 2))
+        plt.plot([0, 1], [0, i])
+        save_pdf(plt, pages)
+    return pages
+
+
+def count_pdf_pages(path):
+    with open(path, "rb") as f:
+        return len(re.findall(rb"/Type\s*/Page\b", f.read()))
+
+
+def test_save_pdf_collects_pages():
+    pages = draw_pages(2)
+
+    assert len(pages) == 2
+    assert all(isinstance(page, bytes) for page in pages)
+    # figures are closed once collected
+    assert plt.get_fignums() == []
+
+
+def test_write_pdf_pages(tmp_path):
+    plt_file = str(tmp_path / "report.pdf")
+    write_pdf_pages(plt_file, [draw_pages(2), [], draw_pages(1)])
+
+    assert count_pdf_pages(plt_file) == 3
+
+
+def test_page_cache(tmp_path):
+    cache_dir = str(tmp_path)
+    assert load_cached_pages(cache_dir, "abc") is None
+
+    pages = draw_pages(1)
+    save_cached_pages(cache_dir, "abc", pages, {"resampled": "no"})
+    save_cached_pages(cache_dir, "old", pages, {})
+
+    cached = load_cached_pages(cache_dir, "abc")
+    assert cached["pages"] == pages
+    assert cached["plot_info"] == {"resampled": "no"}
+
+    prune_page_cache(cache_dir, {"abc"})
+    assert load_cached_pages(cache_dir, "abc") is not None
+    assert load_cached_pages(cache_dir, "old") is None
+
+
+def test_load_cached_pages_ignores_broken_entry(tmp_path):
+    with open(get_cached_pages_path(str(tmp_path), "abc"), "wb") as f:
+        f.write(b"not a pickle")
+
+    assert load_cached_pages(str(tmp_path), "abc") is None
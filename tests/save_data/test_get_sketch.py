@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.save_data import get_sketch
+from legend_data_monitor.utils import build_sketch, get_sketch_path, load_sketch
+
+
+def make_long_df(start, n=200):
+    idx = pd.date_range(start, periods=n, freq="30s", tz="UTC")
+    return pd.DataFrame(
+        {
+            "datetime": np.repeat(idx, 2),
+            "channel": np.tile([1, 2], n),
+            "baseline": np.linspace(10, 20, 2 * n),
+            "name": "det",
+        }
+    )
+
+
+def test_get_sketch_append(tmp_path):
+    file_path = str(tmp_path / "l200-p01-r001-phy-geds.hdf")
+    first = make_long_df("2025-01-01 00:00")
+    second = make_long_df("2025-01-01 01:40")
+
+    get_sketch(first, "baseline", "IsPulser_Baseline", file_path, "append")
+    get_sketch(second, "baseline", "IsPulser_Baseline", file_path, "append")
+    sketch = load_sketch(get_sketch_path(file_path), "IsPulser_Baseline")
+
+    full = pd.concat([first, second]).pivot(
+        index="datetime", columns="channel", values="baseline"
+    )
+    expected = build_sketch(full)
+    pd.testing.assert_frame_equal(
+        sketch["moments"], expected["moments"], check_dtype=False
+    )
+    pd.testing.assert_frame_equal(sketch["hist"], expected["hist"], check_dtype=False)
+
+    # overwrite
+    get_sketch(first, "baseline", "IsPulser_Baseline", file_path, "overwrite")
+    sketch = load_sketch(get_sketch_path(file_path), "IsPulser_Baseline")
+    assert sketch["moments"]["count"].sum() == len(first)
+
+
+def test_get_sketch_non_numeric(tmp_path):
+    file_path = str(tmp_path / "l200-p01-r001-phy-spms.hdf")
+    get_sketch(make_long_df("2025-01-01"), "name", "IsPulser_Name", file_path, None)
+
+    assert load_sketch(get_sketch_path(file_path), "IsPulser_Name") is None
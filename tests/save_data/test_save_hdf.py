@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.analysis_data import AnalysisData, get_aux_df
+from legend_data_monitor.save_data import save_hdf
+from legend_data_monitor.utils import read_aux_variant
+
+
+def make_subsystem_df(n=6):
+    times = pd.date_range("2024-01-01", periods=n, freq="1min", tz="UTC")
+    df = pd.DataFrame(
+        {
+            "datetime": np.tile(times, 2),
+            "channel": np.repeat([1, 2], n),
+            "name": np.repeat(["V01", "V02"], n),
+            "location": 1,
+            "position": np.repeat([1, 2], n),
+            "status": "on",
+            "flag_pulser": True,
+            "flag_fc_bsln": False,
+            "flag_muon": False,
+            "baseline": np.arange(2 * n, dtype=float) + 10,
+            # AUX values, repeated for each channel
+            "baseline_pulser02": np.tile(np.arange(n, dtype=float) + 1, 2),
+        }
+    )
+    for col in [
+        "HV_card",
+        "HV_channel",
+        "cc4_channel",
+        "cc4_id",
+        "daq_card",
+        "daq_crate",
+        "det_type",
+    ]:
+        df[col] = 0
+    return df
+
+
+def test_save_hdf(tmp_path):
+    check_save_hdf(make_subsystem_df(), tmp_path)
+
+
+def test_save_hdf_first_channel_missing(tmp_path):
+    # AUX values must not depend on the timestamps of the first channel
+    df = make_subsystem_df()
+    df = df.drop(index=2).reset_index(drop=True)
+    result = check_save_hdf(df, tmp_path)
+    assert result.loc[pd.Timestamp("2024-01-01 00:02", tz="UTC"), 2] == 6
+
+
+def check_save_hdf(df, tmp_path):
+    selection = {
+        "parameters": ["baseline"],
+        "event_type": "all",
+        "path": "",
+        "version": "",
+    }
+    data_analysis = AnalysisData(
+        df.drop(columns="baseline_pulser02"), selection=selection
+    )
+    aux, ratio, diff = get_aux_df(df, ["baseline"], selection, "pulser02")
+    plot_info = {
+        "title": "Baseline",
+        "subsystem": "geds",
+        "locname": "string",
+        "plot_style": "vs time",
+        "time_window": "10T",
+        "resampled": "no",
+        "range": [None, None],
+        "decimate": None,
+        "std": False,
+        "parameters": ["baseline"],
+        "parameter": "baseline",
+        "param_mean": "baseline_mean",
+        "unit": "ADC",
+        "label": "FPGA baseline",
+        "unit_label": "ADC",
+        "limits": [None, None],
+        "event_type": "all",
+    }
+    file_path = str(tmp_path / "out-geds.hdf")
+
+    save_hdf(
+        "overwrite", file_path, data_analysis, "pulser02", aux, ratio, diff, plot_info
+    )
+
+    data = df.sort_values(["channel", "datetime"])
+    data = data.assign(
+        ratio=data["baseline"] / data["baseline_pulser02"],
+        diff=data["baseline"] - data["baseline_pulser02"],
+    )
+    for variant in ["Ratio", "Diff"]:
+        result = read_aux_variant(file_path, "All_Baseline", "pulser02", variant)
+        expected = data.pivot(
+            index="datetime", columns="channel", values=variant.lower()
+        )
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+
+    return read_aux_variant(file_path, "All_Baseline", "pulser02", "Ratio")
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.string_visualization import get_channel_status
+
+
+def make_data_analysis():
+    rng = np.random.default_rng(8)
+    frames = []
+    for channel, (location, position) in enumerate([(1, 1), (1, 2), (2, 1)]):
+        # channels start at different times, and rows are not sorted by time
+        times = pd.date_range(
+            f"2024-05-01 00:0{channel}:17", periods=200, freq="37s", tz="UTC"
+        )
+        frames.append(
+            pd.DataFrame(
+                {
+                    "channel": channel,
+                    "name": f"V0{channel}",
+                    "location": location,
+                    "position": position,
+                    "datetime": times,
+                    "baseline": rng.normal(10, 1, len(times)),
+                }
+            ).sample(frac=1, random_state=channel)
+        )
+    df = pd.concat(frames, ignore_index=True)
+    # a single spike for channel 1, large enough to survive the resampling
+    spike = pd.Timestamp("2024-05-01 00:01:17", tz="UTC") + 50 * pd.Timedelta("37s")
+    df.loc[(df["channel"] == 1) & (df["datetime"] == spike), "baseline"] += 200
+    return df
+
+
+def test_get_channel_status_matches_resample():
+    df = make_data_analysis()
+
+    status, out_thr = get_channel_status(df, "baseline", "10min", 5, 15)
+
+    assert list(status.columns) == ["channel", "name", "location", "position", "status"]
+    for row in status.itertuples():
+        resampled = (
+            df[df["channel"] == row.channel]
+            .set_index("datetime")
+            .resample("10min", origin="start")
+            .mean(numeric_only=True)["baseline"]
+        )
+        expected = ((resampled > 15) | (resampled < 5)).any()
+        assert row.status == int(expected)
+
+    assert status.set_index("channel")["status"].to_dict() == {0: 0, 1: 1, 2: 0}
+    assert list(out_thr) == [1]
+    assert len(out_thr[1]) == 1
+
+
+def test_get_channel_status_event_rate():
+    df = make_data_analysis().rename(columns={"baseline": "event_rate"})
+
+    status, out_thr = get_channel_status(df, "event_rate", "10min", None, 12)
+
+    for row in status.itertuples():
+        values = df.loc[df["channel"] == row.channel, "event_rate"]
+        assert row.status == int((values > 12).any())
+        assert len(out_thr.get(row.channel, [])) == (values > 12).sum()
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from legend_data_monitor.utils import (
+    QC_CLASSIFIER_EDGES,
+    build_sketch,
+    get_sketch_histogram,
+    get_sketch_summary,
+    load_sketch,
+    merge_sketches,
+    save_sketch,
+)
+
+
+def make_df(n=500, seed=1):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2025-01-01 00:03", periods=n, freq="37s", tz="UTC")
+    df = pd.DataFrame(
+        {
+            1: rng.normal(1000, 20, n),
+            2: rng.normal(-3, 4, n),
+        },
+        index=idx,
+    )
+    df.iloc[10:40, 0] = np.nan
+    return df
+
+
+def test_build_sketch_moments():
+    df = make_df()
+    sketch = build_sketch(df)
+    summary = get_sketch_summary(sketch)
+
+    assert summary.loc[1, "count"] == df[1].count()
+    assert summary.loc[2, "mean"] == pytest.approx(df[2].mean())
+    assert summary.loc[2, "std"] == pytest.approx(df[2].std(ddof=0))
+    assert summary.loc[1, "min"] == df[1].min()
+    assert summary.loc[2, "max"] == df[2].max()
+
+
+def test_get_sketch_summary_quantiles():
+    df = make_df()
+    summary = get_sketch_summary(build_sketch(df), quantiles=[0.05, 0.5, 0.95])
+
+    # default bins have a 1% relative width
+    for ch in [1, 2]:
+        for q in [0.05, 0.5, 0.95]:
+            expected = df[ch].quantile(q)
+            assert summary.loc[ch, q] == pytest.approx(expected, rel=0.02)
+
+
+def test_merge_sketches_split():
+    df = make_df()
+    merged = merge_sketches([build_sketch(df.iloc[:123]), build_sketch(df.iloc[123:])])
+    full = build_sketch(df)
+
+    for part in ["hist", "moments"]:
+        pd.testing.assert_frame_equal(merged[part], full[part], check_dtype=False)
+
+    with pytest.raises(ValueError):
+        merge_sketches([full, build_sketch(df, QC_CLASSIFIER_EDGES)])
+
+
+def test_get_sketch_histogram():
+    df = make_df()
+    sketch = build_sketch(df, QC_CLASSIFIER_EDGES)
+    histo = get_sketch_histogram(sketch, QC_CLASSIFIER_EDGES)
+
+    expected, _ = np.histogram(df[2].dropna(), bins=QC_CLASSIFIER_EDGES)
+    np.testing.assert_array_equal(histo.loc[2].to_numpy(), expected)
+    # channel fully out of range
+    assert histo.loc[1].sum() == 0
+
+
+def test_save_and_load_sketch(tmp_path):
+    file_path = str(tmp_path / "sketch.hdf")
+    assert load_sketch(file_path, "IsPulser_Baseline") is None
+
+    sketch = build_sketch(make_df())
+    save_sketch(file_path, "IsPulser_Baseline", sketch)
+    loaded = load_sketch(file_path, "IsPulser_Baseline")
+
+    pd.testing.assert_frame_equal(loaded["hist"], sketch["hist"])
+    pd.testing.assert_frame_equal(loaded["moments"], sketch["moments"])
+    np.testing.assert_array_equal(loaded["edges"], sketch["edges"])
+    assert load_sketch(file_path, "IsPulser_Cuspemax") is None
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import yaml
+
+from legend_data_monitor import utils
+
+EXPRESSION = "(hit.is_valid_baseline == 1) & (hit.is_discharge == 0)"
+
+
+def write_evt_config(prod_path, expression=EXPRESSION):
+    config_dir = prod_path / "ref" / "inputs/dataprod/config/tier/evt"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    operations = {
+        "_geds___quality___is_bb_like": {"expression": expression},
+        "geds___quality___is_not_bb_like___is_delayed_discharge": {
+            "expression": expression
+        },
+    }
+    with open(config_dir / "l200-all-evt_config.yaml", "w") as f:
+        yaml.dump({"operations": operations}, f)
+    return config_dir / "l200-all-evt_config.yaml"
+
+
+def test_get_bitmask_schema(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "BITMASK_CACHE_DIR", str(tmp_path / "cache"))
+    utils.get_bitmask_schema.cache_clear()
+    prod_path = tmp_path / "prod"
+    write_evt_config(prod_path)
+
+    schema = utils.get_bitmask_schema(str(prod_path), "ref")
+    assert list(schema["flags"]) == ["is_valid_baseline", "is_discharge"]
+    np.testing.assert_array_equal(schema["values"], [1, 0])
+    assert not schema["values"].flags.writeable
+    # resolved once per production version
+    assert utils.get_bitmask_schema(str(prod_path), "ref") is schema
+
+    # the schema stored on disk is reused by a new process while the config is unchanged...
+    cache_path = utils.get_bitmask_cache_path(str(prod_path), "ref")
+    assert os.path.exists(cache_path)
+    utils.get_bitmask_schema.cache_clear()
+    with monkeypatch.context() as m:
+        m.setattr(utils, "resolve_bitmask_flags", None)
+        schema = utils.get_bitmask_schema(str(prod_path), "ref")
+    assert list(schema["flags"]) == ["is_valid_baseline", "is_discharge"]
+
+    # ...and resolved again once the config changes (different size)
+    utils.get_bitmask_schema.cache_clear()
+    write_evt_config(prod_path, "(hit.is_valid_tail == 1)" + " " * 10)
+    schema = utils.get_bitmask_schema(str(prod_path), "ref")
+    assert list(schema["flags"]) == ["is_valid_tail"]
+    utils.get_bitmask_schema.cache_clear()
+
+
+def test_get_bitmask_schema_geds_qc_fallback(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "BITMASK_CACHE_DIR", str(tmp_path / "cache"))
+    utils.get_bitmask_schema.cache_clear()
+    prod_path = tmp_path / "prod"
+    # the QC expressions are only in the geds_qc config...
+    all_config = write_evt_config(prod_path)
+    os.replace(all_config, all_config.parent / "l200-geds_qc-evt_config.yaml")
+    with open(all_config, "w") as f:
+        yaml.dump({"operations": {}}, f)
+    schema = utils.get_bitmask_schema(str(prod_path), "ref")
+    assert list(schema["flags"]) == ["is_valid_baseline", "is_discharge"]
+
+    # ...until the -all-evt config carries them: the stored schema is not valid anymore
+    utils.get_bitmask_schema.cache_clear()
+    write_evt_config(prod_path, "(hit.is_valid_tail == 1)")
+    schema = utils.get_bitmask_schema(str(prod_path), "ref")
+    assert list(schema["flags"]) == ["is_valid_tail"]
+    utils.get_bitmask_schema.cache_clear()
+
+
+def test_get_bitmask_schema_missing(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "BITMASK_CACHE_DIR", str(tmp_path / "cache"))
+    utils.get_bitmask_schema.cache_clear()
+    assert utils.get_bitmask_schema(str(tmp_path), "ref") is None
+    utils.get_bitmask_schema.cache_clear()
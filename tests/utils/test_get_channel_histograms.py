@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.utils import QC_CLASSIFIER_EDGES, get_channel_histograms
+
+
+def test_get_channel_histograms_matches_numpy():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(
+        {
+            1104000: rng.normal(0, 4, 1000),
+            1104001: rng.normal(2, 8, 1000),
+        }
+    )
+    df.iloc[::7, 0] = np.nan
+    df.iloc[0, 1] = QC_CLASSIFIER_EDGES[-1]
+
+    counts, totals = get_channel_histograms(df, QC_CLASSIFIER_EDGES)
+
+    assert counts.shape == (2, len(QC_CLASSIFIER_EDGES) - 1)
+    for ch in df.columns:
+        expected, _ = np.histogram(df[ch].dropna(), bins=QC_CLASSIFIER_EDGES)
+        np.testing.assert_array_equal(counts.loc[ch].to_numpy(), expected)
+        assert totals[ch] == df[ch].notna().sum()
+
+
+def test_get_channel_histograms_empty():
+    counts, totals = get_channel_histograms(pd.DataFrame(), [0, 1, 2])
+
+    assert counts.shape == (0, 2)
+    assert totals.empty
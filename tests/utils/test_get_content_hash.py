@@ -0,0 +1,26 @@
+import pandas as pd
+
+from legend_data_monitor.utils import get_content_hash
+
+
+def test_get_content_hash():
+    df = pd.DataFrame({"channel": [1, 2], "value": [0.5, 1.5]})
+    info = {"title": "Baseline", "limits": [None, 10]}
+
+    key = get_content_hash("geds", info, df)
+    assert key == get_content_hash("geds", dict(info), df.copy())
+
+    changed = df.copy()
+    changed.loc[1, "value"] = 2.0
+    assert get_content_hash("geds", info, changed) != key
+    assert get_content_hash("geds", info, df.rename(columns={"value": "x"})) != key
+    assert get_content_hash("spms", info, df) != key
+
+
+def test_get_content_hash_unhashable_entries():
+    df = pd.DataFrame({"limits": [[0, 1], [2, 3]]})
+
+    assert get_content_hash(df) == get_content_hash(df.copy())
+    assert get_content_hash(df) != get_content_hash(
+        pd.DataFrame({"limits": [[0, 1], [2, 4]]})
+    )
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.utils import get_decimation_indices
+
+
+def test_get_decimation_indices_keeps_extremes():
+    rng = np.random.default_rng(5)
+    x = np.arange(10000, dtype=float)
+    y = rng.normal(0, 1, len(x))
+    y[1234] = 50
+    y[8765] = -50
+    y[4000] = np.nan
+
+    idx = get_decimation_indices(x, [y], 100)
+
+    assert len(idx) <= 4 * 100
+    assert np.all(np.diff(idx) > 0)
+    assert {0, 1234, 8765, len(x) - 1} <= set(idx)
+    # min and max of each bucket are kept
+    for bucket in np.array_split(np.arange(len(x)), 100):
+        values = y[bucket]
+        assert bucket[np.nanargmax(values)] in idx
+        assert bucket[np.nanargmin(values)] in idx
+
+
+def test_get_decimation_indices_datetime_and_short_series():
+    x = pd.date_range("2024-05-01", periods=1000, freq="1min").values
+    y1 = np.sin(np.arange(1000))
+    y2 = np.cos(np.arange(1000))
+
+    idx = get_decimation_indices(x, [y1, y2], 10)
+    assert len(idx) <= 6 * 10
+    assert np.argmax(y2) in idx
+
+    # nothing to decimate
+    np.testing.assert_array_equal(get_decimation_indices(x, [y1], 500), np.arange(1000))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from legend_data_monitor.save_data import get_aux_series, get_pivot
+from legend_data_monitor.utils import read_aux_variant
+
+
+def make_long_df(n=4):
+    times = pd.date_range("2024-01-01", periods=n, freq="1min")
+    aux = np.arange(n, dtype=float) + 1
+    return pd.DataFrame(
+        {
+            "datetime": np.tile(times, 3),
+            "channel": np.repeat([1, 2, 3], n),
+            "baseline": np.arange(3 * n, dtype=float) + 10,
+            "baseline_pulser01ana": np.tile(aux, 3),
+        }
+    )
+
+
+def test_read_aux_variant(tmp_path):
+    path = str(tmp_path / "geds.hdf")
+    df = make_long_df()
+    get_pivot(df, "baseline", "IsPulser_Baseline", path, "overwrite")
+    aux_series = get_aux_series(df, "baseline", "pulser01ana", "all")
+    # AUX values are stored once per timestamp
+    assert len(aux_series) == 4
+    get_pivot(aux_series, "pulser01ana", "IsPulser_Baseline_pulser01ana", path, None)
+    ratio_mean = pd.DataFrame({1: [2.0], 2: [3.0], 3: [4.0]})
+    ratio_mean.to_hdf(path, key="IsPulser_Baseline_pulser01anaRatio_mean")
+
+    expected = df.assign(
+        ratio=df["baseline"] / df["baseline_pulser01ana"],
+        diff=df["baseline"] - df["baseline_pulser01ana"],
+    )
+    ratio = read_aux_variant(path, "IsPulser_Baseline", "pulser01ana", "Ratio")
+    pd.testing.assert_frame_equal(
+        ratio,
+        expected.pivot(index="datetime", columns="channel", values="ratio"),
+        check_names=False,
+    )
+    diff = read_aux_variant(path, "IsPulser_Baseline", "pulser01ana", "Diff")
+    pd.testing.assert_frame_equal(
+        diff,
+        expected.pivot(index="datetime", columns="channel", values="diff"),
+        check_names=False,
+    )
+    ratio_var = read_aux_variant(path, "IsPulser_Baseline", "pulser01ana", "Ratio_var")
+    np.testing.assert_allclose(
+        ratio_var.to_numpy(), (ratio.to_numpy() / [2.0, 3.0, 4.0] - 1) * 100
+    )
+    # no mean values saved for the difference
+    assert (
+        read_aux_variant(path, "IsPulser_Baseline", "pulser01ana", "Diff_var") is None
+    )
+
+
+def test_read_aux_variant_full_matrix(tmp_path):
+    # files written by older versions store the full datetime x channel matrix
+    path = str(tmp_path / "geds.hdf")
+    stored = pd.DataFrame({1: [1.0, 2.0], 2: [3.0, 4.0]})
+    stored.to_hdf(path, key="IsPulser_Baseline_pulser01anaDiff")
+
+    diff = read_aux_variant(path, "IsPulser_Baseline", "pulser01ana", "Diff")
+    pd.testing.assert_frame_equal(diff, stored)
+    assert read_aux_variant(path, "IsPulser_Baseline", "pulser01ana", "Ratio") is None
@@ -0,0 +1,41 @@
+import os
+
+import pandas as pd
+
+from legend_data_monitor import utils
+from legend_data_monitor.utils import clear_hdf_cache, read_hdf_cached
+
+
+def test_read_hdf_cached(tmp_path):
+    clear_hdf_cache()
+    hdf_path = str(tmp_path / "test.hdf")
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0]})
+    df.to_hdf(hdf_path, key="mydata", mode="w")
+
+    pd.testing.assert_frame_equal(read_hdf_cached(hdf_path, "mydata"), df)
+    assert read_hdf_cached(hdf_path, "other") is None
+
+    # second read comes from the cache, and copies can be modified
+    result = read_hdf_cached(hdf_path, "/mydata")
+    result["a"] = 0
+    pd.testing.assert_frame_equal(read_hdf_cached(hdf_path, "mydata"), df)
+    info = utils.read_hdf_at.cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+
+
+def test_read_hdf_cached_file_changed(tmp_path):
+    clear_hdf_cache()
+    hdf_path = str(tmp_path / "test.hdf")
+    pd.DataFrame({"a": [1.0]}).to_hdf(hdf_path, key="mydata", mode="w")
+    read_hdf_cached(hdf_path, "mydata")
+
+    new_df = pd.DataFrame({"a": [5.0, 6.0]})
+    new_df.to_hdf(hdf_path, key="mydata", mode="a")
+    new_df.to_hdf(hdf_path, key="newkey", mode="a")
+    # make sure the modification time changes, whatever the file system resolution
+    stat = os.stat(hdf_path)
+    os.utime(hdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    pd.testing.assert_frame_equal(read_hdf_cached(hdf_path, "mydata"), new_df)
+    pd.testing.assert_frame_equal(read_hdf_cached(hdf_path, "newkey"), new_df)
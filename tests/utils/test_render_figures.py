@@ -0,0 +1,58 @@
+import shelve
+
+import matplotlib.pyplot as plt
+
+from legend_data_monitor.utils import render_figures, save_rendered_figures
+
+
+def draw_line(slope, title):
+    fig, ax = plt.subplots(figsize=(3, 2))
+    ax.plot([0, 1], [0, slope])
+    fig.suptitle(title)
+    return fig
+
+
+def make_specs(tmp_path, n=3):
+    return [
+        {
+            "function": draw_line,
+            "kwargs": {"slope": i, "title": f"plot {i}"},
+            "formats": ["png", "pdf"],
+            "png_path": str(tmp_path / f"plot_{i}.png"),
+            "pdf_path": str(tmp_path / "pdf" / f"plot_{i}.pdf"),
+            "shelf_key": f"plot_{i}",
+        }
+        for i in range(n)
+    ]
+
+
+def test_render_figures_pool_matches_serial(tmp_path):
+    specs = make_specs(tmp_path)
+
+    serial = render_figures(specs, max_workers=1)
+    pooled = render_figures(specs, max_workers=2)
+
+    assert len(serial) == len(pooled) == len(specs)
+    # outputs come back in the order of the specs
+    for out_serial, out_pooled in zip(serial, pooled):
+        assert out_serial["png"] == out_pooled["png"]
+        assert out_pooled["pdf"].startswith(b"%PDF")
+
+
+def test_save_rendered_figures(tmp_path):
+    specs = make_specs(tmp_path, n=2)
+    rendered = render_figures(specs, max_workers=1)
+
+    with shelve.open(str(tmp_path / "shelf"), "c") as shelf:
+        save_rendered_figures(specs, rendered, shelf)
+        assert sorted(shelf.keys()) == ["plot_0", "plot_1"]
+
+    for spec in specs:
+        with open(spec["pdf_path"], "rb") as f:
+            assert f.read().startswith(b"%PDF")
+        with open(spec["png_path"], "rb") as f:
+            assert f.read().startswith(b"\x89PNG")
+
+
+def test_render_figures_empty():
+    assert render_figures([]) == []